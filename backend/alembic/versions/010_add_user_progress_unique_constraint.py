@@ -0,0 +1,57 @@
+"""add unique constraint on user_progress (user_id, chapter_id)
+
+Revision ID: 010_user_progress_unique
+Revises: 009_add_notifications
+Create Date: 2026-03-02 00:00:00.000000
+
+"""
+from alembic import op
+
+
+revision = "010_user_progress_unique"
+down_revision = "009_add_notifications"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Merge duplicate progress rows created by concurrent read-then-write
+    # requests into the oldest row before the constraint can be added.
+    op.execute(
+        """
+        UPDATE user_progress p
+        SET completed = agg.any_completed,
+            completed_at = agg.first_completed_at,
+            quiz_score = agg.best_score
+        FROM (
+            SELECT user_id,
+                   chapter_id,
+                   MIN(id) AS keep_id,
+                   BOOL_OR(COALESCE(completed, false)) AS any_completed,
+                   MIN(completed_at) AS first_completed_at,
+                   MAX(quiz_score) AS best_score
+            FROM user_progress
+            GROUP BY user_id, chapter_id
+            HAVING COUNT(*) > 1
+        ) agg
+        WHERE p.id = agg.keep_id
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM user_progress p
+        USING user_progress q
+        WHERE p.user_id = q.user_id
+          AND p.chapter_id = q.chapter_id
+          AND p.id > q.id
+        """
+    )
+    op.create_unique_constraint(
+        "uq_user_progress_user_chapter",
+        "user_progress",
+        ["user_id", "chapter_id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("uq_user_progress_user_chapter", "user_progress", type_="unique")
@@ -0,0 +1,80 @@
+"""add quiz attempt history and item analysis aggregates
+
+Revision ID: 011_quiz_attempts
+Revises: 010_user_progress_unique
+Create Date: 2026-03-03 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import text
+
+
+revision = "011_quiz_attempts"
+down_revision = "010_user_progress_unique"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "quiz_attempts",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("user_id", sa.String(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("course_id", sa.String(), sa.ForeignKey("courses.id"), nullable=False),
+        sa.Column("chapter_id", sa.String(), sa.ForeignKey("chapters.id"), nullable=False),
+        sa.Column("score", sa.Integer(), nullable=False),
+        sa.Column("correct_answers", sa.Integer(), nullable=False),
+        sa.Column("total_questions", sa.Integer(), nullable=False),
+        sa.Column("passed", sa.Boolean(), nullable=False, server_default=sa.text("false")),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=text("NOW()")),
+    )
+    op.create_index("ix_quiz_attempts_user_id", "quiz_attempts", ["user_id"])
+    op.create_index("ix_quiz_attempts_chapter_id", "quiz_attempts", ["chapter_id"])
+
+    op.create_table(
+        "quiz_attempt_items",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("attempt_id", sa.String(), sa.ForeignKey("quiz_attempts.id"), nullable=False),
+        sa.Column("quiz_id", sa.String(), nullable=False),
+        sa.Column("is_correct", sa.Boolean(), nullable=False),
+    )
+    op.create_index("ix_quiz_attempt_items_attempt_id", "quiz_attempt_items", ["attempt_id"])
+    op.create_index("ix_quiz_attempt_items_quiz_id", "quiz_attempt_items", ["quiz_id"])
+
+    op.create_table(
+        "quiz_question_stats",
+        sa.Column("quiz_id", sa.String(), primary_key=True),
+        sa.Column("chapter_id", sa.String(), sa.ForeignKey("chapters.id"), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("correct", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("score_sum", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("score_sq_sum", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("correct_score_sum", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index("ix_quiz_question_stats_chapter_id", "quiz_question_stats", ["chapter_id"])
+
+    op.create_table(
+        "quiz_chapter_stats",
+        sa.Column("chapter_id", sa.String(), sa.ForeignKey("chapters.id"), primary_key=True),
+        sa.Column("course_id", sa.String(), sa.ForeignKey("courses.id"), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("passed", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("score_sum", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index("ix_quiz_chapter_stats_course_id", "quiz_chapter_stats", ["course_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_quiz_chapter_stats_course_id", table_name="quiz_chapter_stats")
+    op.drop_table("quiz_chapter_stats")
+    op.drop_index("ix_quiz_question_stats_chapter_id", table_name="quiz_question_stats")
+    op.drop_table("quiz_question_stats")
+    op.drop_index("ix_quiz_attempt_items_quiz_id", table_name="quiz_attempt_items")
+    op.drop_index("ix_quiz_attempt_items_attempt_id", table_name="quiz_attempt_items")
+    op.drop_table("quiz_attempt_items")
+    op.drop_index("ix_quiz_attempts_chapter_id", table_name="quiz_attempts")
+    op.drop_index("ix_quiz_attempts_user_id", table_name="quiz_attempts")
+    op.drop_table("quiz_attempts")
@@ -0,0 +1,23 @@
+"""add content_version to courses
+
+Revision ID: 012_course_content_version
+Revises: 011_quiz_attempts
+Create Date: 2026-03-04 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "012_course_content_version"
+down_revision = "011_quiz_attempts"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("courses", sa.Column("content_version", sa.Integer(), nullable=False, server_default="1"))
+
+
+def downgrade() -> None:
+    op.drop_column("courses", "content_version")
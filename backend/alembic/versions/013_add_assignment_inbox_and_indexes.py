@@ -0,0 +1,69 @@
+"""add composite indexes for my-assignments and the user assignment inbox
+
+Revision ID: 013_assignment_inbox
+Revises: 012_course_content_version
+Create Date: 2026-03-05 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "013_assignment_inbox"
+down_revision = "012_course_content_version"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_enrollments_user_course", "enrollments", ["user_id", "course_id"])
+    op.create_index("ix_assignments_course_due", "assignments", ["course_id", "due_date"])
+    op.create_index(
+        "ix_assignment_submissions_user_assignment_created",
+        "assignment_submissions",
+        ["user_id", "assignment_id", "created_at"],
+    )
+
+    op.create_table(
+        "user_assignment_inbox",
+        sa.Column("user_id", sa.String(), primary_key=True),
+        sa.Column("assignment_id", sa.String(), primary_key=True),
+        sa.Column("course_id", sa.String(), nullable=False),
+        sa.Column("due_date", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("latest_submission_id", sa.String(), nullable=True),
+    )
+    op.create_index(
+        "ix_user_assignment_inbox_user_due",
+        "user_assignment_inbox",
+        ["user_id", "due_date", "assignment_id"],
+    )
+    op.create_index("ix_user_assignment_inbox_assignment_id", "user_assignment_inbox", ["assignment_id"])
+    op.create_index("ix_user_assignment_inbox_course_id", "user_assignment_inbox", ["course_id"])
+
+    # Backfill from the current enrollments and submissions.
+    op.execute(
+        """
+        INSERT INTO user_assignment_inbox (user_id, assignment_id, course_id, due_date, latest_submission_id)
+        SELECT pairs.user_id, a.id, a.course_id, a.due_date,
+               (SELECT s.id FROM assignment_submissions s
+                 WHERE s.user_id = pairs.user_id AND s.assignment_id = a.id
+                 ORDER BY s.created_at DESC, s.id DESC LIMIT 1)
+        FROM (
+            SELECT e.user_id, a.id AS assignment_id
+            FROM enrollments e JOIN assignments a ON a.course_id = e.course_id
+            UNION
+            SELECT s.user_id, s.assignment_id FROM assignment_submissions s
+        ) pairs
+        JOIN assignments a ON a.id = pairs.assignment_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_user_assignment_inbox_course_id", table_name="user_assignment_inbox")
+    op.drop_index("ix_user_assignment_inbox_assignment_id", table_name="user_assignment_inbox")
+    op.drop_index("ix_user_assignment_inbox_user_due", table_name="user_assignment_inbox")
+    op.drop_table("user_assignment_inbox")
+    op.drop_index("ix_assignment_submissions_user_assignment_created", table_name="assignment_submissions")
+    op.drop_index("ix_assignments_course_due", table_name="assignments")
+    op.drop_index("ix_enrollments_user_course", table_name="enrollments")
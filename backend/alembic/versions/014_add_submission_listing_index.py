@@ -0,0 +1,26 @@
+"""add index for keyset listing of an assignment's submissions
+
+Revision ID: 014_submission_listing_index
+Revises: 013_assignment_inbox
+Create Date: 2026-03-06 00:00:00.000000
+
+"""
+from alembic import op
+
+
+revision = "014_submission_listing_index"
+down_revision = "013_assignment_inbox"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_assignment_submissions_assignment_created",
+        "assignment_submissions",
+        ["assignment_id", "created_at", "id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_assignment_submissions_assignment_created", table_name="assignment_submissions")
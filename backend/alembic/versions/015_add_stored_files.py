@@ -0,0 +1,29 @@
+"""add content-addressed stored files
+
+Revision ID: 015_stored_files
+Revises: 014_submission_listing_index
+Create Date: 2026-03-07 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import text
+
+
+revision = "015_stored_files"
+down_revision = "014_submission_listing_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "stored_files",
+        sa.Column("sha256", sa.String(64), primary_key=True),
+        sa.Column("size", sa.BigInteger(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=text("NOW()")),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("stored_files")
@@ -0,0 +1,60 @@
+"""add tsvector search columns, GIN indexes and maintenance triggers
+
+Revision ID: 016_full_text_search
+Revises: 015_stored_files
+Create Date: 2026-03-08 00:00:00.000000
+
+"""
+from alembic import op
+
+
+revision = "016_full_text_search"
+down_revision = "015_stored_files"
+branch_labels = None
+depends_on = None
+
+
+SOURCES = (
+    ("courses", "title", "description"),
+    ("chapters", "title", "content"),
+    ("assignments", "title", "description"),
+)
+
+
+def upgrade() -> None:
+    for table, title, body in SOURCES:
+        vector = (
+            f"setweight(to_tsvector('russian', coalesce({{row}}{title}, '')), 'A') || "
+            f"setweight(to_tsvector('russian', coalesce({{row}}{body}, '')), 'B')"
+        )
+        op.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector")
+        op.execute(f"UPDATE {table} SET search_vector = {vector.format(row='')}")
+        op.execute(
+            f"CREATE INDEX IF NOT EXISTS ix_{table}_search_vector ON {table} USING GIN (search_vector)"
+        )
+        op.execute(
+            f"""
+            CREATE OR REPLACE FUNCTION {table}_search_vector_update() RETURNS trigger AS $$
+            BEGIN
+                NEW.search_vector := {vector.format(row='NEW.')};
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql
+            """
+        )
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_search_vector_trigger ON {table}")
+        op.execute(
+            f"""
+            CREATE TRIGGER {table}_search_vector_trigger
+            BEFORE INSERT OR UPDATE OF {title}, {body} ON {table}
+            FOR EACH ROW EXECUTE FUNCTION {table}_search_vector_update()
+            """
+        )
+
+
+def downgrade() -> None:
+    for table, _, _ in SOURCES:
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_search_vector_trigger ON {table}")
+        op.execute(f"DROP FUNCTION IF EXISTS {table}_search_vector_update()")
+        op.execute(f"DROP INDEX IF EXISTS ix_{table}_search_vector")
+        op.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS search_vector")
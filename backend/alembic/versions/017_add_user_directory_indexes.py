@@ -0,0 +1,43 @@
+"""add indexes for the admin user directory
+
+Revision ID: 017_user_directory_indexes
+Revises: 016_full_text_search
+Create Date: 2026-03-09 00:00:00.000000
+
+"""
+from alembic import op
+
+
+revision = "017_user_directory_indexes"
+down_revision = "016_full_text_search"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_users_role_email", "users", ["role", "email"])
+
+    # Prefix search on short terms.
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_users_lower_email_pattern ON users (lower(email) text_pattern_ops)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_users_lower_name_pattern ON users (lower(name) text_pattern_ops)"
+    )
+
+    # Substring search on longer terms.
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_users_lower_email_trgm ON users USING GIN (lower(email) gin_trgm_ops)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_users_lower_name_trgm ON users USING GIN (lower(name) gin_trgm_ops)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_users_lower_name_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_users_lower_email_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_users_lower_name_pattern")
+    op.execute("DROP INDEX IF EXISTS ix_users_lower_email_pattern")
+    op.drop_index("ix_users_role_email", table_name="users")
@@ -0,0 +1,42 @@
+"""add member and course counters to groups
+
+Revision ID: 018_group_counters
+Revises: 017_user_directory_indexes
+Create Date: 2026-03-10 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "018_group_counters"
+down_revision = "017_user_directory_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("groups", sa.Column("member_count", sa.Integer(), nullable=False, server_default="0"))
+    op.add_column("groups", sa.Column("course_count", sa.Integer(), nullable=False, server_default="0"))
+    op.execute(
+        """
+        UPDATE groups SET
+            member_count = (SELECT count(*) FROM group_members gm WHERE gm.group_id = groups.id),
+            course_count = (SELECT count(*) FROM group_courses gc WHERE gc.group_id = groups.id)
+        """
+    )
+    op.create_index("ix_groups_name_id", "groups", ["name", "id"])
+    op.create_index("ix_groups_member_count_id", "groups", ["member_count", "id"])
+    op.create_index("ix_groups_created_at_id", "groups", ["created_at", "id"])
+    op.create_index("ix_group_members_group_id", "group_members", ["group_id"])
+    op.create_index("ix_group_courses_group_id", "group_courses", ["group_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_group_courses_group_id", table_name="group_courses")
+    op.drop_index("ix_group_members_group_id", table_name="group_members")
+    op.drop_index("ix_groups_created_at_id", table_name="groups")
+    op.drop_index("ix_groups_member_count_id", table_name="groups")
+    op.drop_index("ix_groups_name_id", table_name="groups")
+    op.drop_column("groups", "course_count")
+    op.drop_column("groups", "member_count")
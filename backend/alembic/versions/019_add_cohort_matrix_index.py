@@ -0,0 +1,26 @@
+"""add index for per-course progress aggregation
+
+Revision ID: 019_cohort_matrix_index
+Revises: 018_group_counters
+Create Date: 2026-03-13 00:00:00.000000
+
+"""
+from alembic import op
+
+
+revision = "019_cohort_matrix_index"
+down_revision = "018_group_counters"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_user_progress_course_user",
+        "user_progress",
+        ["course_id", "user_id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_user_progress_course_user", table_name="user_progress")
@@ -1,32 +1,146 @@
 import logging
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy import func
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session, selectinload
+from typing import List, Optional, Union
 from app.db.database import get_db
+from app.db.replicas import get_read_db
 from app.db import models
 from app.schemas import course as course_schema
 from app.schemas import user as user_schema
 from app.schemas import group as group_schema
 from app.schemas import assignment as assignment_schema
+from app.schemas import job as job_schema
 from app.core.security import get_admin_user
 from app.core.kafka_producer import send_event
+from app.core import (
+    admin_jobs,
+    assignment_inbox,
+    cohort_matrix,
+    course_diff,
+    enrollment_cache,
+    jobs,
+    quiz_analytics,
+    quiz_grading,
+    row_counts,
+)
+from app.core.pagination import after_key, before_key, decode_cursor, encode_cursor
+from app.core.streaming import csv_chunks
 
 router = APIRouter()
 
 
+USER_DIRECTORY_FIELDS = ("id", "email", "name", "role", "created_at", "updated_at")
+MATRIX_EXPORT_BATCH_SIZE = 1000
+
+
+def _user_search_filter(q: str):
+    """Case-insensitive match on name or email.
+
+    Short terms match as a prefix (served by the ``lower(...) text_pattern_ops``
+    indexes); from three characters on they match anywhere, which the
+    trigram indexes serve on Postgres.
+    """
+    raw = q.strip().lower()
+    term = raw.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    pattern = f"{term}%" if len(raw) < 3 else f"%{term}%"
+    return or_(
+        func.lower(models.User.email).like(pattern, escape="\\"),
+        func.lower(models.User.name).like(pattern, escape="\\"),
+    )
+
+
+def _count_users(db: Session, role: Optional[str], q: Optional[str]) -> int:
+    if not role and not q:
+        estimate = row_counts.estimated_rows(db, "users")
+        if estimate is not None:
+            return estimate
+
+    def compute() -> int:
+        query = db.query(func.count(models.User.id))
+        if role:
+            query = query.filter(models.User.role == role)
+        if q:
+            query = query.filter(_user_search_filter(q))
+        return query.scalar()
+
+    return row_counts.cached_count(("users", role, q), compute)
+
+
 @router.get("/users", response_model=List[user_schema.AdminUserResponse])
 def list_users(
+    response: Response,
     role: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    q: Optional[str] = Query(None, max_length=100),
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    cursor: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None),
+    db: Session = Depends(get_read_db),
     current_user: models.User = Depends(get_admin_user),
 ):
-    query = db.query(models.User)
+    """Users ordered by email.
+
+    With ``limit`` the result is a keyset page: the next cursor comes in
+    ``X-Next-Cursor`` and an estimated or cached total in ``X-Total-Count``.
+    ``fields`` (e.g. ``id,email,name``) returns only those columns.
+    """
+    selected = USER_DIRECTORY_FIELDS
+    if fields:
+        selected = tuple(field.strip() for field in fields.split(",") if field.strip())
+        unknown = set(selected) - set(USER_DIRECTORY_FIELDS)
+        if unknown or not selected:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Неизвестные поля: " + ", ".join(sorted(unknown)),
+            )
+
+    columns = [getattr(models.User, field) for field in selected]
+    if "email" not in selected:
+        columns.append(models.User.email)
+
+    query = db.query(*columns)
     if role:
         query = query.filter(models.User.role == role)
-    users = query.order_by(models.User.email.asc()).all()
-    return users
+    if q and q.strip():
+        query = query.filter(_user_search_filter(q))
+
+    after = decode_cursor(cursor, 1)
+    if after is not None:
+        query = query.filter(models.User.email > after[0])
+    query = query.order_by(models.User.email.asc())
+    if limit is not None:
+        query = query.limit(limit + 1)
+    rows = query.all()
+
+    headers = {}
+    if limit is not None:
+        if len(rows) > limit:
+            rows = rows[:limit]
+            headers["X-Next-Cursor"] = encode_cursor([rows[-1].email])
+        headers["X-Total-Count"] = str(_count_users(db, role, q.strip() if q else None))
+
+    if fields:
+        items = [
+            {field: jsonable_encoder(getattr(row, field)) for field in selected}
+            for row in rows
+        ]
+        return JSONResponse(content=items, headers=headers)
+
+    response.headers.update(headers)
+    return [
+        user_schema.AdminUserResponse(
+            id=row.id,
+            email=row.email,
+            name=row.name,
+            role=row.role,
+            created_at=row.created_at,
+            updated_at=row.updated_at,
+        )
+        for row in rows
+    ]
 
 
 @router.get("/users/{user_id}", response_model=user_schema.AdminUserResponse)
@@ -93,7 +207,10 @@ def delete_user(
         )
 
     db.delete(user)
+    assignment_inbox.refresh(db, user_ids=[user_id])
     db.commit()
+    enrollment_cache.invalidate_user(user_id)
+    row_counts.invalidate("users")
     return None
 
 @router.post("/courses", response_model=course_schema.CourseResponse)
@@ -216,6 +333,7 @@ def enroll_user_to_course(
         course_id=course_id,
     )
     db.add(enrollment)
+    assignment_inbox.refresh(db, user_ids=[user.id], course_id=course_id)
     db.commit()
 
     try:
@@ -282,6 +400,8 @@ def create_assignment(
         due_date=payload.dueDate,
     )
     db.add(db_assignment)
+    db.flush()
+    assignment_inbox.refresh(db, assignment_id=db_assignment.id)
     db.commit()
     db.refresh(db_assignment)
 
@@ -384,17 +504,44 @@ def create_group(
             )
             for gc in db_group.courses
         ],
+        memberCount=db_group.member_count,
+        courseCount=db_group.course_count,
     )
 
 
+GROUP_SORT_COLUMNS = {
+    "name": models.Group.name,
+    "memberCount": models.Group.member_count,
+    "createdAt": models.Group.created_at,
+}
+
+
 @router.get("/groups", response_model=List[group_schema.GroupSummary])
 def list_groups(
+    response: Response,
     course_id: Optional[str] = Query(None),
     owner_id: Optional[str] = Query(None),
     status_filter: Optional[str] = Query(None),
+    sort: str = Query("name"),
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    cursor: Optional[str] = Query(None),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_admin_user),
 ):
+    """Groups with their member and course counters in a single query.
+
+    ``sort`` is ``name``, ``memberCount`` or ``createdAt``, prefixed with
+    ``-`` for descending order. With ``limit`` the result is a keyset page
+    and the next cursor is returned in ``X-Next-Cursor``.
+    """
+    descending = sort.startswith("-")
+    sort_column = GROUP_SORT_COLUMNS.get(sort.lstrip("-"))
+    if sort_column is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="sort должен быть name, memberCount или createdAt",
+        )
+
     query = db.query(models.Group)
 
     if owner_id:
@@ -402,79 +549,87 @@ def list_groups(
     if status_filter:
         query = query.filter(models.Group.status == status_filter)
     if course_id:
-        query = query.join(models.GroupCourse).filter(
-            models.GroupCourse.course_id == course_id
+        query = query.filter(
+            db.query(models.GroupCourse.id)
+            .filter(
+                models.GroupCourse.group_id == models.Group.id,
+                models.GroupCourse.course_id == course_id,
+            )
+            .exists()
         )
 
-    groups = query.all()
-    if not groups:
-        return []
+    after = decode_cursor(cursor, 2)
+    if after is not None:
+        keyset = before_key if descending else after_key
+        query = query.filter(keyset(sort_column, models.Group.id, *after))
 
-    group_ids = [g.id for g in groups]
+    if descending:
+        query = query.order_by(sort_column.desc(), models.Group.id.desc())
+    else:
+        query = query.order_by(sort_column.asc(), models.Group.id.asc())
+    if limit is not None:
+        query = query.limit(limit + 1)
+    groups = query.all()
 
-    member_counts = (
-        db.query(
-            models.GroupMember.group_id,
-            func.count(models.GroupMember.id),
+    if limit is not None and len(groups) > limit:
+        groups = groups[:limit]
+        last = groups[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(
+            [getattr(last, sort_column.key), last.id]
         )
-        .filter(models.GroupMember.group_id.in_(group_ids))
-        .group_by(models.GroupMember.group_id)
-        .all()
-    )
-    member_count_map = {gid: count for gid, count in member_counts}
 
-    course_counts = (
-        db.query(
-            models.GroupCourse.group_id,
-            func.count(models.GroupCourse.id),
-        )
-        .filter(models.GroupCourse.group_id.in_(group_ids))
-        .group_by(models.GroupCourse.group_id)
-        .all()
-    )
-    course_count_map = {gid: count for gid, count in course_counts}
-
-    result: List[group_schema.GroupSummary] = []
-    for g in groups:
-        result.append(
-            group_schema.GroupSummary(
-                id=g.id,
-                name=g.name,
-                description=g.description,
-                status=g.status,
-                ownerId=g.owner_id,
-                memberCount=member_count_map.get(g.id, 0),
-                courseCount=course_count_map.get(g.id, 0),
-            )
+    return [
+        group_schema.GroupSummary(
+            id=g.id,
+            name=g.name,
+            description=g.description,
+            status=g.status,
+            ownerId=g.owner_id,
+            memberCount=g.member_count,
+            courseCount=g.course_count,
+            createdAt=g.created_at,
         )
-
-    return result
+        for g in groups
+    ]
 
 
-@router.get("/groups/{group_id}", response_model=group_schema.GroupDetail)
-def get_group(
-    group_id: str,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_admin_user),
-):
+def _get_group_or_404(db: Session, group_id: str) -> models.Group:
     group = db.query(models.Group).filter(models.Group.id == group_id).first()
     if not group:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Group not found",
         )
+    return group
 
-    member_rows = (
+
+def _group_detail(
+    db: Session,
+    group: models.Group,
+    member_limit: Optional[int] = None,
+    member_cursor: Optional[str] = None,
+) -> group_schema.GroupDetail:
+    member_query = (
         db.query(
             models.User.id,
             models.User.name,
             models.User.email,
         )
         .join(models.GroupMember, models.GroupMember.user_id == models.User.id)
-        .filter(models.GroupMember.group_id == group_id)
-        .order_by(models.User.name.asc())
-        .all()
+        .filter(models.GroupMember.group_id == group.id)
     )
+    after = decode_cursor(member_cursor, 2)
+    if after is not None:
+        member_query = member_query.filter(after_key(models.User.name, models.User.id, *after))
+    member_query = member_query.order_by(models.User.name.asc(), models.User.id.asc())
+    if member_limit is not None:
+        member_query = member_query.limit(member_limit + 1)
+    member_rows = member_query.all()
+
+    next_member_cursor = None
+    if member_limit is not None and len(member_rows) > member_limit:
+        member_rows = member_rows[:member_limit]
+        next_member_cursor = encode_cursor([member_rows[-1].name, member_rows[-1].id])
 
     members = [
         group_schema.GroupMemberInfo(
@@ -494,7 +649,7 @@ def get_group(
             models.GroupCourse,
             models.GroupCourse.course_id == models.Course.id,
         )
-        .filter(models.GroupCourse.group_id == group_id)
+        .filter(models.GroupCourse.group_id == group.id)
         .order_by(models.Course.title.asc())
         .all()
     )
@@ -515,9 +670,30 @@ def get_group(
         ownerId=group.owner_id,
         members=members,
         courses=courses,
+        memberCount=group.member_count,
+        courseCount=group.course_count,
+        nextMemberCursor=next_member_cursor,
     )
 
 
+@router.get("/groups/{group_id}", response_model=group_schema.GroupDetail)
+def get_group(
+    group_id: str,
+    member_limit: Optional[int] = Query(None, ge=1, le=500),
+    member_cursor: Optional[str] = Query(None),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_admin_user),
+):
+    """Group detail with members ordered by name.
+
+    With ``member_limit`` only one page of members is returned and
+    ``nextMemberCursor`` points at the next one; ``memberCount`` is always
+    the full total.
+    """
+    group = _get_group_or_404(db, group_id)
+    return _group_detail(db, group, member_limit, member_cursor)
+
+
 @router.patch("/groups/{group_id}", response_model=group_schema.GroupDetail)
 def update_group(
     group_id: str,
@@ -545,7 +721,7 @@ def update_group(
     db.commit()
     db.refresh(group)
 
-    return get_group(group_id, db, current_user)
+    return _group_detail(db, group)
 
 
 @router.delete("/groups/{group_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -569,19 +745,43 @@ def delete_group(
     return None
 
 
-@router.post("/groups/{group_id}/members", response_model=group_schema.GroupDetail)
+def _job_accepted(job: models.Job) -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content=jsonable_encoder(job_schema.job_response(job)),
+    )
+
+
+def _check_response_mode(mode: str) -> None:
+    if mode not in ("full", "delta"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="mode must be full or delta",
+        )
+
+
+def _group_counters(db: Session, group_id: str):
+    return (
+        db.query(models.Group.member_count, models.Group.course_count)
+        .filter(models.Group.id == group_id)
+        .one()
+    )
+
+
+@router.post(
+    "/groups/{group_id}/members",
+    response_model=Union[group_schema.GroupDetail, group_schema.GroupMemberDelta],
+)
 def add_group_member(
     group_id: str,
     payload: group_schema.GroupMemberAddRequest,
+    mode: str = Query("full"),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_admin_user),
 ):
-    group = db.query(models.Group).filter(models.Group.id == group_id).first()
-    if not group:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Group not found",
-        )
+    """Add a member; ``mode=delta`` returns only that member and the new counters."""
+    _check_response_mode(mode)
+    group = _get_group_or_404(db, group_id)
 
     if not payload.userId and not payload.email:
         raise HTTPException(
@@ -610,7 +810,9 @@ def add_group_member(
         )
         .first()
     )
-    if not existing_member:
+    added = existing_member is None
+    member_info = group_schema.GroupMemberInfo(userId=user.id, name=user.name, email=user.email)
+    if added:
         member = models.GroupMember(
             group_id=group_id,
             user_id=user.id,
@@ -633,7 +835,17 @@ def add_group_member(
     else:
         db.commit()
 
-    return get_group(group_id, db, current_user)
+    if mode == "delta":
+        counters = _group_counters(db, group_id)
+        return group_schema.GroupMemberDelta(
+            groupId=group_id,
+            member=member_info,
+            added=added,
+            memberCount=counters.member_count,
+            courseCount=counters.course_count,
+        )
+
+    return _group_detail(db, group)
 
 
 @router.delete(
@@ -667,20 +879,24 @@ def remove_group_member(
 
 @router.post(
     "/groups/{group_id}/courses/{course_id}/enroll",
-    response_model=group_schema.GroupDetail,
+    response_model=Union[group_schema.GroupDetail, group_schema.GroupCourseDelta],
 )
 def enroll_group_to_course(
     group_id: str,
     course_id: str,
+    mode: str = Query("full"),
+    background: bool = Query(False),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_admin_user),
 ):
-    group = db.query(models.Group).filter(models.Group.id == group_id).first()
-    if not group:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Group not found",
-        )
+    """Link a course to the group and enroll its members.
+
+    ``mode=delta`` returns only the course, how many members were newly
+    enrolled and the new counters. ``background=true`` enrolls the members
+    in chunks from a job and answers 202 with the job handle.
+    """
+    _check_response_mode(mode)
+    group = _get_group_or_404(db, group_id)
 
     course = db.query(models.Course).filter(models.Course.id == course_id).first()
     if not course:
@@ -688,69 +904,41 @@ def enroll_group_to_course(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Course not found",
         )
-
-    member_rows = (
-        db.query(models.GroupMember.user_id)
-        .filter(models.GroupMember.group_id == group_id)
-        .all()
-    )
-    user_ids = [row[0] for row in member_rows]
-
-    newly_enrolled_user_ids: list[str] = []
-
-    if user_ids:
-        existing_enrollments = (
-            db.query(models.Enrollment)
-            .filter(
-                models.Enrollment.course_id == course_id,
-                models.Enrollment.user_id.in_(user_ids),
-            )
-            .all()
+    course_title = course.title
+
+    if background:
+        job = jobs.enqueue(
+            db,
+            admin_jobs.ENROLL_GROUP,
+            {"group_id": group_id, "course_id": course_id},
+            key=f"{group_id}:{course_id}",
+            created_by=current_user.id,
         )
-        enrolled_user_ids = {e.user_id for e in existing_enrollments}
+        return _job_accepted(job)
 
-        for uid in user_ids:
-            if uid not in enrolled_user_ids:
-                enrollment = models.Enrollment(
-                    user_id=uid,
-                    course_id=course_id,
-                )
-                db.add(enrollment)
-                newly_enrolled_user_ids.append(uid)
-
-    existing_link = (
-        db.query(models.GroupCourse)
-        .filter(
-            models.GroupCourse.group_id == group_id,
-            models.GroupCourse.course_id == course_id,
-        )
-        .first()
-    )
-    if not existing_link:
-        link = models.GroupCourse(
-            group_id=group_id,
-            course_id=course_id,
+    user_ids = [
+        row[0]
+        for row in db.query(models.GroupMember.user_id).filter(
+            models.GroupMember.group_id == group_id
         )
-        db.add(link)
-
+    ]
+    newly_enrolled_user_ids = admin_jobs.enroll_users(db, course_id, user_ids)
+    linked = admin_jobs.link_group_course(db, group_id, course_id)
     db.commit()
+    admin_jobs.announce_enrollments(newly_enrolled_user_ids, course_id, group_id)
+
+    if mode == "delta":
+        counters = _group_counters(db, group_id)
+        return group_schema.GroupCourseDelta(
+            groupId=group_id,
+            course=group_schema.GroupCourseInfo(courseId=course_id, title=course_title),
+            linked=linked,
+            newlyEnrolled=len(newly_enrolled_user_ids),
+            memberCount=counters.member_count,
+            courseCount=counters.course_count,
+        )
 
-    for uid in newly_enrolled_user_ids:
-        try:
-            send_event(
-                topic="notifications-events",
-                key=uid,
-                event_type="course_enrolled",
-                payload={
-                    "user_id": uid,
-                    "course_id": course_id,
-                    "group_id": group_id,
-                },
-            )
-        except Exception:
-            logging.exception("Failed to publish course_enrolled event for user %s", uid)
-
-    return get_group(group_id, db, current_user)
+    return _group_detail(db, group)
 
 
 @router.get(
@@ -759,7 +947,7 @@ def enroll_group_to_course(
 )
 def get_course_participants(
     course_id: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: models.User = Depends(get_admin_user),
 ):
     course = db.query(models.Course).filter(models.Course.id == course_id).first()
@@ -877,6 +1065,7 @@ def update_assignment(
     assignment.updated_at = func.now()
 
     db.add(assignment)
+    assignment_inbox.refresh(db, assignment_id=assignment_id)
     db.commit()
     db.refresh(assignment)
 
@@ -916,6 +1105,7 @@ def delete_assignment(
         models.AssignmentSubmission.assignment_id == assignment_id
     ).delete()
     db.delete(assignment)
+    assignment_inbox.refresh(db, assignment_id=assignment_id)
     db.commit()
     return None
 
@@ -938,79 +1128,25 @@ def update_course(
     db_course.image_url = course_update.imageUrl
     db_course.estimated_minutes = course_update.estimatedMinutes
     db_course.updated_at = func.now()
+    db.flush()
 
-    existing_chapters = {str(ch.id): ch for ch in db_course.chapters}
-
-    updated_chapter_ids = []
-
-    for i, chapter_data in enumerate(course_update.chapters):
-        chapter_id = getattr(chapter_data, "id", None)
-
-        if chapter_id and chapter_id in existing_chapters:
-            db_chapter = existing_chapters[chapter_id]
-            db_chapter.title = chapter_data.title
-            db_chapter.content = chapter_data.content
-            db_chapter.order = i
-
-            existing_quizzes = {str(q.id): q for q in db_chapter.quizzes}
-            updated_quiz_ids = []
-
-            for quiz_data in chapter_data.quiz:
-                quiz_id = getattr(quiz_data, "id", None)
-
-                if quiz_id and quiz_id in existing_quizzes:
-                    db_quiz = existing_quizzes[quiz_id]
-                    db_quiz.question = quiz_data.question
-                    db_quiz.options = quiz_data.options
-                    db_quiz.correct_option = quiz_data.correctOption
-                    db_quiz.question_type = getattr(quiz_data, "type", "choice")
-                else:
-                    db_quiz = models.Quiz(
-                        chapter_id=db_chapter.id,
-                        question=quiz_data.question,
-                        options=quiz_data.options,
-                        correct_option=quiz_data.correctOption,
-                        question_type=getattr(quiz_data, "type", "choice"),
-                    )
-                    db.add(db_quiz)
-
-                if quiz_id:
-                    updated_quiz_ids.append(quiz_id)
-
-        else:
-            db_chapter = models.Chapter(
-                course_id=db_course.id,
-                title=chapter_data.title,
-                content=chapter_data.content,
-                order=i
-            )
-            db.add(db_chapter)
-            db.flush()
-
-            for quiz_data in chapter_data.quiz:
-                db_quiz = models.Quiz(
-                    chapter_id=db_chapter.id,
-                    question=quiz_data.question,
-                    options=quiz_data.options,
-                    correct_option=quiz_data.correctOption,
-                    question_type=getattr(quiz_data, "type", "choice"),
-                )
-                db.add(db_quiz)
-                db.add(db_quiz)
-
-        if chapter_id:
-            updated_chapter_ids.append(chapter_id)
-
-    for chapter_id, chapter in existing_chapters.items():
-        if chapter_id not in updated_chapter_ids:
-            db.query(models.UserProgress).filter(models.UserProgress.chapter_id == chapter.id).delete()
-            db.delete(chapter)
+    existing_chapters, existing_quizzes = course_diff.load_course_content(db, course_id)
+    diff = course_diff.diff_course(existing_chapters, existing_quizzes, course_update.chapters)
+    course_diff.apply_course_diff(db, course_id, diff)
 
     db.commit()
-    db.refresh(db_course)
+    quiz_grading.invalidate_course(course_id)
+
+    db_course = (
+        db.query(models.Course)
+        .options(selectinload(models.Course.chapters).selectinload(models.Chapter.quizzes))
+        .populate_existing()
+        .filter(models.Course.id == course_id)
+        .first()
+    )
 
     formatted_chapters = []
-    for chapter in db_course.chapters:
+    for chapter in sorted(db_course.chapters, key=lambda ch: ch.order):
         formatted_quizzes = [
             {
                 "id": quiz.id,
@@ -1044,9 +1180,15 @@ def update_course(
 @router.delete("/courses/{course_id}")
 def delete_course(
     course_id: str,
+    background: bool = Query(False),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_admin_user)
 ):
+    """Delete a course with its chapters, assignments, progress and links.
+
+    ``background=true`` queues a chunked deletion job and answers 202 with
+    the job handle instead of deleting inside this request.
+    """
     db_course = db.query(models.Course).filter(models.Course.id == course_id).first()
     if not db_course:
         raise HTTPException(
@@ -1054,46 +1196,24 @@ def delete_course(
             detail="Course not found"
         )
 
-    assignment_ids = [
-        row[0]
-        for row in db.query(models.Assignment.id).filter(
-            models.Assignment.course_id == course_id
+    if background:
+        job = jobs.enqueue(
+            db,
+            admin_jobs.DELETE_COURSE,
+            {"course_id": course_id},
+            key=course_id,
+            created_by=current_user.id,
         )
-    ]
-    if assignment_ids:
-        db.query(models.AssignmentSubmission).filter(
-            models.AssignmentSubmission.assignment_id.in_(assignment_ids)
-        ).delete(synchronize_session=False)
-        db.query(models.Assignment).filter(
-            models.Assignment.id.in_(assignment_ids)
-        ).delete(synchronize_session=False)
-
-    db.query(models.UserProgress).filter(
-        models.UserProgress.course_id == course_id
-    ).delete(synchronize_session=False)
-
-    db.query(models.Enrollment).filter(
-        models.Enrollment.course_id == course_id
-    ).delete(synchronize_session=False)
-
-    db.query(models.GroupCourse).filter(
-        models.GroupCourse.course_id == course_id
-    ).delete(synchronize_session=False)
-
-    db.query(models.Notification).filter(
-        models.Notification.entity_type == "course",
-        models.Notification.entity_id == course_id,
-    ).delete(synchronize_session=False)
-
-    db.delete(db_course)
-    db.commit()
+        return _job_accepted(job)
+
+    admin_jobs.delete_course_inline(db, db_course)
 
     return {"message": "Course deleted successfully"}
 
 
 @router.get("/analytics", response_model=user_schema.AdminAnalyticsOverview)
 def get_admin_analytics(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: models.User = Depends(get_admin_user),
 ):
     total_users = db.query(models.User).count()
@@ -1111,23 +1231,39 @@ def get_admin_analytics(
         .count()
     )
 
-    courses = db.query(models.Course).all()
+    enrollment_counts = (
+        db.query(models.Enrollment.course_id, func.count(models.Enrollment.id).label("total"))
+        .group_by(models.Enrollment.course_id)
+        .subquery()
+    )
+    chapter_counts = (
+        db.query(models.Chapter.course_id, func.count(models.Chapter.id).label("total"))
+        .group_by(models.Chapter.course_id)
+        .subquery()
+    )
+    completed_counts = (
+        db.query(models.UserProgress.course_id, func.count(models.UserProgress.id).label("total"))
+        .filter(models.UserProgress.completed == True)
+        .group_by(models.UserProgress.course_id)
+        .subquery()
+    )
+    courses = (
+        db.query(
+            models.Course.id,
+            models.Course.title,
+            func.coalesce(enrollment_counts.c.total, 0),
+            func.coalesce(chapter_counts.c.total, 0),
+            func.coalesce(completed_counts.c.total, 0),
+        )
+        .outerjoin(enrollment_counts, enrollment_counts.c.course_id == models.Course.id)
+        .outerjoin(chapter_counts, chapter_counts.c.course_id == models.Course.id)
+        .outerjoin(completed_counts, completed_counts.c.course_id == models.Course.id)
+        .all()
+    )
     course_stats: List[user_schema.AdminCourseAnalytics] = []
     completion_rates: List[float] = []
 
-    for course in courses:
-        enrollments_count = len(course.enrollments)
-        chapters_count = len(course.chapters)
-
-        completed_chapters = (
-            db.query(models.UserProgress)
-            .filter(
-                models.UserProgress.course_id == course.id,
-                models.UserProgress.completed == True,
-            )
-            .count()
-        )
-
+    for course_id, title, enrollments_count, chapters_count, completed_chapters in courses:
         denominator = chapters_count * enrollments_count if chapters_count and enrollments_count else 0
         completion_rate = (completed_chapters / denominator * 100.0) if denominator else 0.0
 
@@ -1136,8 +1272,8 @@ def get_admin_analytics(
 
         course_stats.append(
             user_schema.AdminCourseAnalytics(
-                courseId=course.id,
-                title=course.title,
+                courseId=course_id,
+                title=title,
                 totalEnrollments=enrollments_count,
                 completionRate=round(completion_rate, 2),
             )
@@ -1169,7 +1305,7 @@ def get_admin_analytics(
 )
 def get_course_users_analytics(
     course_id: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: models.User = Depends(get_admin_user),
 ):
     course = (
@@ -1275,3 +1411,169 @@ def get_course_users_analytics(
         totalChapters=total_chapters,
         users=users_progress,
     )
+
+
+@router.get(
+    "/analytics/groups/{group_id}/matrix",
+    response_model=user_schema.AdminCohortMatrix,
+)
+def get_group_progress_matrix(
+    group_id: str,
+    format: str = Query("json"),
+    db: Session = Depends(get_read_db),
+    current_user: models.User = Depends(get_admin_user),
+):
+    """Progress, quiz and assignment stats for every member × linked course.
+
+    All cells come from one grouped aggregation; ``format=csv`` streams one
+    line per member and course straight from a server-side cursor.
+    """
+    if format not in ("json", "csv"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="format must be json or csv",
+        )
+    group = _get_group_or_404(db, group_id)
+
+    if format == "json":
+        return JSONResponse(content=cohort_matrix.build_matrix(db, group))
+
+    def rows():
+        try:
+            yield from cohort_matrix.iter_cells(db, group_id, MATRIX_EXPORT_BATCH_SIZE)
+        finally:
+            db.close()
+
+    return StreamingResponse(
+        csv_chunks(cohort_matrix.MATRIX_FIELDS, rows(), MATRIX_EXPORT_BATCH_SIZE),
+        media_type="text/csv; charset=utf-8",
+        headers={
+            "Content-Disposition": f'attachment; filename="group-{group_id}-matrix.csv"'
+        },
+    )
+
+
+@router.get(
+    "/analytics/courses/{course_id}/quizzes",
+    response_model=user_schema.AdminCourseQuizAnalytics,
+)
+def get_course_quiz_analytics(
+    course_id: str,
+    db: Session = Depends(get_read_db),
+    current_user: models.User = Depends(get_admin_user),
+):
+    course = (
+        db.query(models.Course)
+        .filter(models.Course.id == course_id)
+        .first()
+    )
+    if not course:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Course not found",
+        )
+
+    rows = (
+        db.query(
+            models.Chapter.id,
+            models.Chapter.title,
+            models.Chapter.order,
+            models.QuizChapterStats.attempts,
+            models.QuizChapterStats.passed,
+            models.QuizChapterStats.score_sum,
+        )
+        .outerjoin(
+            models.QuizChapterStats,
+            models.QuizChapterStats.chapter_id == models.Chapter.id,
+        )
+        .filter(models.Chapter.course_id == course_id)
+        .order_by(models.Chapter.order.asc())
+        .all()
+    )
+
+    chapters: List[user_schema.AdminChapterQuizStats] = []
+    for chapter_id, title, order, attempts, passed, score_sum in rows:
+        attempts = attempts or 0
+        chapters.append(
+            user_schema.AdminChapterQuizStats(
+                chapterId=chapter_id,
+                title=title,
+                order=order,
+                attempts=attempts,
+                passRate=round(passed / attempts * 100.0, 2) if attempts else 0.0,
+                averageScore=round(score_sum / attempts, 2) if attempts else 0.0,
+            )
+        )
+
+    return user_schema.AdminCourseQuizAnalytics(
+        courseId=course.id,
+        title=course.title,
+        chapters=chapters,
+    )
+
+
+@router.get(
+    "/analytics/chapters/{chapter_id}/items",
+    response_model=user_schema.AdminChapterItemAnalysis,
+)
+def get_chapter_item_analysis(
+    chapter_id: str,
+    db: Session = Depends(get_read_db),
+    current_user: models.User = Depends(get_admin_user),
+):
+    row = (
+        db.query(models.Chapter, models.QuizChapterStats)
+        .outerjoin(
+            models.QuizChapterStats,
+            models.QuizChapterStats.chapter_id == models.Chapter.id,
+        )
+        .filter(models.Chapter.id == chapter_id)
+        .first()
+    )
+    if not row:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Chapter not found",
+        )
+    chapter, chapter_stats = row
+
+    item_rows = (
+        db.query(models.Quiz.id, models.Quiz.question, models.QuizQuestionStats)
+        .outerjoin(
+            models.QuizQuestionStats,
+            models.QuizQuestionStats.quiz_id == models.Quiz.id,
+        )
+        .filter(models.Quiz.chapter_id == chapter_id)
+        .order_by(models.Quiz.created_at.asc())
+        .all()
+    )
+
+    items: List[user_schema.AdminQuizItemStats] = []
+    for quiz_id, question, stats in item_rows:
+        if stats is None:
+            items.append(
+                user_schema.AdminQuizItemStats(quizId=quiz_id, question=question, attempts=0)
+            )
+            continue
+
+        item_difficulty = quiz_analytics.difficulty(stats)
+        item_discrimination = quiz_analytics.discrimination(stats)
+        items.append(
+            user_schema.AdminQuizItemStats(
+                quizId=quiz_id,
+                question=question,
+                attempts=stats.attempts,
+                difficulty=round(item_difficulty, 4) if item_difficulty is not None else None,
+                discrimination=round(item_discrimination, 4) if item_discrimination is not None else None,
+            )
+        )
+
+    attempts = chapter_stats.attempts if chapter_stats else 0
+    return user_schema.AdminChapterItemAnalysis(
+        chapterId=chapter.id,
+        title=chapter.title,
+        attempts=attempts,
+        passRate=round(chapter_stats.passed / attempts * 100.0, 2) if attempts else 0.0,
+        averageScore=round(chapter_stats.score_sum / attempts, 2) if attempts else 0.0,
+        items=items,
+    )
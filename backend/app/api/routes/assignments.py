@@ -1,17 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List
+import logging
+import os
+from urllib.parse import quote
+
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile, status
+from fastapi.responses import RedirectResponse, StreamingResponse
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import func, literal, select, true, union
+from typing import List, Optional
 
 from app.db.database import get_db
+from app.db.replicas import get_read_db
 from app.db import models
 from app.schemas import assignment as assignment_schema
 from app.core.security import get_current_active_user, get_admin_user
-from app.core.kafka_producer import send_event
+from app.core.kafka_producer import send_event, send_events
+from app.core import assignment_inbox, attachments, enrollment_cache, file_storage
+from app.core.grading import GradeChange, apply_grades
+from app.core.pagination import after_nullable_key, before_key, decode_cursor, encode_cursor
+from app.core.range_response import RangeFileResponse, RangeNotSatisfiable, parse_range
+from app.core.streaming import csv_chunks, ndjson_chunks
 
 
 router = APIRouter()
 
+EXPORT_BATCH_SIZE = 1000
+
 
 @router.get(
     "/assignments/{assignment_id}",
@@ -67,15 +80,7 @@ def create_submission(
             detail="Задание не найдено",
         )
 
-    enrollment = (
-        db.query(models.Enrollment)
-        .filter(
-            models.Enrollment.user_id == current_user.id,
-            models.Enrollment.course_id == assignment.course_id,
-        )
-        .first()
-    )
-    if not enrollment:
+    if not enrollment_cache.is_enrolled(db, current_user.id, assignment.course_id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Чтобы сдавать это задание, нужно быть записанным на курс",
@@ -100,9 +105,10 @@ def create_submission(
         user_id=current_user.id,
         repository_url=payload.repositoryUrl,
         text_answer=payload.textAnswer,
-        attachments=payload.attachments,
+        attachments=attachments.normalize_attachments(db, payload.attachments),
     )
     db.add(submission)
+    assignment_inbox.refresh(db, user_ids=[current_user.id], assignment_id=assignment_id)
     db.commit()
     db.refresh(submission)
 
@@ -123,61 +129,192 @@ def create_submission(
     )
 
 
-@router.get(
-    "/assignments/{assignment_id}/submissions",
-    response_model=List[assignment_schema.SubmissionSummary],
+SUBMISSION_EXPORT_FIELDS = (
+    "submissionId",
+    "userId",
+    "userName",
+    "userEmail",
+    "createdAt",
+    "grade",
+    "feedback",
+    "gradedAt",
+    "gradedBy",
 )
-def list_submissions_for_assignment(
-    assignment_id: str,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_admin_user),
-):
-    assignment = (
-        db.query(models.Assignment)
-        .filter(models.Assignment.id == assignment_id)
-        .first()
-    )
+
+
+def _get_assignment_or_404(db: Session, assignment_id: str) -> models.Assignment:
+    assignment = db.get(models.Assignment, assignment_id)
     if not assignment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Задание не найдено",
         )
+    return assignment
 
-    rows = (
+
+def _submissions_query(
+    db: Session,
+    assignment_id: str,
+    status_filter: Optional[str],
+    group_id: Optional[str],
+):
+    query = (
         db.query(
             models.AssignmentSubmission.id,
             models.AssignmentSubmission.assignment_id,
             models.AssignmentSubmission.user_id,
             models.User.name,
+            models.User.email,
             models.AssignmentSubmission.created_at,
             models.AssignmentSubmission.grade,
             models.AssignmentSubmission.feedback,
             models.AssignmentSubmission.graded_at,
+            models.AssignmentSubmission.graded_by,
         )
         .join(
             models.User,
             models.User.id == models.AssignmentSubmission.user_id,
         )
         .filter(models.AssignmentSubmission.assignment_id == assignment_id)
-        .order_by(models.AssignmentSubmission.created_at.desc())
-        .all()
     )
 
+    if status_filter == "graded":
+        query = query.filter(models.AssignmentSubmission.graded_at.isnot(None))
+    elif status_filter == "ungraded":
+        query = query.filter(models.AssignmentSubmission.graded_at.is_(None))
+    elif status_filter:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="status_filter должен быть graded или ungraded",
+        )
+
+    if group_id:
+        query = query.filter(
+            models.AssignmentSubmission.user_id.in_(
+                select(models.GroupMember.user_id).where(
+                    models.GroupMember.group_id == group_id
+                )
+            )
+        )
+
+    return query.order_by(
+        models.AssignmentSubmission.created_at.desc(),
+        models.AssignmentSubmission.id.desc(),
+    )
+
+
+@router.get(
+    "/assignments/{assignment_id}/submissions",
+    response_model=List[assignment_schema.SubmissionSummary],
+)
+def list_submissions_for_assignment(
+    assignment_id: str,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    cursor: Optional[str] = Query(None),
+    status_filter: Optional[str] = Query(None),
+    group_id: Optional[str] = Query(None),
+    db: Session = Depends(get_read_db),
+    current_user: models.User = Depends(get_admin_user),
+):
+    """List submissions newest first.
+
+    With ``limit`` the list is a keyset page and the cursor for the next page
+    is returned in the ``X-Next-Cursor`` header; without it all rows are
+    returned as before.
+    """
+    _get_assignment_or_404(db, assignment_id)
+    after = decode_cursor(cursor, 2)
+
+    query = _submissions_query(db, assignment_id, status_filter, group_id)
+    if after is not None:
+        query = query.filter(
+            before_key(
+                models.AssignmentSubmission.created_at,
+                models.AssignmentSubmission.id,
+                *after,
+            )
+        )
+    if limit is not None:
+        query = query.limit(limit + 1)
+    rows = query.all()
+
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(
+            [rows[-1].created_at, rows[-1].id]
+        )
+
     return [
         assignment_schema.SubmissionSummary(
-            id=row[0],
-            assignmentId=row[1],
-            userId=row[2],
-            userName=row[3],
-            createdAt=row[4],
-            grade=row[5],
-            feedback=row[6],
-            gradedAt=row[7],
+            id=row.id,
+            assignmentId=row.assignment_id,
+            userId=row.user_id,
+            userName=row.name,
+            createdAt=row.created_at,
+            grade=row.grade,
+            feedback=row.feedback,
+            gradedAt=row.graded_at,
         )
         for row in rows
     ]
 
 
+@router.get("/assignments/{assignment_id}/submissions/export")
+def export_submissions_for_assignment(
+    assignment_id: str,
+    format: str = Query("csv"),
+    status_filter: Optional[str] = Query(None),
+    group_id: Optional[str] = Query(None),
+    db: Session = Depends(get_read_db),
+    current_user: models.User = Depends(get_admin_user),
+):
+    """Stream grades and feedback as CSV or NDJSON.
+
+    Rows are fetched in batches from a server-side cursor and written out as
+    they arrive, so memory stays flat regardless of the cohort size.
+    """
+    if format not in ("csv", "ndjson"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="format должен быть csv или ndjson",
+        )
+    _get_assignment_or_404(db, assignment_id)
+    query = _submissions_query(db, assignment_id, status_filter, group_id)
+
+    def rows():
+        try:
+            for row in query.yield_per(EXPORT_BATCH_SIZE):
+                yield {
+                    "submissionId": row.id,
+                    "userId": row.user_id,
+                    "userName": row.name,
+                    "userEmail": row.email,
+                    "createdAt": row.created_at,
+                    "grade": row.grade,
+                    "feedback": row.feedback,
+                    "gradedAt": row.graded_at,
+                    "gradedBy": row.graded_by,
+                }
+        finally:
+            db.close()
+
+    if format == "csv":
+        body = csv_chunks(SUBMISSION_EXPORT_FIELDS, rows(), EXPORT_BATCH_SIZE)
+        media_type = "text/csv; charset=utf-8"
+    else:
+        body = ndjson_chunks(rows(), EXPORT_BATCH_SIZE)
+        media_type = "application/x-ndjson"
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="submissions-{assignment_id}.{format}"'
+        },
+    )
+
+
 @router.get(
     "/assignments/{assignment_id}/submissions/{submission_id}",
     response_model=assignment_schema.SubmissionDetail,
@@ -231,6 +368,122 @@ def get_submission(
     )
 
 
+@router.post(
+    "/assignments/{assignment_id}/attachments",
+    status_code=status.HTTP_201_CREATED,
+    response_model=assignment_schema.AttachmentMeta,
+)
+def upload_attachment(
+    assignment_id: str,
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user),
+):
+    """Store an uploaded file by content hash and return the metadata to attach.
+
+    The body is copied to storage in chunks while it is hashed, so files are
+    never held in memory whole; identical content is stored once.
+    """
+    assignment = _get_assignment_or_404(db, assignment_id)
+    if current_user.role != "admin" and not enrollment_cache.is_enrolled(
+        db, current_user.id, assignment.course_id
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Чтобы сдавать это задание, нужно быть записанным на курс",
+        )
+
+    try:
+        blob = file_storage.get_storage().save_stream(file.file)
+    except file_storage.FileTooLarge:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="Файл слишком большой",
+        )
+
+    attachments.record_blob(db, blob)
+    db.commit()
+
+    return assignment_schema.AttachmentMeta(
+        sha256=blob.sha256,
+        filename=file.filename,
+        size=blob.size,
+        contentType=file.content_type,
+    )
+
+
+@router.get("/assignments/{assignment_id}/submissions/{submission_id}/attachments/{sha256}")
+def download_attachment(
+    assignment_id: str,
+    submission_id: str,
+    sha256: str,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user),
+):
+    submission = (
+        db.query(models.AssignmentSubmission.user_id, models.AssignmentSubmission.attachments)
+        .filter(
+            models.AssignmentSubmission.id == submission_id,
+            models.AssignmentSubmission.assignment_id == assignment_id,
+        )
+        .first()
+    )
+    if not submission:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Работа не найдена",
+        )
+
+    if current_user.role != "admin" and submission.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Нет доступа к этой работе",
+        )
+
+    attachment = attachments.find_attachment(submission.attachments, sha256)
+    storage = file_storage.get_storage()
+    if attachment is None or not storage.exists(sha256):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Вложение не найдено",
+        )
+
+    # Content is addressed by its hash, so the hash is a strong, permanent ETag.
+    etag = f'"{sha256}"'
+    headers = {
+        "etag": etag,
+        "cache-control": "private, max-age=31536000, immutable",
+    }
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    url = storage.download_url(sha256)
+    if url is not None:
+        return RedirectResponse(url)
+
+    path = storage.local_path(sha256)
+    size = os.path.getsize(path)
+    filename = attachment.get("filename") or sha256
+    headers["content-disposition"] = f"attachment; filename*=utf-8''{quote(filename)}"
+
+    try:
+        byte_range = parse_range(request.headers.get("range"), size)
+    except RangeNotSatisfiable:
+        return Response(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            headers={"content-range": f"bytes */{size}"},
+        )
+
+    return RangeFileResponse(
+        path,
+        size,
+        byte_range=byte_range,
+        headers=headers,
+        media_type=attachment.get("contentType"),
+    )
+
+
 @router.post(
     "/assignments/{assignment_id}/submissions/{submission_id}/grade",
     response_model=assignment_schema.SubmissionDetail,
@@ -305,97 +558,205 @@ def grade_submission(
     )
 
 
+@router.post(
+    "/assignments/{assignment_id}/submissions/bulk-grade",
+    response_model=assignment_schema.BulkGradeResponse,
+)
+def bulk_grade_submissions(
+    assignment_id: str,
+    payload: assignment_schema.BulkGradeRequest,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_admin_user),
+):
+    """Grade many submissions of one assignment with a single UPDATE.
+
+    Each item gets its own status: ``graded``, ``not_found`` when the
+    submission does not belong to the assignment, or ``duplicate`` for a
+    repeated submission ID (the first occurrence wins).
+    """
+    course_id = _get_assignment_or_404(db, assignment_id).course_id
+
+    changes: List[GradeChange] = []
+    seen = set()
+    for item in payload.items:
+        if item.submissionId in seen:
+            continue
+        seen.add(item.submissionId)
+        changes.append(GradeChange(item.submissionId, item.grade, item.feedback))
+
+    graded = apply_grades(db, assignment_id, current_user.id, changes)
+    db.commit()
+
+    try:
+        send_events(
+            topic="notifications-events",
+            event_type="assignment_graded",
+            events=[
+                (
+                    graded[change.submission_id].user_id,
+                    {
+                        "user_id": graded[change.submission_id].user_id,
+                        "assignment_id": assignment_id,
+                        "course_id": course_id,
+                        "grade": change.grade,
+                        "feedback": change.feedback,
+                        "graded_by": current_user.id,
+                    },
+                )
+                for change in changes
+                if change.submission_id in graded
+            ],
+        )
+    except Exception:
+        logging.exception("Failed to publish assignment_graded events")
+
+    results: List[assignment_schema.BulkGradeResult] = []
+    reported = set()
+    for item in payload.items:
+        if item.submissionId in reported:
+            item_status = "duplicate"
+        elif item.submissionId in graded:
+            item_status = "graded"
+        else:
+            item_status = "not_found"
+        reported.add(item.submissionId)
+        results.append(
+            assignment_schema.BulkGradeResult(submissionId=item.submissionId, status=item_status)
+        )
+
+    return assignment_schema.BulkGradeResponse(graded=len(graded), items=results)
+
+
 @router.get(
     "/users/me/assignments",
     response_model=assignment_schema.MyAssignmentsResponse,
 )
 def get_my_assignments(
+    limit: Optional[int] = Query(None, ge=1, le=200),
+    cursor: Optional[str] = Query(None),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_active_user),
 ):
-    assignments = (
-        db.query(
-            models.Assignment.id,
-            models.Assignment.title,
-            models.Assignment.course_id,
-            models.Course.title,
+    after = decode_cursor(cursor, 2)
+
+    if assignment_inbox.ENABLED:
+        query, due_date_column, id_column = _my_assignments_from_inbox(db, current_user.id)
+    else:
+        query, due_date_column, id_column = _my_assignments_from_enrollments(db, current_user.id)
+
+    if after is not None:
+        query = query.filter(after_nullable_key(due_date_column, id_column, *after))
+
+    query = query.order_by(due_date_column.asc().nulls_last(), id_column.asc())
+    if limit is not None:
+        query = query.limit(limit + 1)
+    rows = query.all()
+
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([rows[-1].due_date, rows[-1].assignment_id])
+
+    items = [
+        assignment_schema.MyAssignmentWork(
+            assignmentId=row.assignment_id,
+            assignmentTitle=row.assignment_title,
+            courseId=row.course_id,
+            courseTitle=row.course_title,
+            dueDate=row.due_date,
+            latestSubmissionId=row.submission_id,
+            latestCreatedAt=row.submission_created_at,
+            grade=row.grade,
+            feedback=row.feedback,
+            gradedAt=row.graded_at,
         )
-        .join(models.Course, models.Course.id == models.Assignment.course_id)
-        .all()
-    )
-    if not assignments:
-        return assignment_schema.MyAssignmentsResponse(items=[])
+        for row in rows
+    ]
 
-    assignment_ids = [row[0] for row in assignments]
+    return assignment_schema.MyAssignmentsResponse(items=items, nextCursor=next_cursor)
 
-    subquery_latest = (
-        db.query(
-            models.AssignmentSubmission.assignment_id.label("assignment_id"),
-            func.max(models.AssignmentSubmission.created_at).label(
-                "latest_created_at"
-            ),
+
+def _my_assignments_from_enrollments(db: Session, user_id: str):
+    # Candidate assignments come from the user's own enrollments and
+    # submissions, so cost follows the user's courses, not the platform size.
+    assignment_ids = union(
+        select(models.Assignment.id)
+        .join(models.Enrollment, models.Enrollment.course_id == models.Assignment.course_id)
+        .where(models.Enrollment.user_id == user_id),
+        select(models.AssignmentSubmission.assignment_id)
+        .where(models.AssignmentSubmission.user_id == user_id),
+    )
+
+    if db.get_bind().dialect.name == "postgresql":
+        latest = (
+            select(
+                models.AssignmentSubmission.id,
+                models.AssignmentSubmission.created_at,
+                models.AssignmentSubmission.grade,
+                models.AssignmentSubmission.feedback,
+                models.AssignmentSubmission.graded_at,
+            )
+            .where(
+                models.AssignmentSubmission.assignment_id == models.Assignment.id,
+                models.AssignmentSubmission.user_id == user_id,
+            )
+            .order_by(
+                models.AssignmentSubmission.created_at.desc(),
+                models.AssignmentSubmission.id.desc(),
+            )
+            .limit(1)
+            .lateral("latest_submission")
         )
-        .filter(models.AssignmentSubmission.user_id == current_user.id)
-        .filter(
-            models.AssignmentSubmission.assignment_id.in_(assignment_ids)
+        submission = latest.c
+        submission_join = true()
+    else:
+        latest = aliased(models.AssignmentSubmission, name="latest_submission")
+        submission = latest
+        submission_join = latest.id == assignment_inbox.latest_submission_id(
+            literal(user_id), models.Assignment.id
         )
-        .group_by(models.AssignmentSubmission.assignment_id)
-        .subquery()
-    )
 
-    rows = (
+    query = (
         db.query(
-            models.Assignment.id,
-            models.Assignment.title,
-            models.Assignment.course_id,
-            models.Course.title,
-            models.AssignmentSubmission.id,
-            models.AssignmentSubmission.created_at,
-            models.AssignmentSubmission.grade,
-            models.AssignmentSubmission.feedback,
-            models.AssignmentSubmission.graded_at,
+            models.Assignment.id.label("assignment_id"),
+            models.Assignment.title.label("assignment_title"),
+            models.Assignment.course_id.label("course_id"),
+            models.Course.title.label("course_title"),
+            models.Assignment.due_date.label("due_date"),
+            submission.id.label("submission_id"),
+            submission.created_at.label("submission_created_at"),
+            submission.grade.label("grade"),
+            submission.feedback.label("feedback"),
+            submission.graded_at.label("graded_at"),
         )
         .join(models.Course, models.Course.id == models.Assignment.course_id)
-        .outerjoin(
-            subquery_latest,
-            subquery_latest.c.assignment_id == models.Assignment.id,
+        .outerjoin(latest, submission_join)
+        .filter(models.Assignment.id.in_(assignment_ids))
+    )
+    return query, models.Assignment.due_date, models.Assignment.id
+
+
+def _my_assignments_from_inbox(db: Session, user_id: str):
+    inbox = models.UserAssignmentInbox
+    query = (
+        db.query(
+            inbox.assignment_id.label("assignment_id"),
+            models.Assignment.title.label("assignment_title"),
+            inbox.course_id.label("course_id"),
+            models.Course.title.label("course_title"),
+            inbox.due_date.label("due_date"),
+            models.AssignmentSubmission.id.label("submission_id"),
+            models.AssignmentSubmission.created_at.label("submission_created_at"),
+            models.AssignmentSubmission.grade.label("grade"),
+            models.AssignmentSubmission.feedback.label("feedback"),
+            models.AssignmentSubmission.graded_at.label("graded_at"),
         )
+        .join(models.Assignment, models.Assignment.id == inbox.assignment_id)
+        .join(models.Course, models.Course.id == inbox.course_id)
         .outerjoin(
             models.AssignmentSubmission,
-            (models.AssignmentSubmission.assignment_id == models.Assignment.id)
-            & (
-                models.AssignmentSubmission.created_at
-                == subquery_latest.c.latest_created_at
-            ),
-        )
-        .filter(
-            (subquery_latest.c.assignment_id != None)
-            | (
-                models.Assignment.course_id.in_(
-                    db.query(models.Enrollment.course_id).filter(
-                        models.Enrollment.user_id == current_user.id
-                    )
-                )
-            )
+            models.AssignmentSubmission.id == inbox.latest_submission_id,
         )
-        .all()
+        .filter(inbox.user_id == user_id)
     )
-
-    items: List[assignment_schema.MyAssignmentWork] = []
-
-    for row in rows:
-        items.append(
-            assignment_schema.MyAssignmentWork(
-                assignmentId=row[0],
-                assignmentTitle=row[1],
-                courseId=row[2],
-                courseTitle=row[3],
-                latestSubmissionId=row[4],
-                latestCreatedAt=row[5],
-                grade=row[6],
-                feedback=row[7],
-                gradedAt=row[8],
-            )
-        )
-
-    return assignment_schema.MyAssignmentsResponse(items=items)
+    return query, inbox.due_date, inbox.assignment_id
@@ -7,6 +7,7 @@ from datetime import timedelta
 from app.db.database import get_db
 from app.db import models
 from app.schemas import user as user_schema
+from app.core import row_counts
 from app.core.security import (
     get_password_hash,
     verify_password,
@@ -35,6 +36,7 @@ def register(user_data: user_schema.UserCreate, db: Session = Depends(get_db)):
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
+    row_counts.invalidate("users")
     
     # Create access token
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -1,18 +1,45 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.orm import Session, joinedload, selectinload
 from typing import List, Optional
 from collections import defaultdict
 from app.db.database import get_db
+from app.db.replicas import get_read_db
 from app.db import models
 from app.schemas import course as course_schema
 from app.schemas import assignment as assignment_schema
 from app.core.security import get_current_active_user, get_optional_user
-from sqlalchemy import func
+from app.core import assignment_inbox, enrollment_cache, quiz_analytics, quiz_grading
+from app.core.progress import record_progress
 from app.core.kafka_producer import send_event
 import logging
 
 router = APIRouter()
 
+
+def _ensure_enrolled(
+    db: Session,
+    current_user: models.User,
+    course_id: str,
+    detail: str = "You must be enrolled in this course",
+) -> None:
+    if enrollment_cache.is_enrolled(db, current_user.id, course_id):
+        return
+
+    course_exists = db.query(
+        db.query(models.Course.id).filter(models.Course.id == course_id).exists()
+    ).scalar()
+    if not course_exists:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Course not found"
+        )
+
+    raise HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail=detail
+    )
+
+
 @router.post("/{course_id}/participate", response_model=course_schema.EnrollmentResponse)
 def participate_in_course(
     course_id: str,
@@ -27,12 +54,7 @@ def participate_in_course(
             detail="Course not found"
         )
     
-    existing_enrollment = db.query(models.Enrollment).filter(
-        models.Enrollment.user_id == current_user.id,
-        models.Enrollment.course_id == course_id
-    ).first()
-    
-    if existing_enrollment:
+    if enrollment_cache.is_enrolled(db, current_user.id, course_id):
         return {
             "success": True,
             "message": "You are already participating in this course"
@@ -49,6 +71,7 @@ def participate_in_course(
         course_id=course.id
     )
     db.add(new_enrollment)
+    assignment_inbox.refresh(db, user_ids=[current_user.id], course_id=course.id)
     db.commit()
 
     try:
@@ -71,7 +94,7 @@ def participate_in_course(
 
 @router.get("/", response_model=List[course_schema.CourseResponse])
 def get_all_courses(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: Optional[models.User] = Depends(get_optional_user),
 ):
     courses = db.query(models.Course).options(
@@ -81,18 +104,14 @@ def get_all_courses(
     if not courses:
         return []
 
-    enrollment_by_course_id = {}
+    enrolled_course_ids = frozenset()
     completed_chapters_by_course_id = defaultdict(int)
     completed_chapter_ids = set()
 
     if current_user:
         course_ids = [course.id for course in courses]
 
-        enrollments = db.query(models.Enrollment).filter(
-            models.Enrollment.user_id == current_user.id,
-            models.Enrollment.course_id.in_(course_ids)
-        ).all()
-        enrollment_by_course_id = {enrollment.course_id: enrollment for enrollment in enrollments}
+        enrolled_course_ids = enrollment_cache.get_enrolled_course_ids(db, current_user.id)
 
         completed_progress = db.query(models.UserProgress).filter(
             models.UserProgress.user_id == current_user.id,
@@ -106,10 +125,10 @@ def get_all_courses(
     
     result = []
     for course in courses:
-        enrollment = enrollment_by_course_id.get(course.id) if current_user else None
+        enrolled = bool(current_user) and course.id in enrolled_course_ids
         
         progress = 0
-        if current_user and enrollment:
+        if enrolled:
             total_chapters = len(course.chapters)
             if total_chapters > 0:
                 completed_chapters = completed_chapters_by_course_id.get(course.id, 0)
@@ -144,7 +163,7 @@ def get_all_courses(
             "imageUrl": course.image_url,
             "chapters": formatted_chapters,
             "progress": progress,
-            "enrolled": bool(current_user and enrollment),
+            "enrolled": enrolled,
             "enrollmentCode": course.enrollment_code,
             "estimatedMinutes": course.estimated_minutes,
         })
@@ -153,7 +172,7 @@ def get_all_courses(
 
 @router.get("/user", response_model=List[course_schema.CourseResponse])
 def get_user_courses(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: models.User = Depends(get_current_active_user)
 ):
     return get_all_courses(db, current_user)
@@ -161,40 +180,42 @@ def get_user_courses(
 @router.get("/{course_id}", response_model=course_schema.CourseResponse)
 def get_course(
     course_id: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: models.User = Depends(get_current_active_user)
 ):
-    course = db.query(models.Course).filter(models.Course.id == course_id).first()
+    course = db.query(models.Course).options(
+        selectinload(models.Course.chapters).selectinload(models.Chapter.quizzes)
+    ).filter(models.Course.id == course_id).first()
     if not course:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Course not found"
         )
-    
-    enrollment = db.query(models.Enrollment).filter(
-        models.Enrollment.user_id == current_user.id,
-        models.Enrollment.course_id == course.id
-    ).first()
-    
-    progress = 0
-    if enrollment:
-        total_chapters = len(course.chapters)
-        if total_chapters > 0:
-            completed_chapters = db.query(models.UserProgress).filter(
+
+    enrolled = enrollment_cache.is_enrolled(db, current_user.id, course.id)
+
+    completed_chapter_ids = set()
+    if enrolled:
+        completed_chapter_ids = {
+            row[0]
+            for row in db.query(models.UserProgress.chapter_id).filter(
                 models.UserProgress.user_id == current_user.id,
                 models.UserProgress.course_id == course.id,
                 models.UserProgress.completed == True
-            ).count()
+            )
+        }
+
+    progress = 0
+    if enrolled:
+        total_chapters = len(course.chapters)
+        if total_chapters > 0:
+            completed_chapters = len(completed_chapter_ids)
             progress = int((completed_chapters / total_chapters) * 100)
-    
+
     formatted_chapters = []
     for chapter in course.chapters:
-        chapter_completed = db.query(models.UserProgress).filter(
-            models.UserProgress.user_id == current_user.id,
-            models.UserProgress.chapter_id == chapter.id,
-            models.UserProgress.completed == True
-        ).first() is not None
-        
+        chapter_completed = chapter.id in completed_chapter_ids
+
         formatted_quizzes = [
             {
                 "id": quiz.id,
@@ -221,7 +242,7 @@ def get_course(
         "imageUrl": course.image_url,
         "chapters": formatted_chapters,
         "progress": progress,
-        "enrolled": enrollment is not None,
+        "enrolled": enrolled,
         "enrollmentCode": course.enrollment_code if current_user.role == "admin" else None,
         "estimatedMinutes": course.estimated_minutes,
     }
@@ -248,15 +269,7 @@ def list_assignments_for_course_for_user(
         )
 
     if current_user.role != "admin":
-        enrollment = (
-            db.query(models.Enrollment)
-            .filter(
-                models.Enrollment.course_id == course_id,
-                models.Enrollment.user_id == current_user.id,
-            )
-            .first()
-        )
-        if not enrollment:
+        if not enrollment_cache.is_enrolled(db, current_user.id, course_id):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Нужно быть записанным на курс",
@@ -288,41 +301,41 @@ def get_chapter(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_active_user)
 ):
-    course = db.query(models.Course).filter(models.Course.id == course_id).first()
-    if not course:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Course not found"
+    _ensure_enrolled(
+        db,
+        current_user,
+        course_id,
+        detail="You must be enrolled in this course to access chapters",
+    )
+
+    chapter_completed = (
+        db.query(models.UserProgress.id)
+        .filter(
+            models.UserProgress.user_id == current_user.id,
+            models.UserProgress.chapter_id == models.Chapter.id,
+            models.UserProgress.completed == True
         )
-    
-    enrollment = db.query(models.Enrollment).filter(
-        models.Enrollment.user_id == current_user.id,
-        models.Enrollment.course_id == course_id
-    ).first()
-    
-    if not enrollment:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You must be enrolled in this course to access chapters"
+        .exists()
+    )
+
+    row = (
+        db.query(models.Chapter, chapter_completed.label("completed"))
+        .options(joinedload(models.Chapter.quizzes))
+        .filter(
+            models.Chapter.id == chapter_id,
+            models.Chapter.course_id == course_id
         )
-    
-    chapter = db.query(models.Chapter).filter(
-        models.Chapter.id == chapter_id,
-        models.Chapter.course_id == course_id
-    ).first()
-    
-    if not chapter:
+        .first()
+    )
+
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Chapter not found"
         )
-    
-    chapter_completed = db.query(models.UserProgress).filter(
-        models.UserProgress.user_id == current_user.id,
-        models.UserProgress.chapter_id == chapter.id,
-        models.UserProgress.completed == True
-    ).first() is not None
-    
+
+    chapter, chapter_completed = row
+
     formatted_quizzes = [
         {
             "id": quiz.id,
@@ -349,49 +362,27 @@ def complete_chapter(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_active_user)
 ):
-    enrollment = db.query(models.Enrollment).filter(
-        models.Enrollment.user_id == current_user.id,
-        models.Enrollment.course_id == course_id
-    ).first()
-    
-    if not enrollment:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You must be enrolled in this course"
-        )
-    
-    chapter = db.query(models.Chapter).filter(
-        models.Chapter.id == chapter_id,
-        models.Chapter.course_id == course_id
-    ).first()
-    
-    if not chapter:
+    _ensure_enrolled(db, current_user, course_id)
+
+    progress = record_progress(
+        db,
+        user_id=current_user.id,
+        course_id=course_id,
+        chapter_id=chapter_id,
+        completed=True,
+    )
+    if progress is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Chapter not found"
         )
-    
-    progress = db.query(models.UserProgress).filter(
-        models.UserProgress.user_id == current_user.id,
-        models.UserProgress.chapter_id == chapter_id
-    ).first()
-    
-    if progress:
-        progress.completed = True
-        progress.completed_at = func.now()
-    else:
-        progress = models.UserProgress(
-            user_id=current_user.id,
-            course_id=course_id,
-            chapter_id=chapter_id,
-            completed=True,
-            completed_at=func.now()
-        )
-        db.add(progress)
-    
+
     db.commit()
-    
-    return {"message": "Chapter marked as completed"}
+
+    return {
+        "message": "Chapter marked as completed",
+        "progress": progress.course_progress,
+    }
 
 @router.post("/{course_id}/chapters/{chapter_id}/quiz", response_model=course_schema.QuizResult)
 def submit_quiz(
@@ -401,95 +392,49 @@ def submit_quiz(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_active_user)
 ):
-    enrollment = db.query(models.Enrollment).filter(
-        models.Enrollment.user_id == current_user.id,
-        models.Enrollment.course_id == course_id
-    ).first()
-    
-    if not enrollment:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You must be enrolled in this course"
-        )
-    
-    chapter = db.query(models.Chapter).filter(
-        models.Chapter.id == chapter_id,
-        models.Chapter.course_id == course_id
-    ).first()
-    
-    if not chapter:
+    _ensure_enrolled(db, current_user, course_id)
+
+    answer_key = quiz_grading.get_answer_key(db, course_id, chapter_id)
+    if answer_key is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Chapter not found"
         )
-    
-    quizzes = db.query(models.Quiz).filter(models.Quiz.chapter_id == chapter_id).all()
-    if not quizzes:
+
+    if not answer_key.quiz_count:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="No quizzes found for this chapter"
         )
-    
-    total_questions = 0
-    correct_answers = 0
-    
-    for quiz in quizzes:
-        question_type = getattr(quiz, "question_type", "choice") or "choice"
-        answer = submission.answers.get(quiz.id)
-
-        if question_type == "choice":
-            options = quiz.options or []
-            non_empty_options = [opt for opt in options if isinstance(opt, str) and opt.strip()]
-            if len(non_empty_options) <= 1:
-                continue
-
-            total_questions += 1
-            if isinstance(answer, int) and answer == quiz.correct_option:
-                correct_answers += 1
-        elif question_type == "text":
-            options = quiz.options or []
-            correct_text = None
-            if isinstance(options, list) and options:
-                index = quiz.correct_option if 0 <= quiz.correct_option < len(options) else 0
-                correct_text = options[index]
-
-            if not correct_text:
-                continue
-
-            if isinstance(answer, str):
-                total_questions += 1
-                if answer.strip().lower() == correct_text.strip().lower():
-                    correct_answers += 1
-    
-    score = int((correct_answers / total_questions) * 100) if total_questions > 0 else 0
+
+    result = quiz_grading.grade(answer_key, submission.answers)
+    score = result.score
     passed = score >= 70
-    
-    progress = db.query(models.UserProgress).filter(
-        models.UserProgress.user_id == current_user.id,
-        models.UserProgress.chapter_id == chapter_id
-    ).first()
-    
-    if progress:
-        progress.quiz_score = score
-        if passed:
-            progress.completed = True
-            progress.completed_at = func.now()
-    else:
-        progress = models.UserProgress(
-            user_id=current_user.id,
-            course_id=course_id,
-            chapter_id=chapter_id,
-            quiz_score=score,
-            completed=passed,
-            completed_at=func.now() if passed else None
-        )
-        db.add(progress)
-    
+
+    quiz_analytics.record_attempt(
+        db,
+        user_id=current_user.id,
+        course_id=course_id,
+        chapter_id=chapter_id,
+        result=result,
+        passed=passed,
+    )
+
+    progress = record_progress(
+        db,
+        user_id=current_user.id,
+        course_id=course_id,
+        chapter_id=chapter_id,
+        completed=passed,
+        quiz_score=score,
+    )
     db.commit()
     
     return {
         "score": score,
         "passed": passed,
-        "correctAnswers": correct_answers,
-        "totalQuestions": total_questions
+        "correctAnswers": result.correct_answers,
+        "totalQuestions": result.total_questions,
+        "bestScore": progress.quiz_score if progress else score,
+        "courseProgress": progress.course_progress if progress else None,
     }
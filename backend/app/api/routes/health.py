@@ -0,0 +1,27 @@
+from fastapi import APIRouter, Depends, Request, status
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.db.database import get_db
+
+
+router = APIRouter()
+
+
+@router.get("/health/live", include_in_schema=False)
+def liveness():
+    """The process is up and serving requests; never touches the database."""
+    return {"status": "ok"}
+
+
+@router.get("/health/ready", include_in_schema=False)
+def readiness(request: Request, db: Session = Depends(get_db)):
+    """Startup finished (schema verified or migrated) and the database answers."""
+    if not getattr(request.app.state, "started", False):
+        return JSONResponse({"status": "starting"}, status_code=status.HTTP_503_SERVICE_UNAVAILABLE)
+    try:
+        db.execute(text("SELECT 1"))
+    except Exception:
+        return JSONResponse({"status": "database unavailable"}, status_code=status.HTTP_503_SERVICE_UNAVAILABLE)
+    return {"status": "ok", "schemaRevision": getattr(request.app.state, "schema_revision", None)}
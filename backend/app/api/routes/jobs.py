@@ -0,0 +1,90 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.orm import Session
+
+from app.db.database import get_db
+from app.db import models
+from app.schemas import job as job_schema
+from app.core.security import get_admin_user
+from app.core import jobs
+from app.core.pagination import before_key, decode_cursor, encode_cursor
+
+
+router = APIRouter()
+
+
+def _get_job_or_404(db: Session, job_id: str) -> models.Job:
+    job = db.query(models.Job).filter(models.Job.id == job_id).first()
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found",
+        )
+    return job
+
+
+@router.get("/jobs", response_model=List[job_schema.JobResponse])
+def list_jobs(
+    response: Response,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    type: Optional[str] = Query(None),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_admin_user),
+):
+    """Most recent jobs first; the next page's cursor is in ``X-Next-Cursor``."""
+    if status_filter and status_filter not in jobs.STATUSES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="status must be one of " + ", ".join(jobs.STATUSES),
+        )
+    query = db.query(models.Job)
+    if status_filter:
+        query = query.filter(models.Job.status == status_filter)
+    if type:
+        query = query.filter(models.Job.type == type)
+
+    after = decode_cursor(cursor, 2)
+    if after is not None:
+        query = query.filter(before_key(models.Job.created_at, models.Job.id, *after))
+
+    rows = (
+        query.order_by(models.Job.created_at.desc(), models.Job.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor([rows[-1].created_at, rows[-1].id])
+
+    return [job_schema.job_response(job) for job in rows]
+
+
+@router.get("/jobs/{job_id}", response_model=job_schema.JobResponse)
+def get_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_admin_user),
+):
+    return job_schema.job_response(_get_job_or_404(db, job_id))
+
+
+@router.post("/jobs/{job_id}/cancel", response_model=job_schema.JobResponse)
+def cancel_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_admin_user),
+):
+    """Cancel a queued job, or ask a running one to stop after its current chunk."""
+    job = _get_job_or_404(db, job_id)
+    if not jobs.request_cancel(db, job):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Job is already running and cannot be cancelled"
+            if job.status == jobs.RUNNING
+            else "Job has already finished",
+        )
+    db.refresh(job)
+    return job_schema.job_response(job)
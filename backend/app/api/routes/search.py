@@ -0,0 +1,67 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from app.db.replicas import get_read_db
+from app.db import models
+from app.schemas import search as search_schema
+from app.core.security import get_optional_user
+from app.core import enrollment_cache, search as search_core
+from app.core.pagination import decode_cursor, encode_cursor
+from app.db.search_index import SOURCES
+
+
+router = APIRouter()
+
+
+@router.get("/search", response_model=search_schema.SearchResponse)
+def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    kind: Optional[str] = Query(None),
+    limit: int = Query(20, ge=1, le=50),
+    cursor: Optional[str] = Query(None),
+    db: Session = Depends(get_read_db),
+    current_user: Optional[models.User] = Depends(get_optional_user),
+):
+    """Ranked search over courses, chapters and assignments.
+
+    Anonymous users only see courses; students see chapters and assignments
+    of the courses they are enrolled in; admins see everything.
+    """
+    if kind is not None and kind not in SOURCES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="kind должен быть course, chapter или assignment",
+        )
+    kinds: List[str] = [kind] if kind else list(SOURCES)
+
+    course_ids = None
+    if current_user is None:
+        kinds = [k for k in kinds if k == "course"]
+    elif current_user.role != "admin":
+        course_ids = enrollment_cache.get_enrolled_course_ids(db, current_user.id)
+
+    after = decode_cursor(cursor, 3)
+    hits = search_core.search(db, q, kinds, course_ids, limit + 1, after)
+
+    next_cursor = None
+    if len(hits) > limit:
+        hits = hits[:limit]
+        last = hits[-1]
+        next_cursor = encode_cursor([last.rank, last.kind, last.id])
+
+    return search_schema.SearchResponse(
+        items=[
+            search_schema.SearchResult(
+                kind=hit.kind,
+                id=hit.id,
+                courseId=hit.course_id,
+                title=hit.title,
+                snippet=hit.snippet,
+                rank=hit.rank,
+            )
+            for hit in hits
+        ],
+        nextCursor=next_cursor,
+    )
@@ -0,0 +1,228 @@
+"""Heavy admin operations, runnable inline or as chunked background jobs."""
+import logging
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from app.core import assignment_inbox, enrollment_cache, quiz_grading
+from app.core.jobs import JOB_CHUNK_SIZE, JobContext, handler
+from app.core.kafka_producer import send_event
+from app.db import group_counters, models
+
+
+DELETE_COURSE = "delete_course"
+ENROLL_GROUP = "enroll_group"
+
+
+def course_dependents(course_id: str) -> List[Tuple[Any, Any]]:
+    """``(model, criterion)`` pairs to delete, children first, before the course row itself."""
+    assignment_ids = select(models.Assignment.id).where(models.Assignment.course_id == course_id)
+    chapter_ids = select(models.Chapter.id).where(models.Chapter.course_id == course_id)
+    attempt_ids = select(models.QuizAttempt.id).where(models.QuizAttempt.chapter_id.in_(chapter_ids))
+    return [
+        (models.AssignmentSubmission, models.AssignmentSubmission.assignment_id.in_(assignment_ids)),
+        (models.Assignment, models.Assignment.course_id == course_id),
+        (models.UserProgress, models.UserProgress.course_id == course_id),
+        (models.QuizAttemptItem, models.QuizAttemptItem.attempt_id.in_(attempt_ids)),
+        (models.QuizAttempt, models.QuizAttempt.chapter_id.in_(chapter_ids)),
+        (models.QuizQuestionStats, models.QuizQuestionStats.chapter_id.in_(chapter_ids)),
+        (models.QuizChapterStats, models.QuizChapterStats.chapter_id.in_(chapter_ids)),
+        (models.Quiz, models.Quiz.chapter_id.in_(chapter_ids)),
+        (models.Chapter, models.Chapter.course_id == course_id),
+        (models.Enrollment, models.Enrollment.course_id == course_id),
+        (models.GroupCourse, models.GroupCourse.course_id == course_id),
+        (
+            models.Notification,
+            (models.Notification.entity_type == "course") & (models.Notification.entity_id == course_id),
+        ),
+    ]
+
+
+def delete_in_chunks(db: Session, model, criterion, chunk_size: int) -> Iterator[int]:
+    """Delete matching rows ``chunk_size`` at a time, yielding each chunk's size.
+
+    The caller commits between chunks, so row locks are only ever held on
+    one chunk at a time.
+    """
+    pk = model.__mapper__.primary_key[0]
+    while True:
+        ids = [row[0] for row in db.execute(select(pk).where(criterion).limit(chunk_size))]
+        if not ids:
+            return
+        db.execute(delete(model).where(pk.in_(ids)), execution_options={"synchronize_session": False})
+        yield len(ids)
+
+
+def _linked_group_ids(db: Session, course_id: str) -> List[str]:
+    return [
+        row[0]
+        for row in db.query(models.GroupCourse.group_id).filter(
+            models.GroupCourse.course_id == course_id
+        )
+    ]
+
+
+def _finish_course_deletion(db: Session, course: models.Course, group_ids: Sequence[str]) -> None:
+    if group_ids:
+        group_counters.recount(db, list(group_ids))
+    # A bulk DELETE: the chapters and quizzes are already gone, so the ORM
+    # cascade would only reload the empty collections.
+    db.execute(
+        delete(models.Course).where(models.Course.id == course.id),
+        execution_options={"synchronize_session": False},
+    )
+    assignment_inbox.refresh(db, course_id=course.id)
+
+
+def _after_course_deleted(course_id: str) -> None:
+    """Drop this process's cached enrollments and answer keys for the course.
+
+    Only the process that deleted the course is reached. Everywhere else,
+    and always when the job runner deletes it, enrollments age out within
+    ``ENROLLMENT_CACHE_TTL_SECONDS``; answer keys stop matching the missing
+    course's ``content_version`` on their next use.
+    """
+    enrollment_cache.invalidate_course(course_id)
+    quiz_grading.invalidate_course(course_id)
+
+
+def delete_course_inline(db: Session, course: models.Course) -> None:
+    """Delete a course and everything hanging off it in the caller's transaction."""
+    course_id = course.id
+    group_ids = _linked_group_ids(db, course_id)
+    for model, criterion in course_dependents(course_id):
+        db.query(model).filter(criterion).delete(synchronize_session=False)
+    _finish_course_deletion(db, course, group_ids)
+    db.commit()
+    _after_course_deleted(course_id)
+
+
+@handler(DELETE_COURSE, cancellable=False)
+def delete_course_job(ctx: JobContext, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Delete a course chunk by chunk.
+
+    Every chunk is committed, so a started deletion cannot be cancelled, and
+    each attempt recounts and deletes whatever rows are left: a retry, or a
+    fresh ``DELETE /admin/courses/{id}`` after the job failed for good, picks
+    up where the previous attempt stopped.
+    """
+    db = ctx.db
+    course_id = payload["course_id"]
+    course = db.get(models.Course, course_id)
+    if course is None:
+        return {"deleted": False}
+
+    # Captured up front: the group links are among the rows being deleted.
+    group_ids = payload.get("group_ids")
+    if group_ids is None:
+        group_ids = _linked_group_ids(db, course_id)
+        ctx.job.payload = {**payload, "group_ids": group_ids}
+
+    steps = course_dependents(course_id)
+    remaining = sum(
+        db.execute(select(func.count()).select_from(model).where(criterion)).scalar_one()
+        for model, criterion in steps
+    )
+    ctx.set_total((ctx.job.progress or 0) + remaining + 1)
+
+    for model, criterion in steps:
+        for deleted in delete_in_chunks(db, model, criterion, JOB_CHUNK_SIZE):
+            ctx.advance(deleted)
+
+    _finish_course_deletion(db, course, group_ids)
+    ctx.advance(1)
+    # No cache invalidation: the job runner shares no caches with the API
+    # workers, whose entries for the course expire or fail revalidation.
+    return {"deleted": True}
+
+
+def link_group_course(db: Session, group_id: str, course_id: str) -> bool:
+    """Link the course to the group; returns ``False`` if it already was."""
+    existing_link = (
+        db.query(models.GroupCourse)
+        .filter(
+            models.GroupCourse.group_id == group_id,
+            models.GroupCourse.course_id == course_id,
+        )
+        .first()
+    )
+    if existing_link:
+        return False
+    db.add(models.GroupCourse(group_id=group_id, course_id=course_id))
+    return True
+
+
+def enroll_users(db: Session, course_id: str, user_ids: Sequence[str]) -> List[str]:
+    """Add enrollments for those of ``user_ids`` not yet enrolled; returns the new ones."""
+    if not user_ids:
+        return []
+    enrolled_user_ids = {
+        row[0]
+        for row in db.query(models.Enrollment.user_id).filter(
+            models.Enrollment.course_id == course_id,
+            models.Enrollment.user_id.in_(user_ids),
+        )
+    }
+    newly_enrolled = [uid for uid in user_ids if uid not in enrolled_user_ids]
+    db.add_all(models.Enrollment(user_id=uid, course_id=course_id) for uid in newly_enrolled)
+    assignment_inbox.refresh(db, user_ids=newly_enrolled, course_id=course_id)
+    return newly_enrolled
+
+
+def announce_enrollments(user_ids: Sequence[str], course_id: str, group_id: str) -> None:
+    """Publish ``course_enrolled`` once the enrollments are committed.
+
+    No cache needs invalidating: enrollment lookups never trust a miss, so
+    API workers see the new enrollments whichever process made them.
+    """
+    for uid in user_ids:
+        try:
+            send_event(
+                topic="notifications-events",
+                key=uid,
+                event_type="course_enrolled",
+                payload={
+                    "user_id": uid,
+                    "course_id": course_id,
+                    "group_id": group_id,
+                },
+            )
+        except Exception:
+            logging.exception("Failed to publish course_enrolled event for user %s", uid)
+
+
+@handler(ENROLL_GROUP)
+def enroll_group_job(ctx: JobContext, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    db = ctx.db
+    group_id, course_id = payload["group_id"], payload["course_id"]
+    if db.get(models.Group, group_id) is None or db.get(models.Course, course_id) is None:
+        return {"newlyEnrolled": 0}
+
+    members = select(models.GroupMember.user_id).where(models.GroupMember.group_id == group_id)
+    ctx.set_total(db.execute(select(func.count()).select_from(members.subquery())).scalar_one())
+    # Enrolling is idempotent, so a retried job simply starts over.
+    ctx.job.progress = 0
+
+    linked = link_group_course(db, group_id, course_id)
+    newly_enrolled = 0
+    last_user_id = ""
+    while True:
+        user_ids = [
+            row[0]
+            for row in db.execute(
+                members.where(models.GroupMember.user_id > last_user_id)
+                .order_by(models.GroupMember.user_id)
+                .limit(JOB_CHUNK_SIZE)
+            )
+        ]
+        if not user_ids:
+            break
+        last_user_id = user_ids[-1]
+        new_ids = enroll_users(db, course_id, user_ids)
+        ctx.advance(len(user_ids))
+        announce_enrollments(new_ids, course_id, group_id)
+        newly_enrolled += len(new_ids)
+
+    db.commit()
+    return {"linked": linked, "newlyEnrolled": newly_enrolled}
@@ -0,0 +1,126 @@
+import os
+from typing import Iterable, Optional
+
+from sqlalchemy import insert, select, union
+from sqlalchemy.orm import Session
+
+from app.db import models
+
+
+ENABLED = os.getenv("ASSIGNMENT_INBOX_ENABLED", "false").lower() in ("1", "true", "yes")
+
+
+def latest_submission_id(user_id, assignment_id):
+    """Correlated subquery for the newest submission of ``user_id`` to ``assignment_id``."""
+    return (
+        select(models.AssignmentSubmission.id)
+        .where(
+            models.AssignmentSubmission.assignment_id == assignment_id,
+            models.AssignmentSubmission.user_id == user_id,
+        )
+        .order_by(
+            models.AssignmentSubmission.created_at.desc(),
+            models.AssignmentSubmission.id.desc(),
+        )
+        .limit(1)
+        .scalar_subquery()
+    )
+
+
+def _source(
+    user_ids: Optional[Iterable[str]] = None,
+    course_id: Optional[str] = None,
+    assignment_id: Optional[str] = None,
+):
+    enrolled = (
+        select(
+            models.Enrollment.user_id.label("user_id"),
+            models.Assignment.id.label("assignment_id"),
+        )
+        .join(models.Assignment, models.Assignment.course_id == models.Enrollment.course_id)
+    )
+    submitted = (
+        select(
+            models.AssignmentSubmission.user_id.label("user_id"),
+            models.AssignmentSubmission.assignment_id.label("assignment_id"),
+        )
+        .join(models.Assignment, models.Assignment.id == models.AssignmentSubmission.assignment_id)
+    )
+
+    if user_ids is not None:
+        enrolled = enrolled.where(models.Enrollment.user_id.in_(user_ids))
+        submitted = submitted.where(models.AssignmentSubmission.user_id.in_(user_ids))
+    if course_id is not None:
+        enrolled = enrolled.where(models.Assignment.course_id == course_id)
+        submitted = submitted.where(models.Assignment.course_id == course_id)
+    if assignment_id is not None:
+        enrolled = enrolled.where(models.Assignment.id == assignment_id)
+        submitted = submitted.where(models.Assignment.id == assignment_id)
+
+    pairs = union(enrolled, submitted).subquery("inbox_pairs")
+
+    return (
+        select(
+            pairs.c.user_id,
+            pairs.c.assignment_id,
+            models.Assignment.course_id,
+            models.Assignment.due_date,
+            latest_submission_id(pairs.c.user_id, pairs.c.assignment_id),
+        )
+        .join(models.Assignment, models.Assignment.id == pairs.c.assignment_id)
+    )
+
+
+def refresh(
+    db: Session,
+    user_ids: Optional[Iterable[str]] = None,
+    course_id: Optional[str] = None,
+    assignment_id: Optional[str] = None,
+) -> None:
+    """Recompute the inbox rows in the given scope inside the caller's transaction.
+
+    Does nothing unless ``ASSIGNMENT_INBOX_ENABLED`` is set, so the table
+    drifts while the flag is off; run ``rebuild`` before turning it on.
+    Scopes combine, e.g. ``user_ids`` and ``course_id`` after an enrollment.
+    """
+    if not ENABLED:
+        return
+
+    if user_ids is not None:
+        user_ids = list(user_ids)
+        if not user_ids:
+            return
+
+    _recompute(db, user_ids=user_ids, course_id=course_id, assignment_id=assignment_id)
+
+
+def rebuild(db: Session) -> None:
+    """Recompute the whole inbox, whatever ``ASSIGNMENT_INBOX_ENABLED`` says, and commit."""
+    _recompute(db)
+    db.commit()
+
+
+def _recompute(
+    db: Session,
+    user_ids: Optional[Iterable[str]] = None,
+    course_id: Optional[str] = None,
+    assignment_id: Optional[str] = None,
+) -> None:
+    db.flush()
+
+    inbox = models.UserAssignmentInbox
+    stale = db.query(inbox)
+    if user_ids is not None:
+        stale = stale.filter(inbox.user_id.in_(user_ids))
+    if course_id is not None:
+        stale = stale.filter(inbox.course_id == course_id)
+    if assignment_id is not None:
+        stale = stale.filter(inbox.assignment_id == assignment_id)
+    stale.delete(synchronize_session=False)
+
+    db.execute(
+        insert(inbox.__table__).from_select(
+            ["user_id", "assignment_id", "course_id", "due_date", "latest_submission_id"],
+            _source(user_ids=user_ids, course_id=course_id, assignment_id=assignment_id),
+        )
+    )
@@ -0,0 +1,88 @@
+from typing import Any, Dict, List, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.core.file_storage import StoredBlob
+from app.db import models
+from app.db.database import insert_for
+
+
+# Keys that would carry file bodies inline in the submission row.
+_INLINE_KEYS = {"content", "data", "base64", "body"}
+
+
+def record_blob(db: Session, blob: StoredBlob) -> None:
+    """Register an uploaded blob; re-uploads of the same content are no-ops."""
+    insert = insert_for(db)
+    db.execute(
+        insert(models.StoredFile.__table__)
+        .values(sha256=blob.sha256, size=blob.size)
+        .on_conflict_do_nothing(index_elements=["sha256"])
+    )
+
+
+def _reject_inline(item: Any) -> None:
+    if isinstance(item, dict) and _INLINE_KEYS & set(item):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Файлы нужно загружать отдельно, а во вложениях передавать только sha256",
+        )
+
+
+def normalize_attachments(db: Session, attachments: Any) -> Any:
+    """Validate file references and keep only their metadata.
+
+    Items with a ``sha256`` must point at an uploaded blob and are reduced
+    to ``sha256``/``filename``/``size``/``contentType``; other items (links,
+    notes) are stored unchanged.
+    """
+    if not isinstance(attachments, list):
+        _reject_inline(attachments)
+        return attachments
+
+    for item in attachments:
+        _reject_inline(item)
+
+    hashes = {
+        item["sha256"]
+        for item in attachments
+        if isinstance(item, dict) and isinstance(item.get("sha256"), str)
+    }
+    sizes: Dict[str, int] = {}
+    if hashes:
+        sizes = dict(
+            db.query(models.StoredFile.sha256, models.StoredFile.size)
+            .filter(models.StoredFile.sha256.in_(hashes))
+            .all()
+        )
+        missing = hashes - set(sizes)
+        if missing:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Вложение не найдено: " + ", ".join(sorted(missing)),
+            )
+
+    result: List[Any] = []
+    for item in attachments:
+        if isinstance(item, dict) and item.get("sha256") in sizes:
+            result.append(
+                {
+                    "sha256": item["sha256"],
+                    "filename": item.get("filename"),
+                    "size": sizes[item["sha256"]],
+                    "contentType": item.get("contentType"),
+                }
+            )
+        else:
+            result.append(item)
+    return result
+
+
+def find_attachment(attachments: Any, sha256: str) -> Optional[Dict[str, Any]]:
+    if not isinstance(attachments, list):
+        return None
+    for item in attachments:
+        if isinstance(item, dict) and item.get("sha256") == sha256:
+            return item
+    return None
@@ -0,0 +1,221 @@
+from itertools import groupby
+from operator import itemgetter
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional
+
+from sqlalchemy import and_, case, exists, func, select, true
+from sqlalchemy.orm import Session
+
+from app.core.progress import progress_percent
+from app.db import models
+
+
+MATRIX_FIELDS = (
+    "userId",
+    "name",
+    "email",
+    "courseId",
+    "courseTitle",
+    "enrolled",
+    "progress",
+    "completedChapters",
+    "totalChapters",
+    "averageQuizScore",
+    "submitted",
+    "graded",
+    "averageGrade",
+)
+
+
+class MatrixCourse(NamedTuple):
+    course_id: str
+    title: str
+    total_chapters: int
+
+
+def group_courses(db: Session, group_id: str) -> List[MatrixCourse]:
+    """Courses linked to the group, in matrix column order."""
+    chapters = (
+        select(models.Chapter.course_id, func.count(models.Chapter.id).label("total"))
+        .group_by(models.Chapter.course_id)
+        .subquery()
+    )
+    rows = db.execute(
+        select(
+            models.Course.id,
+            models.Course.title,
+            func.coalesce(chapters.c.total, 0).label("total"),
+        )
+        .join(models.GroupCourse, models.GroupCourse.course_id == models.Course.id)
+        .outerjoin(chapters, chapters.c.course_id == models.Course.id)
+        .where(models.GroupCourse.group_id == group_id)
+        .order_by(models.Course.title.asc(), models.Course.id.asc())
+    ).all()
+    return [MatrixCourse(row.id, row.title, row.total) for row in rows]
+
+
+def matrix_statement(group_id: str):
+    """One statement yielding a row per (member, linked course) of the group.
+
+    Progress, submissions and chapter totals are each aggregated once over
+    the group's members and courses, then joined onto the member × course
+    grid, ordered by member name and course title.
+    """
+    member_ids = select(models.GroupMember.user_id).where(models.GroupMember.group_id == group_id)
+    course_ids = select(models.GroupCourse.course_id).where(models.GroupCourse.group_id == group_id)
+
+    progress = (
+        select(
+            models.UserProgress.user_id,
+            models.UserProgress.course_id,
+            func.sum(case((models.UserProgress.completed == true(), 1), else_=0)).label("completed"),
+            func.avg(models.UserProgress.quiz_score).label("avg_quiz_score"),
+        )
+        .where(
+            models.UserProgress.course_id.in_(course_ids),
+            models.UserProgress.user_id.in_(member_ids),
+        )
+        .group_by(models.UserProgress.user_id, models.UserProgress.course_id)
+        .subquery("progress")
+    )
+
+    submissions = (
+        select(
+            models.AssignmentSubmission.user_id,
+            models.Assignment.course_id,
+            func.count(models.AssignmentSubmission.id).label("submitted"),
+            func.count(models.AssignmentSubmission.graded_at).label("graded"),
+            func.avg(models.AssignmentSubmission.grade).label("avg_grade"),
+        )
+        .join(models.Assignment, models.Assignment.id == models.AssignmentSubmission.assignment_id)
+        .where(
+            models.Assignment.course_id.in_(course_ids),
+            models.AssignmentSubmission.user_id.in_(member_ids),
+        )
+        .group_by(models.AssignmentSubmission.user_id, models.Assignment.course_id)
+        .subquery("submissions")
+    )
+
+    chapters = (
+        select(
+            models.Chapter.course_id,
+            func.count(models.Chapter.id).label("total"),
+        )
+        .where(models.Chapter.course_id.in_(course_ids))
+        .group_by(models.Chapter.course_id)
+        .subquery("chapter_totals")
+    )
+
+    enrolled = exists().where(
+        models.Enrollment.user_id == models.User.id,
+        models.Enrollment.course_id == models.Course.id,
+    )
+
+    return (
+        select(
+            models.User.id.label("user_id"),
+            models.User.name,
+            models.User.email,
+            models.Course.id.label("course_id"),
+            models.Course.title.label("course_title"),
+            enrolled.label("enrolled"),
+            func.coalesce(chapters.c.total, 0).label("total_chapters"),
+            func.coalesce(progress.c.completed, 0).label("completed"),
+            progress.c.avg_quiz_score,
+            func.coalesce(submissions.c.submitted, 0).label("submitted"),
+            func.coalesce(submissions.c.graded, 0).label("graded"),
+            submissions.c.avg_grade,
+        )
+        .select_from(models.GroupMember)
+        .join(models.User, models.User.id == models.GroupMember.user_id)
+        .join(models.GroupCourse, models.GroupCourse.group_id == models.GroupMember.group_id)
+        .join(models.Course, models.Course.id == models.GroupCourse.course_id)
+        .outerjoin(chapters, chapters.c.course_id == models.Course.id)
+        .outerjoin(
+            progress,
+            and_(progress.c.user_id == models.User.id, progress.c.course_id == models.Course.id),
+        )
+        .outerjoin(
+            submissions,
+            and_(submissions.c.user_id == models.User.id, submissions.c.course_id == models.Course.id),
+        )
+        .where(models.GroupMember.group_id == group_id)
+        .order_by(
+            models.User.name.asc(),
+            models.User.id.asc(),
+            models.Course.title.asc(),
+            models.Course.id.asc(),
+        )
+    )
+
+
+def _rounded(value: Any) -> Optional[float]:
+    return None if value is None else round(float(value), 1)
+
+
+def _course_cell(row) -> Dict[str, Any]:
+    # Rows are unpacked positionally: named attribute access on ~100k rows
+    # costs more than the aggregation itself.
+    (_, _, _, course_id, _, enrolled, total, completed,
+     avg_quiz_score, submitted, graded, avg_grade) = row
+    return {
+        "courseId": course_id,
+        "enrolled": bool(enrolled),
+        "progress": progress_percent(completed, total),
+        "completedChapters": completed,
+        "averageQuizScore": _rounded(avg_quiz_score),
+        "submitted": submitted,
+        "graded": graded,
+        "averageGrade": _rounded(avg_grade),
+    }
+
+
+def _rows(db: Session, group_id: str, batch_size: int):
+    return db.execute(
+        matrix_statement(group_id),
+        execution_options={"yield_per": batch_size},
+    ).tuples()
+
+
+def iter_cells(db: Session, group_id: str, batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+    """Stream flat ``MATRIX_FIELDS`` cells in member order without materialising the result."""
+    for row in _rows(db, group_id, batch_size):
+        cell = _course_cell(row)
+        cell.update(
+            userId=row[0],
+            name=row[1],
+            email=row[2],
+            courseTitle=row[4],
+            totalChapters=row[6],
+        )
+        yield cell
+
+
+def build_matrix(db: Session, group: models.Group, batch_size: int = 1000) -> Dict[str, Any]:
+    """The whole matrix as a plain dict shaped like ``AdminCohortMatrix``.
+
+    Cells are grouped into members in Python after the single aggregation;
+    the result is returned as plain data because validating ~100k cells
+    through the response model would cost more than the query itself.
+    """
+    courses = group_courses(db, group.id)
+    members = []
+    for (user_id, name, email), rows in groupby(
+        _rows(db, group.id, batch_size), key=itemgetter(0, 1, 2)
+    ):
+        members.append(
+            {
+                "userId": user_id,
+                "name": name,
+                "email": email,
+                "courses": [_course_cell(row) for row in rows],
+            }
+        )
+    return {
+        "groupId": group.id,
+        "name": group.name,
+        "courses": [
+            {"courseId": c.course_id, "title": c.title, "totalChapters": c.total_chapters}
+            for c in courses
+        ],
+        "members": members,
+    }
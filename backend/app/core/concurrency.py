@@ -0,0 +1,199 @@
+"""Per-route-group concurrency limits with load shedding.
+
+Every route here is a sync ``def`` and runs on the worker's threadpool
+(``THREADPOOL_SIZE`` threads, see ``app.core.serving``). Without limits,
+slow admin reports or bcrypt logins can take every thread, and cheap
+student reads then wait behind them. Requests are sorted into groups by
+path and method:
+
+    transfers  attachment downloads and streamed CSV/NDJSON exports
+    auth       /auth/...
+    admin      /admin/...
+    reads      other GET/HEAD requests
+    writes     other POST/PUT/PATCH/DELETE requests
+
+A request holds its slot until the response body is fully sent. Transfers
+run at the client's pace, so they get their own group: slow downloads and
+exports queue behind each other, never in front of cheap reads.
+
+Each group runs at most ``limit`` requests at once. Up to ``max_queue``
+more may wait, for at most ``CONCURRENCY_QUEUE_TIMEOUT_SECONDS``. Anything
+beyond that gets a 503 with ``Retry-After`` straight away. Keep the sum of
+the auth, admin and writes limits below the threadpool size so that reads
+always have threads left; transfers mostly wait on the network, not on a
+thread. Limits are set per worker process with
+``CONCURRENCY_LIMITS="auth=8,admin=8,writes=16,reads=32,transfers=8"``;
+``0`` disables a group's limit.
+"""
+import os
+import re
+import time
+from typing import Dict, Optional
+from urllib.parse import parse_qs
+
+import anyio
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core import metrics
+
+
+DEFAULT_LIMITS = "auth=8,admin=8,writes=16,reads=32,transfers=8"
+CONCURRENCY_LIMITS = os.getenv("CONCURRENCY_LIMITS", DEFAULT_LIMITS)
+# Waiting requests per group, as a multiple of the group's limit.
+CONCURRENCY_QUEUE_FACTOR = float(os.getenv("CONCURRENCY_QUEUE_FACTOR", "2"))
+CONCURRENCY_QUEUE_TIMEOUT_SECONDS = float(os.getenv("CONCURRENCY_QUEUE_TIMEOUT_SECONDS", "5"))
+RETRY_AFTER_SECONDS = 1
+
+# Never limited: probes and scrapes must answer while the API is saturated.
+UNLIMITED_PATHS = frozenset({"/", "/metrics", "/health/live", "/health/ready"})
+# Attachment downloads and submission exports; cohort matrices only as CSV.
+TRANSFER_PATH = re.compile(r"/(attachments/[^/]+|submissions/export)$")
+MATRIX_PATH = re.compile(r"^/admin/analytics/groups/[^/]+/matrix$")
+
+IN_FLIGHT = metrics.Gauge(
+    "http_group_requests_in_flight",
+    "Requests currently running, per route group.",
+    ("group",),
+)
+QUEUED = metrics.Gauge(
+    "http_group_requests_queued",
+    "Requests waiting for a slot, per route group.",
+    ("group",),
+)
+QUEUE_WAIT = metrics.Histogram(
+    "http_group_queue_wait_seconds",
+    "Time requests waited for a slot before running.",
+    ("group",),
+)
+REJECTED = metrics.Counter(
+    "http_group_requests_rejected_total",
+    "Requests shed with 503, by route group and reason (queue_full, timeout).",
+    ("group", "reason"),
+)
+
+
+class Overloaded(Exception):
+    def __init__(self, reason: str) -> None:
+        super().__init__(reason)
+        self.reason = reason
+
+
+def is_transfer(scope: Scope) -> bool:
+    if scope["method"] not in ("GET", "HEAD"):
+        return False
+    path = scope["path"]
+    if TRANSFER_PATH.search(path):
+        return True
+    if MATRIX_PATH.match(path):
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        return query.get("format") == ["csv"]
+    return False
+
+
+def classify(scope: Scope) -> Optional[str]:
+    """Route group of an HTTP request, or None when it is never limited."""
+    path = scope["path"]
+    if path in UNLIMITED_PATHS or scope["method"] == "OPTIONS":
+        return None
+    if is_transfer(scope):
+        return "transfers"
+    if path.startswith("/auth/"):
+        return "auth"
+    if path.startswith("/admin/"):
+        return "admin"
+    return "reads" if scope["method"] in ("GET", "HEAD") else "writes"
+
+
+class GroupLimiter:
+    """At most ``limit`` concurrent holders and ``max_queue`` waiters in one event loop."""
+
+    def __init__(self, group: str, limit: int, max_queue: int, queue_timeout: float) -> None:
+        self.group = group
+        self.limit = limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.queued = 0
+        self._semaphore: Optional[anyio.Semaphore] = None
+
+    async def acquire(self) -> None:
+        if self._semaphore is None:
+            # Created lazily: anyio primitives need a running event loop.
+            self._semaphore = anyio.Semaphore(self.limit)
+        labels = (self.group,)
+
+        if self._semaphore.value == 0:
+            if self.queued >= self.max_queue:
+                REJECTED.inc((self.group, "queue_full"))
+                raise Overloaded("queue_full")
+            started = time.perf_counter()
+            self.queued += 1
+            QUEUED.inc(labels)
+            try:
+                with anyio.fail_after(self.queue_timeout):
+                    await self._semaphore.acquire()
+            except TimeoutError:
+                REJECTED.inc((self.group, "timeout"))
+                raise Overloaded("timeout") from None
+            finally:
+                self.queued -= 1
+                QUEUED.dec(labels)
+            QUEUE_WAIT.observe(labels, time.perf_counter() - started)
+        else:
+            await self._semaphore.acquire()
+            QUEUE_WAIT.observe(labels, 0.0)
+        IN_FLIGHT.inc(labels)
+
+    def release(self) -> None:
+        IN_FLIGHT.dec((self.group,))
+        self._semaphore.release()
+
+
+def parse_limits(value: str) -> Dict[str, int]:
+    limits = {}
+    for part in filter(None, (item.strip() for item in value.split(","))):
+        group, _, limit = part.partition("=")
+        limits[group.strip()] = int(limit)
+    return limits
+
+
+def build_limiters(
+    value: str = CONCURRENCY_LIMITS,
+    queue_factor: float = CONCURRENCY_QUEUE_FACTOR,
+    queue_timeout: float = CONCURRENCY_QUEUE_TIMEOUT_SECONDS,
+) -> Dict[str, GroupLimiter]:
+    return {
+        group: GroupLimiter(group, limit, int(limit * queue_factor), queue_timeout)
+        for group, limit in parse_limits(value).items()
+        if limit > 0
+    }
+
+
+LIMITERS: Dict[str, GroupLimiter] = build_limiters()
+
+
+class ConcurrencyLimitMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        group = classify(scope) if scope["type"] == "http" else None
+        limiter = LIMITERS.get(group) if group else None
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await limiter.acquire()
+        except Overloaded:
+            response = JSONResponse(
+                {"detail": f"Server is busy ({group} requests), retry later"},
+                status_code=503,
+                headers={"Retry-After": str(RETRY_AFTER_SECONDS)},
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
@@ -0,0 +1,196 @@
+from typing import Any, Dict, List, Sequence
+
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+
+from app.core import quiz_analytics
+from app.db import models
+from app.schemas import course as course_schema
+
+
+class CourseDiff:
+    """Structural difference between a course's stored content and an update payload."""
+
+    def __init__(self) -> None:
+        self.chapter_inserts: List[Dict[str, Any]] = []
+        self.chapter_updates: List[Dict[str, Any]] = []
+        self.chapter_deletes: List[str] = []
+        self.quiz_inserts: List[Dict[str, Any]] = []
+        self.quiz_updates: List[Dict[str, Any]] = []
+        self.quiz_deletes: List[str] = []
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(
+            self.chapter_inserts
+            or self.chapter_updates
+            or self.chapter_deletes
+            or self.quiz_inserts
+            or self.quiz_updates
+            or self.quiz_deletes
+        )
+
+
+_CHAPTER_FIELDS = ("title", "content", "order")
+_QUIZ_FIELDS = ("question", "options", "correct_option", "question_type")
+
+
+def _quiz_values(quiz_data: course_schema.QuizCreate) -> Dict[str, Any]:
+    return {
+        "question": quiz_data.question,
+        "options": quiz_data.options,
+        "correct_option": quiz_data.correctOption,
+        "question_type": getattr(quiz_data, "type", "choice"),
+    }
+
+
+def diff_course(
+    existing_chapters: Dict[str, Dict[str, Any]],
+    existing_quizzes: Dict[str, Dict[str, Any]],
+    chapters: Sequence[course_schema.ChapterCreate],
+) -> CourseDiff:
+    """Compute the inserts, updates and deletes that turn stored content into ``chapters``.
+
+    ``existing_chapters`` maps chapter ID to its ``title``/``content``/``order``;
+    ``existing_quizzes`` maps quiz ID to its ``chapter_id`` and quiz fields.
+    Unknown chapter or quiz IDs in the payload are treated as new rows, and a
+    quiz ID is only reused within the chapter that already owns it.
+    """
+    diff = CourseDiff()
+    kept_chapter_ids = set()
+    kept_quiz_ids = set()
+
+    for i, chapter_data in enumerate(chapters):
+        chapter_id = getattr(chapter_data, "id", None)
+        values = {
+            "title": chapter_data.title,
+            "content": chapter_data.content,
+            "order": i,
+        }
+
+        if chapter_id in existing_chapters and chapter_id not in kept_chapter_ids:
+            current = existing_chapters[chapter_id]
+            if any(current[field] != values[field] for field in _CHAPTER_FIELDS):
+                diff.chapter_updates.append({"id": chapter_id, **values})
+        else:
+            chapter_id = models.generate_uuid()
+            diff.chapter_inserts.append({"id": chapter_id, **values})
+        kept_chapter_ids.add(chapter_id)
+
+        for quiz_data in chapter_data.quiz:
+            quiz_id = getattr(quiz_data, "id", None)
+            values = _quiz_values(quiz_data)
+            current = existing_quizzes.get(quiz_id)
+
+            if (
+                current is not None
+                and current["chapter_id"] == chapter_id
+                and quiz_id not in kept_quiz_ids
+            ):
+                if any(current[field] != values[field] for field in _QUIZ_FIELDS):
+                    diff.quiz_updates.append({"id": quiz_id, **values})
+            else:
+                quiz_id = models.generate_uuid()
+                diff.quiz_inserts.append({"id": quiz_id, "chapter_id": chapter_id, **values})
+            kept_quiz_ids.add(quiz_id)
+
+    diff.chapter_deletes = [
+        chapter_id for chapter_id in existing_chapters if chapter_id not in kept_chapter_ids
+    ]
+    deleted_chapter_ids = set(diff.chapter_deletes)
+    diff.quiz_deletes = [
+        quiz_id
+        for quiz_id, quiz in existing_quizzes.items()
+        if quiz_id not in kept_quiz_ids and quiz["chapter_id"] not in deleted_chapter_ids
+    ]
+
+    return diff
+
+
+def load_course_content(db: Session, course_id: str):
+    chapter_rows = (
+        db.query(
+            models.Chapter.id,
+            models.Chapter.title,
+            models.Chapter.content,
+            models.Chapter.order,
+        )
+        .filter(models.Chapter.course_id == course_id)
+        .all()
+    )
+    existing_chapters = {
+        row.id: {"title": row.title, "content": row.content, "order": row.order}
+        for row in chapter_rows
+    }
+
+    quiz_rows = (
+        db.query(
+            models.Quiz.id,
+            models.Quiz.chapter_id,
+            models.Quiz.question,
+            models.Quiz.options,
+            models.Quiz.correct_option,
+            models.Quiz.question_type,
+        )
+        .join(models.Chapter, models.Chapter.id == models.Quiz.chapter_id)
+        .filter(models.Chapter.course_id == course_id)
+        .all()
+    )
+    existing_quizzes = {
+        row.id: {
+            "chapter_id": row.chapter_id,
+            "question": row.question,
+            "options": row.options,
+            "correct_option": row.correct_option,
+            "question_type": row.question_type,
+        }
+        for row in quiz_rows
+    }
+
+    return existing_chapters, existing_quizzes
+
+
+def apply_course_diff(db: Session, course_id: str, diff: CourseDiff) -> None:
+    """Apply ``diff`` with set-based statements in the caller's transaction."""
+    if diff.chapter_deletes:
+        deleted = diff.chapter_deletes
+        db.query(models.UserProgress).filter(
+            models.UserProgress.chapter_id.in_(deleted)
+        ).delete(synchronize_session=False)
+        quiz_analytics.delete_chapter_data(db, deleted)
+        db.query(models.Assignment).filter(
+            models.Assignment.chapter_id.in_(deleted)
+        ).update({"chapter_id": None}, synchronize_session=False)
+        db.query(models.Quiz).filter(
+            models.Quiz.chapter_id.in_(deleted)
+        ).delete(synchronize_session=False)
+        db.query(models.Chapter).filter(
+            models.Chapter.id.in_(deleted)
+        ).delete(synchronize_session=False)
+
+    if diff.quiz_deletes:
+        db.query(models.QuizQuestionStats).filter(
+            models.QuizQuestionStats.quiz_id.in_(diff.quiz_deletes)
+        ).delete(synchronize_session=False)
+        db.query(models.Quiz).filter(
+            models.Quiz.id.in_(diff.quiz_deletes)
+        ).delete(synchronize_session=False)
+
+    if diff.chapter_inserts:
+        db.execute(
+            insert(models.Chapter.__table__),
+            [{"course_id": course_id, **row} for row in diff.chapter_inserts],
+        )
+    if diff.quiz_inserts:
+        db.execute(insert(models.Quiz.__table__), diff.quiz_inserts)
+
+    if diff.chapter_updates:
+        db.execute(update(models.Chapter), diff.chapter_updates)
+    if diff.quiz_updates:
+        db.execute(update(models.Quiz), diff.quiz_updates)
+
+    if diff.has_changes:
+        db.query(models.Course).filter(models.Course.id == course_id).update(
+            {"content_version": models.Course.content_version + 1},
+            synchronize_session=False,
+        )
@@ -0,0 +1,100 @@
+"""Per-process cache of the courses each user is enrolled in.
+
+Nothing here relies on invalidation reaching this process: API workers and
+the job runner enroll users independently. Only positive answers are served
+from the cache, so a new enrollment is seen on the next lookup wherever it
+was made; a removed enrollment or deleted course can stay visible to
+``is_enrolled`` for at most ``ENROLLMENT_CACHE_TTL_SECONDS``.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import FrozenSet, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.db import models
+from app.db.database import is_replica
+
+
+ENROLLMENT_CACHE_TTL_SECONDS = float(os.getenv("ENROLLMENT_CACHE_TTL_SECONDS", "60"))
+ENROLLMENT_CACHE_MAX_USERS = int(os.getenv("ENROLLMENT_CACHE_MAX_USERS", "10000"))
+
+_cache: "OrderedDict[str, Tuple[float, FrozenSet[str]]]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def _load_course_ids(db: Session, user_id: str) -> FrozenSet[str]:
+    rows = (
+        db.query(models.Enrollment.course_id)
+        .filter(models.Enrollment.user_id == user_id)
+        .all()
+    )
+    course_ids = frozenset(row[0] for row in rows)
+    if is_replica(db):
+        return course_ids
+
+    with _lock:
+        _cache[user_id] = (time.monotonic() + ENROLLMENT_CACHE_TTL_SECONDS, course_ids)
+        _cache.move_to_end(user_id)
+        while len(_cache) > ENROLLMENT_CACHE_MAX_USERS:
+            _cache.popitem(last=False)
+
+    return course_ids
+
+
+def _cached_course_ids(user_id: str) -> Optional[FrozenSet[str]]:
+    with _lock:
+        entry = _cache.get(user_id)
+        if entry is None:
+            return None
+        expires_at, course_ids = entry
+        if expires_at < time.monotonic():
+            del _cache[user_id]
+            return None
+        _cache.move_to_end(user_id)
+        return course_ids
+
+
+def get_enrolled_course_ids(db: Session, user_id: str) -> FrozenSet[str]:
+    """Read the user's full course set from the database and refresh the cache.
+
+    Callers that hide what is missing from the set (the catalog, search)
+    must not trust a cached copy, so this is always one indexed query.
+    """
+    return _load_course_ids(db, user_id)
+
+
+def is_enrolled(db: Session, user_id: str, course_id: str) -> bool:
+    """Check enrollment against the per-user course set.
+
+    Only positive answers are trusted from the cache: a miss reloads the set
+    from the database, so enrollments made by another worker are never
+    reported as missing.
+    """
+    course_ids = _cached_course_ids(user_id)
+    if course_ids is not None and course_id in course_ids:
+        return True
+    return course_id in _load_course_ids(db, user_id)
+
+
+def invalidate_user(user_id: str) -> None:
+    with _lock:
+        _cache.pop(user_id, None)
+
+
+def invalidate_course(course_id: str) -> None:
+    with _lock:
+        stale_user_ids = [
+            user_id
+            for user_id, (_, course_ids) in _cache.items()
+            if course_id in course_ids
+        ]
+        for user_id in stale_user_ids:
+            del _cache[user_id]
+
+
+def clear() -> None:
+    with _lock:
+        _cache.clear()
@@ -0,0 +1,120 @@
+import hashlib
+import os
+import tempfile
+from typing import BinaryIO, Callable, Dict, NamedTuple, Optional
+
+
+CHUNK_SIZE = 1024 * 1024
+MAX_UPLOAD_BYTES = int(os.getenv("ATTACHMENT_MAX_BYTES", str(50 * 1024 * 1024)))
+
+
+class StoredBlob(NamedTuple):
+    sha256: str
+    size: int
+
+
+class FileTooLarge(Exception):
+    pass
+
+
+class StorageBackend:
+    """Content-addressed blob store keyed by the SHA-256 of the content."""
+
+    def save_stream(self, stream: BinaryIO, max_bytes: int = MAX_UPLOAD_BYTES) -> StoredBlob:
+        raise NotImplementedError
+
+    def exists(self, sha256: str) -> bool:
+        raise NotImplementedError
+
+    def local_path(self, sha256: str) -> Optional[str]:
+        """Filesystem path of the blob, for backends that can serve it with sendfile."""
+        return None
+
+    def download_url(self, sha256: str) -> Optional[str]:
+        """Direct (e.g. presigned) URL, for backends that serve blobs themselves."""
+        return None
+
+    def delete(self, sha256: str) -> None:
+        raise NotImplementedError
+
+
+class LocalFileStorage(StorageBackend):
+    """Stores blobs under ``root/ab/cd/<sha256>``.
+
+    Uploads are written to a temporary file on the same filesystem while
+    being hashed, then renamed into place; content that is already stored
+    is dropped instead of written twice.
+    """
+
+    def __init__(self, root: str) -> None:
+        self.root = os.path.abspath(root)
+        self.tmp_dir = os.path.join(self.root, "tmp")
+
+    def _path(self, sha256: str) -> str:
+        return os.path.join(self.root, sha256[:2], sha256[2:4], sha256)
+
+    def save_stream(self, stream: BinaryIO, max_bytes: int = MAX_UPLOAD_BYTES) -> StoredBlob:
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.tmp_dir)
+        try:
+            with os.fdopen(fd, "wb") as out:
+                while True:
+                    chunk = stream.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if size > max_bytes:
+                        raise FileTooLarge()
+                    digest.update(chunk)
+                    out.write(chunk)
+
+            sha256 = digest.hexdigest()
+            final_path = self._path(sha256)
+            if os.path.exists(final_path):
+                os.unlink(tmp_path)
+            else:
+                os.makedirs(os.path.dirname(final_path), exist_ok=True)
+                os.replace(tmp_path, final_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+        return StoredBlob(sha256=sha256, size=size)
+
+    def exists(self, sha256: str) -> bool:
+        return os.path.exists(self._path(sha256))
+
+    def local_path(self, sha256: str) -> Optional[str]:
+        path = self._path(sha256)
+        return path if os.path.exists(path) else None
+
+    def delete(self, sha256: str) -> None:
+        try:
+            os.unlink(self._path(sha256))
+        except FileNotFoundError:
+            pass
+
+
+_backends: Dict[str, Callable[[], StorageBackend]] = {
+    "local": lambda: LocalFileStorage(os.getenv("FILE_STORAGE_ROOT", "storage")),
+}
+_storage: Optional[StorageBackend] = None
+
+
+def register_backend(name: str, factory: Callable[[], StorageBackend]) -> None:
+    """Make a backend (e.g. object storage) selectable through ``FILE_STORAGE_BACKEND``."""
+    _backends[name] = factory
+
+
+def get_storage() -> StorageBackend:
+    global _storage
+    if _storage is None:
+        name = os.getenv("FILE_STORAGE_BACKEND", "local")
+        if name not in _backends:
+            raise RuntimeError(f"Unknown FILE_STORAGE_BACKEND: {name}")
+        _storage = _backends[name]()
+    return _storage
@@ -0,0 +1,81 @@
+from datetime import datetime, timezone
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+from sqlalchemy import Integer, String, Text, cast, column, func, select, update, values
+from sqlalchemy.orm import Session
+
+from app.db import models
+
+
+class GradeChange(NamedTuple):
+    submission_id: str
+    grade: Optional[int]
+    feedback: Optional[str]
+
+
+class GradedSubmission(NamedTuple):
+    submission_id: str
+    user_id: str
+
+
+def apply_grades(
+    db: Session,
+    assignment_id: str,
+    grader_id: str,
+    changes: Sequence[GradeChange],
+) -> Dict[str, GradedSubmission]:
+    """Grade many submissions of one assignment in a single statement.
+
+    Returns the updated submissions keyed by ID; IDs that do not belong to the
+    assignment are left untouched and missing from the result.
+    """
+    if not changes:
+        return {}
+
+    table = models.AssignmentSubmission.__table__
+
+    if db.get_bind().dialect.name == "postgresql":
+        grades = values(
+            column("id", String),
+            column("grade", Integer),
+            column("feedback", Text),
+            name="grades",
+        ).data([tuple(change) for change in changes])
+        stmt = (
+            update(table)
+            .where(table.c.id == grades.c.id, table.c.assignment_id == assignment_id)
+            .values(
+                grade=cast(grades.c.grade, Integer),
+                feedback=cast(grades.c.feedback, Text),
+                graded_by=grader_id,
+                graded_at=func.now(),
+                updated_at=func.now(),
+            )
+            .returning(table.c.id, table.c.user_id)
+        )
+        rows = db.execute(stmt).all()
+    else:
+        rows = db.execute(
+            select(table.c.id, table.c.user_id).where(
+                table.c.id.in_([change.submission_id for change in changes]),
+                table.c.assignment_id == assignment_id,
+            )
+        ).all()
+        found = {row.id for row in rows}
+        now = datetime.now(timezone.utc)
+        updates: List[dict] = [
+            {
+                "id": change.submission_id,
+                "grade": change.grade,
+                "feedback": change.feedback,
+                "graded_by": grader_id,
+                "graded_at": now,
+                "updated_at": now,
+            }
+            for change in changes
+            if change.submission_id in found
+        ]
+        if updates:
+            db.execute(update(models.AssignmentSubmission), updates)
+
+    return {row.id: GradedSubmission(row.id, row.user_id) for row in rows}
@@ -0,0 +1,209 @@
+"""Per-request latency, SQL statement count and DB time.
+
+``InstrumentationMiddleware`` opens a ``RequestStats`` for every HTTP
+request in a context variable; engine-wide cursor events add each
+statement's duration to it (the context is copied into the threadpool
+that runs sync endpoints, so the same object is shared). When the
+response starts the totals are sent as a ``Server-Timing`` header; when
+it ends they are recorded in the Prometheus metrics, and requests slower
+than ``SLOW_REQUEST_MS`` are logged as JSON with their costliest statements.
+"""
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core import metrics
+
+
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "500"))
+SLOW_LOG_MAX_STATEMENTS = int(os.getenv("SLOW_LOG_MAX_STATEMENTS", "10"))
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "true").lower() in ("1", "true", "yes")
+# Distinct statement texts tracked per request; beyond this only totals grow.
+MAX_TRACKED_STATEMENTS = 200
+UNMATCHED_ROUTE = "<unmatched>"
+
+slow_log = logging.getLogger("app.slow_requests")
+
+REQUEST_DURATION = metrics.Histogram(
+    "http_request_duration_seconds",
+    "Time from receiving the request to sending the last body chunk.",
+    ("method", "route", "status"),
+)
+REQUEST_DB_DURATION = metrics.Histogram(
+    "http_request_db_duration_seconds",
+    "Time spent executing SQL statements per request.",
+    ("method", "route"),
+)
+REQUEST_QUERIES = metrics.Histogram(
+    "http_request_db_queries",
+    "SQL statements executed per request.",
+    ("method", "route"),
+    buckets=metrics.QUERY_COUNT_BUCKETS,
+)
+SLOW_REQUESTS = metrics.Counter(
+    "http_slow_requests_total",
+    "Requests slower than SLOW_REQUEST_MS.",
+    ("method", "route"),
+)
+
+
+class StatementStats:
+    __slots__ = ("count", "seconds")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.seconds = 0.0
+
+
+class RequestStats:
+    """SQL activity of one request, keyed by statement text."""
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.query_count = 0
+        self.db_seconds = 0.0
+        self.statements: Dict[str, StatementStats] = {}
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.query_count += 1
+        self.db_seconds += seconds
+        stats = self.statements.get(statement)
+        if stats is None:
+            if len(self.statements) >= MAX_TRACKED_STATEMENTS:
+                return
+            stats = self.statements[statement] = StatementStats()
+        stats.count += 1
+        stats.seconds += seconds
+
+    def costliest(self, limit: int) -> List[dict]:
+        ranked = sorted(self.statements.items(), key=lambda item: item[1].seconds, reverse=True)
+        return [
+            {"sql": sql, "count": stats.count, "ms": round(stats.seconds * 1000, 2)}
+            for sql, stats in ranked[:limit]
+        ]
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+Observer = Callable[[Scope, RequestStats], None]
+
+_observers: List[Observer] = []
+
+
+def current_stats() -> Optional[RequestStats]:
+    return _current.get()
+
+
+@contextmanager
+def track() -> Iterator[RequestStats]:
+    """Collect SQL statements run in the current context, outside of a request."""
+    stats = RequestStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def add_observer(observer: Observer) -> None:
+    """Call ``observer(scope, stats)`` after every HTTP request."""
+    _observers.append(observer)
+
+
+def remove_observer(observer: Observer) -> None:
+    if observer in _observers:
+        _observers.remove(observer)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _current.get() is not None:
+        context._instrumentation_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    started = getattr(context, "_instrumentation_started", None)
+    if stats is not None and started is not None:
+        stats.record(statement, time.perf_counter() - started)
+
+
+def server_timing(stats: RequestStats, elapsed: float) -> str:
+    return (
+        f"app;dur={elapsed * 1000:.1f}, "
+        f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.query_count} queries"'
+    )
+
+
+class InstrumentationMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if SERVER_TIMING_ENABLED:
+                    headers = MutableHeaders(scope=message)
+                    headers.append(
+                        "Server-Timing",
+                        server_timing(stats, time.perf_counter() - stats.started),
+                    )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            self._record(scope, stats, status_code)
+
+    def _record(self, scope: Scope, stats: RequestStats, status_code: int) -> None:
+        elapsed = time.perf_counter() - stats.started
+        route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+        method = scope["method"]
+
+        REQUEST_DURATION.observe((method, route, str(status_code)), elapsed)
+        REQUEST_DB_DURATION.observe((method, route), stats.db_seconds)
+        REQUEST_QUERIES.observe((method, route), stats.query_count)
+        for observer in list(_observers):
+            observer(scope, stats)
+
+        if elapsed * 1000 < SLOW_REQUEST_MS:
+            return
+        SLOW_REQUESTS.inc((method, route))
+        slow_log.warning(
+            json.dumps(
+                {
+                    "event": "slow_request",
+                    "method": method,
+                    "path": scope["path"],
+                    "route": route,
+                    "status": status_code,
+                    "durationMs": round(elapsed * 1000, 1),
+                    "dbMs": round(stats.db_seconds * 1000, 1),
+                    "queries": stats.query_count,
+                    "statements": stats.costliest(SLOW_LOG_MAX_STATEMENTS),
+                },
+                ensure_ascii=False,
+            )
+        )
@@ -0,0 +1,245 @@
+"""Database-backed queue for long-running admin operations.
+
+Jobs are rows in ``jobs``. Workers claim them with ``SELECT ... FOR UPDATE
+SKIP LOCKED`` so any number of runners can poll the same table without
+blocking each other, then run the registered handler outside of that lock.
+Handlers work in chunks and call ``JobContext.advance`` after each one,
+which commits the chunk together with the progress counter, refreshes the
+lease and honours cancellation requests.
+"""
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional, Set
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from app.db import models
+
+
+JOB_CHUNK_SIZE = int(os.getenv("JOB_CHUNK_SIZE", "1000"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "5"))
+JOB_RETRY_BASE_SECONDS = float(os.getenv("JOB_RETRY_BASE_SECONDS", "30"))
+JOB_RETRY_MAX_SECONDS = float(os.getenv("JOB_RETRY_MAX_SECONDS", "3600"))
+# A running job whose lease has not been refreshed for this long is assumed
+# to belong to a dead worker and becomes claimable again.
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "300"))
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+STATUSES = (QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED)
+
+logger = logging.getLogger(__name__)
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobContext:
+    """Handed to a handler: its session, the job row and progress reporting."""
+
+    def __init__(self, db: Session, job: models.Job) -> None:
+        self.db = db
+        self.job = job
+        self.job_id = job.id
+
+    def set_total(self, total: int) -> None:
+        self.job.total = total
+        self.db.commit()
+
+    def advance(self, done: int = 1) -> None:
+        """Commit the current chunk, record ``done`` more units and check for cancellation."""
+        self.job.progress = (self.job.progress or 0) + done
+        self.job.locked_at = _now()
+        self.db.commit()
+        if self.job.type not in _uncancellable:
+            self.check_cancelled()
+
+    def check_cancelled(self) -> None:
+        requested = (
+            self.db.query(models.Job.cancel_requested)
+            .filter(models.Job.id == self.job_id)
+            .scalar()
+        )
+        if requested:
+            raise JobCancelled()
+
+
+Handler = Callable[[JobContext, Dict[str, Any]], Optional[Dict[str, Any]]]
+
+_handlers: Dict[str, Handler] = {}
+_uncancellable: Set[str] = set()
+
+
+def handler(job_type: str, cancellable: bool = True) -> Callable[[Handler], Handler]:
+    """Register the function that runs jobs of ``job_type``.
+
+    Handlers whose chunks must not be left half-applied pass
+    ``cancellable=False``: their jobs can then only be cancelled while queued.
+    """
+    def register(func: Handler) -> Handler:
+        _handlers[job_type] = func
+        if not cancellable:
+            _uncancellable.add(job_type)
+        return func
+    return register
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def retry_delay(attempts: int) -> float:
+    """Exponential backoff after the ``attempts``-th failed attempt."""
+    return min(JOB_RETRY_BASE_SECONDS * (2 ** max(attempts - 1, 0)), JOB_RETRY_MAX_SECONDS)
+
+
+def active_job(db: Session, job_type: str, key: str) -> Optional[models.Job]:
+    return (
+        db.query(models.Job)
+        .filter(
+            models.Job.type == job_type,
+            models.Job.key == key,
+            models.Job.status.in_(ACTIVE_STATUSES),
+        )
+        .first()
+    )
+
+
+def enqueue(
+    db: Session,
+    job_type: str,
+    payload: Dict[str, Any],
+    key: Optional[str] = None,
+    created_by: Optional[str] = None,
+    max_attempts: int = JOB_MAX_ATTEMPTS,
+) -> models.Job:
+    """Queue a job and commit. A queued or running job with the same ``key`` is returned instead."""
+    if key is not None:
+        existing = active_job(db, job_type, key)
+        if existing is not None:
+            return existing
+
+    job = models.Job(
+        type=job_type,
+        key=key,
+        payload=payload,
+        status=QUEUED,
+        progress=0,
+        attempts=0,
+        max_attempts=max_attempts,
+        run_at=_now(),
+        cancel_requested=False,
+        created_by=created_by,
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def request_cancel(db: Session, job: models.Job) -> bool:
+    """Cancel a queued job outright, or ask a running one to stop after its current chunk.
+
+    Returns ``False`` when the job has already finished, or is running and
+    was registered with ``cancellable=False``.
+    """
+    if job.status == QUEUED:
+        job.status = CANCELLED
+        job.cancel_requested = True
+        job.finished_at = _now()
+    elif job.status == RUNNING and job.type not in _uncancellable:
+        job.cancel_requested = True
+    else:
+        return False
+    db.commit()
+    return True
+
+
+def claim(db: Session, worker_id: str) -> Optional[models.Job]:
+    """Lock the next due job for ``worker_id`` and mark it running.
+
+    ``SKIP LOCKED`` makes concurrent workers pass over rows another worker
+    is claiming; the row lock is only held until this commit.
+    """
+    now = _now()
+    job = (
+        db.query(models.Job)
+        .filter(
+            or_(
+                and_(models.Job.status == QUEUED, models.Job.run_at <= now),
+                and_(
+                    models.Job.status == RUNNING,
+                    models.Job.locked_at < now - timedelta(seconds=JOB_LEASE_SECONDS),
+                ),
+            )
+        )
+        .order_by(models.Job.run_at.asc())
+        .with_for_update(skip_locked=True)
+        .first()
+    )
+    if job is None:
+        db.rollback()
+        return None
+
+    job.status = RUNNING
+    job.locked_by = worker_id
+    job.locked_at = now
+    job.attempts = (job.attempts or 0) + 1
+    if job.started_at is None:
+        job.started_at = now
+    db.commit()
+    return job
+
+
+def _finish(db: Session, job_id: str, job_status: str, **values: Any) -> None:
+    job = db.get(models.Job, job_id)
+    job.status = job_status
+    job.locked_by = None
+    job.locked_at = None
+    for name, value in values.items():
+        setattr(job, name, value)
+    db.commit()
+
+
+def run_job(db: Session, job: models.Job) -> str:
+    """Run a claimed job to completion, cancellation, retry or failure; returns the new status."""
+    job_id = job.id
+    func = _handlers.get(job.type)
+    ctx = JobContext(db, job)
+    try:
+        if func is None:
+            raise LookupError(f"No handler registered for job type {job.type!r}")
+        if job.attempts > job.max_attempts:
+            raise RuntimeError("Job lease expired too many times")
+        ctx.check_cancelled()
+        result = func(ctx, dict(job.payload or {}))
+    except JobCancelled:
+        db.rollback()
+        _finish(db, job_id, CANCELLED, finished_at=_now())
+        return CANCELLED
+    except Exception as exc:
+        db.rollback()
+        logger.exception("Job %s (%s) failed", job_id, job.type)
+        job = db.get(models.Job, job_id)
+        error = f"{type(exc).__name__}: {exc}"
+        if job.attempts < job.max_attempts and func is not None:
+            _finish(
+                db,
+                job_id,
+                QUEUED,
+                last_error=error,
+                run_at=_now() + timedelta(seconds=retry_delay(job.attempts)),
+            )
+            return QUEUED
+        _finish(db, job_id, FAILED, last_error=error, finished_at=_now())
+        return FAILED
+
+    _finish(db, job_id, SUCCEEDED, result=result, finished_at=_now())
+    return SUCCEEDED
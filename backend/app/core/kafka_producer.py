@@ -1,10 +1,9 @@
-import importlib
 import json
 import logging
 import os
 import uuid
 from datetime import datetime, timezone
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, Optional, Tuple
 
 
 logger = logging.getLogger(__name__)
@@ -17,9 +16,10 @@ def _get_producer() -> Any:
     if _producer is not None:
         return _producer
 
+    # Imported on the first event, not at module import: kafka-python is
+    # slow to import and optional outside the docker-compose stack.
     try:
-        kafka_module = importlib.import_module("kafka")
-        KafkaProducer = getattr(kafka_module, "KafkaProducer")
+        from kafka import KafkaProducer
     except Exception:
         class DummyProducer:
             def send(self, *args: Any, **kwargs: Any) -> None:
@@ -40,6 +40,15 @@ def _get_producer() -> Any:
     return _producer
 
 
+def _build_event(event_type: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "event_id": str(uuid.uuid4()),
+        "event_type": event_type,
+        "occurred_at": datetime.now(timezone.utc).isoformat(),
+        **payload,
+    }
+
+
 def send_event(
     topic: str,
     key: Optional[str],
@@ -48,14 +57,31 @@ def send_event(
 ) -> None:
     producer = _get_producer()
 
-    event = {
-        "event_id": str(uuid.uuid4()),
-        "event_type": event_type,
-        "occurred_at": datetime.now(timezone.utc).isoformat(),
-        **payload,
-    }
+    event = _build_event(event_type, payload)
 
     try:
         producer.send(topic, key=key, value=event)
     except Exception:
         logger.exception("Failed to send event to Kafka topic %s", topic)
+
+
+def send_events(
+    topic: str,
+    event_type: str,
+    events: Iterable[Tuple[Optional[str], Dict[str, Any]]],
+) -> None:
+    """Publish a batch of ``(key, payload)`` events and flush the producer once.
+
+    The producer batches the sends internally, so a bulk operation costs one
+    flush instead of a round trip per event.
+    """
+    producer = _get_producer()
+
+    try:
+        for key, payload in events:
+            producer.send(topic, key=key, value=_build_event(event_type, payload))
+        flush = getattr(producer, "flush", None)
+        if flush is not None:
+            flush()
+    except Exception:
+        logger.exception("Failed to send event batch to Kafka topic %s", topic)
@@ -0,0 +1,309 @@
+"""Minimal in-process metrics rendered in the Prometheus text format.
+
+Only counters, gauges and histograms with a fixed label set are supported,
+which is all the request instrumentation needs.
+
+With several worker processes, set ``METRICS_DIR`` to a directory they
+share (``gunicorn.conf.py`` does). Every worker then writes a snapshot of
+its values there every ``METRICS_FLUSH_SECONDS`` and on exit, and
+``/metrics`` renders the sum over all workers, whichever one answers the
+scrape. When a worker exits, the master folds its counters and histograms
+into ``archive.json`` so totals never go backwards; its gauges are dropped.
+"""
+import json
+import math
+import os
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+METRICS_DIR = os.getenv("METRICS_DIR")
+METRICS_FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", "1"))
+ARCHIVE_FILE = "archive.json"
+
+_registry: List["_Metric"] = []
+_lock = threading.Lock()
+_worker_file: Optional[Tuple[int, str]] = None
+_flusher_pid: Optional[int] = None
+
+Values = Dict[Tuple[str, ...], Any]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        with _lock:
+            _registry.append(self)
+
+    def snapshot(self) -> Values:
+        with _lock:
+            return dict(self._values)
+
+    def samples(self, values: Values) -> List[str]:
+        raise NotImplementedError
+
+    def render(self, values: Optional[Values] = None) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+            *self.samples(self.snapshot() if values is None else values),
+        ]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, labels: Tuple[str, ...] = (), amount: float = 1) -> None:
+        with _lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, labels: Tuple[str, ...] = ()) -> float:
+        return self._values.get(labels, 0)
+
+    def samples(self, values: Values) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}"
+            for labels, value in sorted(values.items())
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, labels: Tuple[str, ...] = (), amount: float = 1) -> None:
+        self.inc(labels, -amount)
+
+    def set(self, labels: Tuple[str, ...], value: float) -> None:
+        with _lock:
+            self._values[labels] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # labels -> (per-bucket counts, sum)
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], float]] = {}
+
+    def observe(self, labels: Tuple[str, ...], value: float) -> None:
+        with _lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = ([0] * len(self.buckets), 0.0)
+            counts, total = entry
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            self._values[labels] = (counts, total + value)
+
+    def count(self, labels: Tuple[str, ...] = ()) -> int:
+        entry = self._values.get(labels)
+        return sum(entry[0]) if entry else 0
+
+    def snapshot(self) -> Values:
+        with _lock:
+            return {labels: (list(counts), total) for labels, (counts, total) in self._values.items()}
+
+    def samples(self, values: Values) -> List[str]:
+        lines = []
+        for labels, (counts, total) in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.label_names, labels, le)} {cumulative}"
+                )
+            label_text = _format_labels(self.label_names, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+def _add(kind: str, current: Any, value: Any) -> Any:
+    if kind != "histogram":
+        return (current or 0) + value
+    counts, total = value
+    if current is None:
+        return (list(counts), total)
+    return ([a + b for a, b in zip(current[0], counts)], current[1] + total)
+
+
+def _merge(into: Dict[str, Dict[str, Any]], snapshot: Dict[str, Dict[str, Any]], gauges: bool = True) -> None:
+    """Add a serialized snapshot (``name -> {kind, values}``) into ``into``."""
+    for name, metric in snapshot.items():
+        kind = metric["kind"]
+        if kind == "gauge" and not gauges:
+            continue
+        values = into.setdefault(name, {"kind": kind, "values": {}})["values"]
+        for labels, value in metric["values"]:
+            key = tuple(labels)
+            values[key] = _add(kind, values.get(key), value)
+
+
+def _serialize(merged: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    return {
+        name: {"kind": metric["kind"], "values": [[list(labels), value] for labels, value in metric["values"].items()]}
+        for name, metric in merged.items()
+    }
+
+
+def _read_json(path: str) -> Optional[Any]:
+    try:
+        with open(path) as fh:
+            return json.load(fh)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _write_json(path: str, data: Any) -> None:
+    # Readers only ever see complete files.
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w") as fh:
+        json.dump(data, fh)
+    os.replace(tmp_path, path)
+
+
+def _worker_path() -> str:
+    global _worker_file
+    pid = os.getpid()
+    if _worker_file is None or _worker_file[0] != pid:
+        # The suffix keeps a recycled pid from colliding with an archived worker.
+        _worker_file = (pid, f"worker-{pid}-{uuid.uuid4().hex[:8]}.json")
+    return os.path.join(METRICS_DIR, _worker_file[1])
+
+
+def write_snapshot() -> None:
+    """Write this process's values to ``METRICS_DIR``; a no-op without it."""
+    if not METRICS_DIR:
+        return
+    with _lock:
+        metrics = list(_registry)
+    snapshot = {
+        metric.name: {"kind": metric.kind, "values": [[list(labels), value] for labels, value in metric.snapshot().items()]}
+        for metric in metrics
+    }
+    _write_json(_worker_path(), snapshot)
+
+
+def start_flusher() -> None:
+    """Write snapshots every ``METRICS_FLUSH_SECONDS`` from a daemon thread, once per process."""
+    global _flusher_pid
+    if not METRICS_DIR or _flusher_pid == os.getpid():
+        return
+    _flusher_pid = os.getpid()
+
+    def flush_forever() -> None:
+        while True:
+            time.sleep(METRICS_FLUSH_SECONDS)
+            try:
+                write_snapshot()
+            except OSError:
+                pass
+
+    threading.Thread(target=flush_forever, name="metrics-flusher", daemon=True).start()
+
+
+def collect() -> Dict[str, Values]:
+    """Values summed over every worker in ``METRICS_DIR``, this one freshly written."""
+    write_snapshot()
+    merged: Dict[str, Dict[str, Any]] = {}
+    # Worker files first: a worker archived meanwhile is then listed as merged below.
+    workers = {}
+    for entry in os.listdir(METRICS_DIR):
+        if entry.startswith("worker-") and entry.endswith(".json"):
+            snapshot = _read_json(os.path.join(METRICS_DIR, entry))
+            if snapshot is not None:
+                workers[entry] = snapshot
+    archive = _read_json(os.path.join(METRICS_DIR, ARCHIVE_FILE)) or {"merged": [], "metrics": {}}
+    archived = set(archive["merged"])
+    for entry, snapshot in workers.items():
+        if entry not in archived:
+            _merge(merged, snapshot)
+    _merge(merged, archive["metrics"])
+    return {name: metric["values"] for name, metric in merged.items()}
+
+
+def archive_worker(pid: int) -> None:
+    """Fold an exited worker's counters and histograms into the archive (gunicorn ``child_exit``)."""
+    if not METRICS_DIR:
+        return
+    archive_path = os.path.join(METRICS_DIR, ARCHIVE_FILE)
+    prefix = f"worker-{pid}-"
+    entries = [
+        entry for entry in os.listdir(METRICS_DIR)
+        if entry.startswith(prefix) and entry.endswith(".json")
+    ]
+    if not entries:
+        return
+    archive = _read_json(archive_path) or {"merged": [], "metrics": {}}
+    merged: Dict[str, Dict[str, Any]] = {}
+    _merge(merged, archive["metrics"])
+    for entry in entries:
+        snapshot = _read_json(os.path.join(METRICS_DIR, entry))
+        if snapshot is not None:
+            _merge(merged, snapshot, gauges=False)
+    _write_json(archive_path, {"merged": archive["merged"] + entries, "metrics": _serialize(merged)})
+    for entry in entries:
+        os.remove(os.path.join(METRICS_DIR, entry))
+
+
+def reset_dir() -> None:
+    """Remove snapshots left over from a previous server run (gunicorn ``on_starting``)."""
+    if not METRICS_DIR:
+        return
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    for entry in os.listdir(METRICS_DIR):
+        if entry.startswith(("worker-", ARCHIVE_FILE)):
+            os.remove(os.path.join(METRICS_DIR, entry))
+
+
+def render() -> str:
+    with _lock:
+        metrics = list(_registry)
+    merged = collect() if METRICS_DIR else {}
+    lines: List[str] = []
+    for metric in metrics:
+        lines.extend(metric.render(merged.get(metric.name, {}) if METRICS_DIR else None))
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,63 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, or_
+
+
+def encode_cursor(values: List[Any]) -> str:
+    """Encode the sort key of the last returned row as an opaque cursor."""
+    payload = [
+        {"dt": value.isoformat()} if isinstance(value, datetime) else value
+        for value in values
+    ]
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], size: int) -> Optional[List[Any]]:
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if not isinstance(payload, list) or len(payload) != size:
+            raise ValueError("unexpected cursor shape")
+        return [
+            datetime.fromisoformat(value["dt"]) if isinstance(value, dict) else value
+            for value in payload
+        ]
+    except (ValueError, TypeError, KeyError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+
+
+def after_nullable_key(column, tiebreaker, last_value, last_tiebreaker):
+    """Keyset predicate for ``ORDER BY column ASC NULLS LAST, tiebreaker ASC``."""
+    if last_value is None:
+        return and_(column.is_(None), tiebreaker > last_tiebreaker)
+    return or_(
+        column > last_value,
+        and_(column == last_value, tiebreaker > last_tiebreaker),
+        column.is_(None),
+    )
+
+
+def after_key(column, tiebreaker, last_value, last_tiebreaker):
+    """Keyset predicate for ``ORDER BY column ASC, tiebreaker ASC`` on a non-null column."""
+    return or_(
+        column > last_value,
+        and_(column == last_value, tiebreaker > last_tiebreaker),
+    )
+
+
+def before_key(column, tiebreaker, last_value, last_tiebreaker):
+    """Keyset predicate for ``ORDER BY column DESC, tiebreaker DESC`` on a non-null column."""
+    return or_(
+        column < last_value,
+        and_(column == last_value, tiebreaker < last_tiebreaker),
+    )
@@ -0,0 +1,117 @@
+from typing import NamedTuple, Optional
+
+from sqlalchemy import case, func, literal, select, true
+from sqlalchemy.orm import Session
+
+from app.db import models
+from app.db.database import insert_for
+
+
+class ProgressUpdate(NamedTuple):
+    completed: bool
+    quiz_score: Optional[int]
+    course_progress: int
+
+
+def progress_percent(completed_chapters: int, total_chapters: int) -> int:
+    if not total_chapters:
+        return 0
+    return int((completed_chapters / total_chapters) * 100)
+
+
+def record_progress(
+    db: Session,
+    user_id: str,
+    course_id: str,
+    chapter_id: str,
+    completed: bool,
+    quiz_score: Optional[int] = None,
+) -> Optional[ProgressUpdate]:
+    """Upsert the user's progress row for a chapter.
+
+    The row is inserted from a SELECT on ``chapters`` so a chapter that does
+    not belong to the course inserts nothing and ``None`` is returned.
+    Completion is sticky, the first completion time is kept and the best
+    quiz score wins over later, lower attempts.
+    """
+    table = models.UserProgress.__table__
+    dialect_name = db.get_bind().dialect.name
+    insert = insert_for(db)
+
+    source = select(
+        literal(models.generate_uuid()),
+        literal(user_id),
+        models.Chapter.course_id,
+        models.Chapter.id,
+        literal(completed),
+        literal(quiz_score, type_=table.c.quiz_score.type),
+        func.now() if completed else literal(None, type_=table.c.completed_at.type),
+    ).where(
+        models.Chapter.id == chapter_id,
+        models.Chapter.course_id == course_id,
+    )
+
+    stmt = insert(table).from_select(
+        ["id", "user_id", "course_id", "chapter_id", "completed", "quiz_score", "completed_at"],
+        source,
+    )
+    excluded = stmt.excluded
+    was_completed = func.coalesce(table.c.completed, False) == true()
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.chapter_id],
+        set_={
+            "completed": was_completed | (excluded.completed == true()),
+            "completed_at": case(
+                (was_completed, table.c.completed_at),
+                else_=excluded.completed_at,
+            ),
+            "quiz_score": case(
+                (excluded.quiz_score.is_(None), table.c.quiz_score),
+                (table.c.quiz_score.is_(None), excluded.quiz_score),
+                (excluded.quiz_score > table.c.quiz_score, excluded.quiz_score),
+                else_=table.c.quiz_score,
+            ),
+        },
+    ).returning(table.c.completed, table.c.quiz_score)
+
+    # Counts of the other chapters are taken from the statement snapshot, so
+    # they are valid alongside the upserted row in a single round trip.
+    other_completed = (
+        select(func.count())
+        .select_from(table)
+        .where(
+            table.c.user_id == user_id,
+            table.c.course_id == course_id,
+            table.c.chapter_id != chapter_id,
+            table.c.completed == true(),
+        )
+        .scalar_subquery()
+    )
+    total_chapters = (
+        select(func.count())
+        .select_from(models.Chapter.__table__)
+        .where(models.Chapter.course_id == course_id)
+        .scalar_subquery()
+    )
+
+    if dialect_name == "postgresql":
+        upsert = stmt.cte("progress_upsert")
+        row = db.execute(
+            select(upsert.c.completed, upsert.c.quiz_score, other_completed, total_chapters)
+        ).first()
+        if row is None:
+            return None
+        row_completed, row_score, others, total = row
+    else:
+        row = db.execute(stmt).first()
+        if row is None:
+            return None
+        row_completed, row_score = row
+        others, total = db.execute(select(other_completed, total_chapters)).one()
+
+    completed_chapters = others + (1 if row_completed else 0)
+    return ProgressUpdate(
+        completed=bool(row_completed),
+        quiz_score=row_score,
+        course_progress=progress_percent(completed_chapters, total),
+    )
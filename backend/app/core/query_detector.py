@@ -0,0 +1,154 @@
+"""Flag requests that repeat the same statement shape (N+1 lazy loads) or exceed a query budget.
+
+Statement shapes are the SQL text with bound-parameter lists collapsed, so
+``IN (?, ?)`` and ``IN (?, ?, ?)`` count as the same shape. The request
+instrumentation already groups statements per request; this module only
+inspects those groups after each request.
+
+``QUERY_DETECTOR_MODE=report`` logs every offending request on
+``app.query_detector`` (use it in staging); tests use ``QueryBudget``
+through the ``max_queries`` pytest marker to fail instead.
+"""
+import json
+import logging
+import os
+import re
+from typing import Dict, List, NamedTuple, Optional
+
+from starlette.types import Scope
+
+from app.core import instrumentation, metrics
+from app.core.instrumentation import RequestStats
+
+
+QUERY_DETECTOR_MODE = os.getenv("QUERY_DETECTOR_MODE", "off")
+# A shape executed this many times in one request is reported as N+1.
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "5"))
+
+# Placeholders of the qmark, pyformat, format, named and numeric paramstyles.
+_PARAM = r"(?:\?|%\(\w+\)s|%s|:\w+|\$\d+)"
+_PARAMETER_LIST_RE = re.compile(rf"\(\s*{_PARAM}(?:\s*,\s*{_PARAM})*\s*\)")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+logger = logging.getLogger("app.query_detector")
+
+REPEATED_STATEMENTS = metrics.Counter(
+    "http_repeated_statement_requests_total",
+    "Requests that executed one statement shape at least N_PLUS_ONE_THRESHOLD times.",
+    ("method", "route"),
+)
+
+
+class RepeatedShape(NamedTuple):
+    shape: str
+    count: int
+
+
+class Violation(NamedTuple):
+    method: str
+    path: str
+    queries: int
+    repeated: List[RepeatedShape]
+
+    def describe(self) -> str:
+        lines = [f"{self.method} {self.path}: {self.queries} queries"]
+        lines.extend(f"  {item.count}x {item.shape}" for item in self.repeated)
+        return "\n".join(lines)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def statement_shape(statement: str) -> str:
+    shape = _WHITESPACE_RE.sub(" ", statement).strip()
+    return _PARAMETER_LIST_RE.sub("(?)", shape)
+
+
+def repeated_shapes(stats: RequestStats, threshold: int = N_PLUS_ONE_THRESHOLD) -> List[RepeatedShape]:
+    counts: Dict[str, int] = {}
+    for statement, statement_stats in stats.statements.items():
+        shape = statement_shape(statement)
+        counts[shape] = counts.get(shape, 0) + statement_stats.count
+    return sorted(
+        (RepeatedShape(shape, count) for shape, count in counts.items() if count >= threshold),
+        key=lambda item: item.count,
+        reverse=True,
+    )
+
+
+class QueryBudget:
+    """Collect requests that run more than ``max_queries`` statements or repeat a shape.
+
+    Use as a context manager around requests made through the test client,
+    then call ``check()`` (done on exit) to fail with a per-request report.
+    With ``route`` (a path template such as ``/courses/{course_id}``) only
+    requests to that route are checked, and at least one must have run.
+    """
+
+    def __init__(
+        self,
+        max_queries: Optional[int] = None,
+        repeat_threshold: int = N_PLUS_ONE_THRESHOLD,
+        route: Optional[str] = None,
+    ) -> None:
+        self.max_queries = max_queries
+        self.repeat_threshold = repeat_threshold
+        self.route = route
+        self.observed = 0
+        self.violations: List[Violation] = []
+
+    def observe(self, scope: Scope, stats: RequestStats) -> None:
+        if self.route is not None and getattr(scope.get("route"), "path", None) != self.route:
+            return
+        self.observed += 1
+        repeated = repeated_shapes(stats, self.repeat_threshold)
+        over_budget = self.max_queries is not None and stats.query_count > self.max_queries
+        if repeated or over_budget:
+            self.violations.append(Violation(scope["method"], scope["path"], stats.query_count, repeated))
+
+    def check(self) -> None:
+        if self.route is not None and not self.observed:
+            raise QueryBudgetExceeded(f"Query budget for {self.route}: no request to that route was made")
+        if self.violations:
+            budget = f"max {self.max_queries} queries, " if self.max_queries is not None else ""
+            raise QueryBudgetExceeded(
+                f"Query budget exceeded ({budget}shapes repeated {self.repeat_threshold}+ times):\n"
+                + "\n".join(violation.describe() for violation in self.violations)
+            )
+
+    def __enter__(self) -> "QueryBudget":
+        instrumentation.add_observer(self.observe)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        instrumentation.remove_observer(self.observe)
+        if exc_type is None:
+            self.check()
+
+
+def report(scope: Scope, stats: RequestStats) -> None:
+    repeated = repeated_shapes(stats)
+    if not repeated:
+        return
+    route = getattr(scope.get("route"), "path", instrumentation.UNMATCHED_ROUTE)
+    REPEATED_STATEMENTS.inc((scope["method"], route))
+    logger.warning(
+        json.dumps(
+            {
+                "event": "repeated_statements",
+                "method": scope["method"],
+                "path": scope["path"],
+                "route": route,
+                "queries": stats.query_count,
+                "repeated": [{"sql": item.shape, "count": item.count} for item in repeated],
+            },
+            ensure_ascii=False,
+        )
+    )
+
+
+def install() -> None:
+    """Enable report mode when ``QUERY_DETECTOR_MODE=report``."""
+    if QUERY_DETECTOR_MODE == "report":
+        instrumentation.add_observer(report)
@@ -0,0 +1,145 @@
+import math
+from typing import Optional
+
+from sqlalchemy import insert as sa_insert
+from sqlalchemy.orm import Session
+
+from app.core.quiz_grading import GradeResult
+from app.db import models
+from app.db.database import insert_for
+
+
+def record_attempt(
+    db: Session,
+    user_id: str,
+    course_id: str,
+    chapter_id: str,
+    result: GradeResult,
+    passed: bool,
+) -> str:
+    """Append a quiz attempt and fold it into the per-question and per-chapter aggregates.
+
+    The attempt, all of its per-question rows and both aggregate upserts are
+    written with one statement each, inside the caller's transaction.
+    """
+    score = result.score
+    attempt_id = models.generate_uuid()
+
+    db.execute(
+        sa_insert(models.QuizAttempt.__table__).values(
+            id=attempt_id,
+            user_id=user_id,
+            course_id=course_id,
+            chapter_id=chapter_id,
+            score=score,
+            correct_answers=result.correct_answers,
+            total_questions=result.total_questions,
+            passed=passed,
+        )
+    )
+
+    insert = insert_for(db)
+
+    if result.items:
+        db.execute(
+            sa_insert(models.QuizAttemptItem.__table__),
+            [
+                {
+                    "id": models.generate_uuid(),
+                    "attempt_id": attempt_id,
+                    "quiz_id": quiz_id,
+                    "is_correct": is_correct,
+                }
+                for quiz_id, is_correct in result.items.items()
+            ],
+        )
+
+        question_table = models.QuizQuestionStats.__table__
+        stmt = insert(question_table).values([
+            {
+                "quiz_id": quiz_id,
+                "chapter_id": chapter_id,
+                "attempts": 1,
+                "correct": int(is_correct),
+                "score_sum": score,
+                "score_sq_sum": score * score,
+                "correct_score_sum": score if is_correct else 0,
+            }
+            for quiz_id, is_correct in result.items.items()
+        ])
+        excluded = stmt.excluded
+        db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[question_table.c.quiz_id],
+                set_={
+                    column: question_table.c[column] + excluded[column]
+                    for column in ("attempts", "correct", "score_sum", "score_sq_sum", "correct_score_sum")
+                },
+            )
+        )
+
+    chapter_table = models.QuizChapterStats.__table__
+    stmt = insert(chapter_table).values(
+        chapter_id=chapter_id,
+        course_id=course_id,
+        attempts=1,
+        passed=int(passed),
+        score_sum=score,
+    )
+    excluded = stmt.excluded
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[chapter_table.c.chapter_id],
+            set_={
+                column: chapter_table.c[column] + excluded[column]
+                for column in ("attempts", "passed", "score_sum")
+            },
+        )
+    )
+
+    return attempt_id
+
+
+def difficulty(stats: models.QuizQuestionStats) -> Optional[float]:
+    """Share of attempts that answered the question correctly (classical p-value)."""
+    if not stats.attempts:
+        return None
+    return stats.correct / stats.attempts
+
+
+def discrimination(stats: models.QuizQuestionStats) -> Optional[float]:
+    """Point-biserial correlation between answering correctly and the attempt score.
+
+    Computed from running sums, so it never needs the raw attempts.
+    """
+    n = stats.attempts
+    sum_x = stats.correct
+    sum_y = stats.score_sum
+    sum_y2 = stats.score_sq_sum
+    sum_xy = stats.correct_score_sum
+
+    variance_x = n * sum_x - sum_x * sum_x
+    variance_y = n * sum_y2 - sum_y * sum_y
+    if variance_x <= 0 or variance_y <= 0:
+        return None
+
+    return (n * sum_xy - sum_x * sum_y) / math.sqrt(variance_x * variance_y)
+
+
+def delete_chapter_data(db: Session, chapter_ids) -> None:
+    """Delete attempts and aggregates for the given chapter IDs (a list or a subquery)."""
+    attempt_ids = db.query(models.QuizAttempt.id).filter(
+        models.QuizAttempt.chapter_id.in_(chapter_ids)
+    )
+    db.query(models.QuizAttemptItem).filter(
+        models.QuizAttemptItem.attempt_id.in_(attempt_ids)
+    ).delete(synchronize_session=False)
+    db.query(models.QuizAttempt).filter(
+        models.QuizAttempt.chapter_id.in_(chapter_ids)
+    ).delete(synchronize_session=False)
+    db.query(models.QuizQuestionStats).filter(
+        models.QuizQuestionStats.chapter_id.in_(chapter_ids)
+    ).delete(synchronize_session=False)
+    db.query(models.QuizChapterStats).filter(
+        models.QuizChapterStats.chapter_id.in_(chapter_ids)
+    ).delete(synchronize_session=False)
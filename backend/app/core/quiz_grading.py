@@ -0,0 +1,154 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Mapping, NamedTuple, Optional, Tuple
+
+from sqlalchemy.orm import Session, joinedload
+
+from app.db import models
+
+
+ANSWER_KEY_CACHE_MAX_CHAPTERS = int(os.getenv("ANSWER_KEY_CACHE_MAX_CHAPTERS", "5000"))
+
+
+class AnswerKey(NamedTuple):
+    quiz_count: int
+    choice_answers: Dict[str, int]
+    text_answers: Dict[str, str]
+
+
+class GradeResult(NamedTuple):
+    correct_answers: int
+    total_questions: int
+    items: Dict[str, bool]
+
+    @property
+    def score(self) -> int:
+        if self.total_questions <= 0:
+            return 0
+        return int((self.correct_answers / self.total_questions) * 100)
+
+
+_cache: "OrderedDict[Tuple[str, str], Tuple[int, AnswerKey]]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def normalize_text_answer(value: str) -> str:
+    return value.strip().lower()
+
+
+def compile_answer_key(quizzes: Iterable[models.Quiz]) -> AnswerKey:
+    """Precompute everything grading needs from a chapter's quizzes.
+
+    Choice questions with fewer than two non-empty options and text
+    questions without a reference answer are not gradable and are left out.
+    """
+    quiz_count = 0
+    choice_answers: Dict[str, int] = {}
+    text_answers: Dict[str, str] = {}
+
+    for quiz in quizzes:
+        quiz_count += 1
+        question_type = getattr(quiz, "question_type", "choice") or "choice"
+        options = quiz.options or []
+
+        if question_type == "choice":
+            non_empty_options = [opt for opt in options if isinstance(opt, str) and opt.strip()]
+            if len(non_empty_options) <= 1:
+                continue
+            choice_answers[quiz.id] = quiz.correct_option
+        elif question_type == "text":
+            correct_text = None
+            if isinstance(options, list) and options:
+                index = quiz.correct_option if 0 <= quiz.correct_option < len(options) else 0
+                correct_text = options[index]
+
+            if not correct_text:
+                continue
+            text_answers[quiz.id] = normalize_text_answer(correct_text)
+
+    return AnswerKey(
+        quiz_count=quiz_count,
+        choice_answers=choice_answers,
+        text_answers=text_answers,
+    )
+
+
+def grade(answer_key: AnswerKey, answers: Mapping[str, Any]) -> GradeResult:
+    # Choice questions always count; text questions only count when answered.
+    items: Dict[str, bool] = {}
+
+    for quiz_id, correct_option in answer_key.choice_answers.items():
+        answer = answers.get(quiz_id)
+        items[quiz_id] = isinstance(answer, int) and answer == correct_option
+
+    for quiz_id, correct_text in answer_key.text_answers.items():
+        answer = answers.get(quiz_id)
+        if isinstance(answer, str):
+            items[quiz_id] = normalize_text_answer(answer) == correct_text
+
+    return GradeResult(
+        correct_answers=sum(items.values()),
+        total_questions=len(items),
+        items=items,
+    )
+
+
+def get_answer_key(db: Session, course_id: str, chapter_id: str) -> Optional[AnswerKey]:
+    """Return the compiled answer key, or ``None`` if the chapter is not in the course.
+
+    Every hit is checked against ``Course.content_version`` (a primary-key
+    lookup of one column), so an edit made through any worker is graded
+    against from the next submission on, without reloading the quizzes of
+    unchanged chapters.
+    """
+    cache_key = (course_id, chapter_id)
+
+    with _lock:
+        entry = _cache.get(cache_key)
+        if entry is not None:
+            _cache.move_to_end(cache_key)
+    if entry is not None:
+        content_version, answer_key = entry
+        current_version = (
+            db.query(models.Course.content_version)
+            .filter(models.Course.id == course_id)
+            .scalar()
+        )
+        if current_version == content_version:
+            return answer_key
+
+    row = (
+        db.query(models.Chapter, models.Course.content_version)
+        .join(models.Course, models.Course.id == models.Chapter.course_id)
+        .options(joinedload(models.Chapter.quizzes))
+        .filter(
+            models.Chapter.id == chapter_id,
+            models.Chapter.course_id == course_id,
+        )
+        .first()
+    )
+    if not row:
+        return None
+
+    chapter, content_version = row
+    answer_key = compile_answer_key(chapter.quizzes)
+
+    with _lock:
+        _cache[cache_key] = (content_version, answer_key)
+        _cache.move_to_end(cache_key)
+        while len(_cache) > ANSWER_KEY_CACHE_MAX_CHAPTERS:
+            _cache.popitem(last=False)
+
+    return answer_key
+
+
+def invalidate_course(course_id: str) -> None:
+    with _lock:
+        for cache_key in [key for key in _cache if key[0] == course_id]:
+            del _cache[cache_key]
+
+
+def clear() -> None:
+    with _lock:
+        _cache.clear()
@@ -0,0 +1,314 @@
+"""Token-bucket rate limiting per user, IP and route.
+
+Each request is matched to its route's policies by exact method and path,
+or falls back to ``DEFAULT_POLICY``, and takes a token from one bucket per
+policy. A policy keys its buckets by:
+
+- ``user``: the ``sub`` of a valid bearer token. Tokens are verified here
+  (an LRU of token -> sub keeps repeat requests cheap); anonymous requests
+  and invalid or expired tokens fall back to the client IP, so made-up
+  tokens cannot dodge the limit.
+- ``ip``: the client address. Behind a proxy, let uvicorn rewrite it
+  (``--forwarded-allow-ips``).
+- ``ip_username``: the client address and the ``username`` form field.
+  Logins are limited per account and IP, with a generous per-IP cap on
+  top, so a whole classroom behind one school NAT can still sign in.
+
+A bucket holds ``burst`` tokens and refills at ``rate`` per second. A
+request that finds any of its buckets empty gets 429 with ``Retry-After``
+before it reaches routing or a worker thread.
+
+Buckets live in the worker process (``MemoryStore``), so every limit
+applies per worker and multiplies with the worker count; with
+``RATE_LIMIT_REDIS_URL`` they are shared between workers and replicas
+through Redis instead. The Redis store fails open if Redis is unavailable.
+The in-process path is a dict lookup and a few float operations, a few
+microseconds per request (``python -m benchmarks.rate_limit``).
+"""
+import logging
+import math
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qs
+
+from jose import JWTError, jwt
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core import metrics
+from app.core.security import ALGORITHM, SECRET_KEY
+
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
+RATE_LIMIT_REDIS_URL = os.getenv("RATE_LIMIT_REDIS_URL")
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+RATE_LIMIT_TOKEN_CACHE_SIZE = int(os.getenv("RATE_LIMIT_TOKEN_CACHE_SIZE", "10000"))
+# Only login bodies are read ahead; anything larger is not a login form.
+MAX_FORM_BYTES = 4096
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMITED = metrics.Counter(
+    "http_rate_limited_total",
+    "Requests rejected with 429, by rate limit policy.",
+    ("policy",),
+)
+
+
+class Policy(NamedTuple):
+    name: str
+    rate: float
+    burst: int
+    key: str  # "user" (verified token sub, else IP), "ip" or "ip_username"
+
+
+DEFAULT_POLICY = Policy(
+    "default",
+    float(os.getenv("RATE_LIMIT_DEFAULT_RATE", "20")),
+    int(os.getenv("RATE_LIMIT_DEFAULT_BURST", "100")),
+    "user",
+)
+
+# Login, registration and password changes run bcrypt; unread-count is polled.
+ROUTE_POLICIES: Dict[Tuple[str, str], Tuple[Policy, ...]] = {
+    ("POST", "/auth/login"): (
+        Policy("login", 120 / 60, 60, "ip"),
+        Policy("login_account", 10 / 60, 10, "ip_username"),
+    ),
+    ("POST", "/auth/register"): (Policy("register", 5 / 60, 5, "ip"),),
+    ("POST", "/auth/forgot-password"): (Policy("password_reset", 5 / 60, 5, "ip"),),
+    ("POST", "/auth/reset-password"): (Policy("password_reset", 5 / 60, 5, "ip"),),
+    ("POST", "/auth/change-password"): (Policy("change_password", 5 / 60, 5, "user"),),
+    ("GET", "/notifications/unread-count"): (Policy("unread_count", 1, 10, "user"),),
+}
+
+EXEMPT_PATHS = frozenset({"/metrics", "/health/live", "/health/ready"})
+
+
+class MemoryStore:
+    """Buckets of one worker process; only touched from its event loop, so no lock."""
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS) -> None:
+        self.max_keys = max_keys
+        # key -> [tokens, updated_at, full_at]
+        self._buckets: Dict[str, List[float]] = {}
+
+    def take(self, key: str, rate: float, burst: int, now: Optional[float] = None) -> float:
+        """Take one token; return 0 if allowed, else seconds until a token is available."""
+        if now is None:
+            now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self.max_keys:
+                self._evict(now)
+            self._buckets[key] = [burst - 1, now, now + 1 / rate]
+            return 0.0
+        tokens = bucket[0] + (now - bucket[1]) * rate
+        if tokens > burst:
+            tokens = burst
+        bucket[1] = now
+        if tokens >= 1:
+            bucket[0] = tokens - 1
+            bucket[2] = now + (burst - tokens + 1) / rate
+            return 0.0
+        bucket[0] = tokens
+        return (1 - tokens) / rate
+
+    async def take_async(self, key: str, rate: float, burst: int) -> float:
+        return self.take(key, rate, burst)
+
+    def _evict(self, now: float) -> None:
+        # Refilled buckets are the same as absent ones; if that is not enough
+        # (many distinct keys at once), drop the oldest half.
+        full = [key for key, bucket in self._buckets.items() if bucket[2] <= now]
+        for key in full:
+            del self._buckets[key]
+        if len(self._buckets) >= self.max_keys:
+            for key in list(self._buckets)[: len(self._buckets) // 2]:
+                del self._buckets[key]
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+_REDIS_TAKE = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(bucket[1]) or burst
+local updated = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + (now - updated) * rate)
+local retry_after = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+else
+  retry_after = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(retry_after)
+"""
+
+
+class RedisStore:
+    """Buckets shared by every worker through one Lua script call per request."""
+
+    def __init__(self, url: str, prefix: str = "ratelimit:") -> None:
+        self.url = url
+        self.prefix = prefix
+        self._script = None
+
+    async def take_async(self, key: str, rate: float, burst: int) -> float:
+        try:
+            if self._script is None:
+                # Optional dependency, only needed when RATE_LIMIT_REDIS_URL is set.
+                from redis import asyncio as redis_asyncio
+
+                self._script = redis_asyncio.from_url(self.url).register_script(_REDIS_TAKE)
+            return float(await self._script(keys=[self.prefix + key], args=[rate, burst]))
+        except Exception:
+            logger.exception("Rate limit store unavailable; allowing the request")
+            return 0.0
+
+
+STORE = RedisStore(RATE_LIMIT_REDIS_URL) if RATE_LIMIT_REDIS_URL else MemoryStore()
+
+
+def policies_for(scope: Scope) -> Tuple[Policy, ...]:
+    if scope["method"] == "OPTIONS" or scope["path"] in EXEMPT_PATHS:
+        return ()
+    return ROUTE_POLICIES.get((scope["method"], scope["path"]), (DEFAULT_POLICY,))
+
+
+class TokenSubjects:
+    """LRU of verified bearer tokens -> ``(sub, exp)``; invalid tokens are never cached."""
+
+    def __init__(self, max_size: int = RATE_LIMIT_TOKEN_CACHE_SIZE) -> None:
+        self.max_size = max_size
+        self._subjects: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+
+    def subject(self, token: str) -> Optional[str]:
+        entry = self._subjects.get(token)
+        if entry is not None:
+            sub, exp = entry
+            if exp > time.time():
+                self._subjects.move_to_end(token)
+                return sub
+            del self._subjects[token]
+            return None
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        except JWTError:
+            return None
+        sub = payload.get("sub")
+        if not isinstance(sub, str):
+            return None
+        self._subjects[token] = (sub, float(payload.get("exp") or math.inf))
+        if len(self._subjects) > self.max_size:
+            self._subjects.popitem(last=False)
+        return sub
+
+    def __len__(self) -> int:
+        return len(self._subjects)
+
+
+SUBJECTS = TokenSubjects()
+
+
+def bearer_token(scope: Scope) -> Optional[str]:
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() == "bearer" and token:
+                return token.strip()
+    return None
+
+
+def client_ip(scope: Scope) -> str:
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def identity(scope: Scope, policy: Policy, username: Optional[str] = None) -> str:
+    if policy.key == "user":
+        token = bearer_token(scope)
+        sub = SUBJECTS.subject(token) if token else None
+        if sub is not None:
+            return "u:" + sub
+    if policy.key == "ip_username":
+        return f"ip:{client_ip(scope)}:n:{(username or '').strip().lower()}"
+    return "ip:" + client_ip(scope)
+
+
+def _replaying(messages: List[Message], receive: Receive) -> Receive:
+    async def replaying_receive() -> Message:
+        if messages:
+            return messages.pop(0)
+        return await receive()
+
+    return replaying_receive
+
+
+async def read_form_username(scope: Scope, receive: Receive) -> Tuple[Optional[str], Receive]:
+    """Read a small urlencoded body ahead of the app.
+
+    Returns the ``username`` field and a ``receive`` that hands the app the
+    body again. Bodies over ``MAX_FORM_BYTES`` are passed on unparsed.
+    """
+    body = b""
+    more_body = True
+    while more_body and len(body) <= MAX_FORM_BYTES:
+        message = await receive()
+        if message["type"] != "http.request":
+            return None, _replaying([message], receive)
+        body += message.get("body", b"")
+        more_body = message.get("more_body", False)
+    receive = _replaying([{"type": "http.request", "body": body, "more_body": more_body}], receive)
+
+    content_type = dict(scope["headers"]).get(b"content-type", b"")
+    if more_body or not content_type.startswith(b"application/x-www-form-urlencoded"):
+        return None, receive
+    values = parse_qs(body.decode("latin-1")).get("username")
+    return (values[0] if values else None), receive
+
+
+class RateLimitMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not RATE_LIMIT_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        policies = policies_for(scope)
+        if not policies:
+            await self.app(scope, receive, send)
+            return
+
+        username = None
+        if any(policy.key == "ip_username" for policy in policies):
+            username, receive = await read_form_username(scope, receive)
+
+        limited_by = None
+        retry_after = 0.0
+        for policy in policies:
+            wait = await STORE.take_async(
+                f"{policy.name}:{identity(scope, policy, username)}", policy.rate, policy.burst
+            )
+            if wait > retry_after:
+                limited_by, retry_after = policy, wait
+        if limited_by is None:
+            await self.app(scope, receive, send)
+            return
+
+        RATE_LIMITED.inc((limited_by.name,))
+        response = JSONResponse(
+            {"detail": "Too many requests, retry later"},
+            status_code=429,
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+        await response(scope, receive, send)
@@ -0,0 +1,54 @@
+import os
+import threading
+import time
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+
+COUNT_CACHE_TTL_SECONDS = float(os.getenv("COUNT_CACHE_TTL_SECONDS", "60"))
+# Below this many rows the planner statistics are too coarse; count exactly.
+ESTIMATE_MIN_ROWS = int(os.getenv("COUNT_ESTIMATE_MIN_ROWS", "10000"))
+
+_cache: Dict[Hashable, Tuple[float, int]] = {}
+_lock = threading.Lock()
+
+
+def estimated_rows(db: Session, table_name: str) -> Optional[int]:
+    """Planner estimate of a table's row count, or ``None`` when unavailable."""
+    if db.get_bind().dialect.name != "postgresql":
+        return None
+    estimate = db.execute(
+        text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:name)"),
+        {"name": table_name},
+    ).scalar()
+    if estimate is None or estimate < ESTIMATE_MIN_ROWS:
+        return None
+    return int(estimate)
+
+
+def cached_count(key: Hashable, compute: Callable[[], int]) -> int:
+    """Return a count computed at most once per ``COUNT_CACHE_TTL_SECONDS`` per key."""
+    now = time.monotonic()
+    with _lock:
+        entry = _cache.get(key)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+
+    value = compute()
+    with _lock:
+        _cache[key] = (now + COUNT_CACHE_TTL_SECONDS, value)
+    return value
+
+
+def invalidate(table_name: str) -> None:
+    """Drop cached counts whose key starts with ``table_name``."""
+    with _lock:
+        for key in [k for k in _cache if isinstance(k, tuple) and k and k[0] == table_name]:
+            del _cache[key]
+
+
+def clear() -> None:
+    with _lock:
+        _cache.clear()
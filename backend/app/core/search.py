@@ -0,0 +1,164 @@
+import re
+from typing import Collection, List, NamedTuple, Optional, Sequence
+
+from sqlalchemy import Float, and_, cast, column, func, literal, literal_column, or_, select, table, union_all
+from sqlalchemy.orm import Session
+
+from app.db import models
+from app.db.search_index import FTS_TABLE, SOURCES, TS_CONFIG
+
+
+SNIPPET_START = "<mark>"
+SNIPPET_STOP = "</mark>"
+
+_fts = table(
+    FTS_TABLE,
+    column("kind"),
+    column("ref_id"),
+    column("course_id"),
+    column("title"),
+    column("body"),
+)
+
+
+class SearchHit(NamedTuple):
+    kind: str
+    id: str
+    course_id: str
+    title: str
+    snippet: Optional[str]
+    rank: float
+
+
+def _after(page, after):
+    last_rank, last_kind, last_id = after
+    return or_(
+        page.c.rank < last_rank,
+        and_(
+            page.c.rank == last_rank,
+            or_(
+                page.c.kind > last_kind,
+                and_(page.c.kind == last_kind, page.c.id > last_id),
+            ),
+        ),
+    )
+
+
+def _postgres_search(db, q, kinds, course_ids, limit, after):
+    tsquery = func.websearch_to_tsquery(TS_CONFIG, q)
+    selects = []
+    for kind in kinds:
+        source = SOURCES[kind]
+        tbl = models.Base.metadata.tables[source.table]
+        vector = literal_column(f"{source.table}.search_vector")
+        stmt = select(
+            literal(kind).label("kind"),
+            tbl.c.id.label("id"),
+            tbl.c[source.course_column].label("course_id"),
+            tbl.c[source.title_column].label("title"),
+            tbl.c[source.body_column].label("body"),
+            cast(func.ts_rank_cd(vector, tsquery), Float).label("rank"),
+        ).where(vector.op("@@")(tsquery))
+        if course_ids is not None and kind != "course":
+            stmt = stmt.where(tbl.c[source.course_column].in_(course_ids))
+        selects.append(stmt)
+
+    matches = union_all(*selects).subquery("matches")
+    page = select(matches)
+    if after is not None:
+        page = page.where(_after(matches, after))
+    page = (
+        page.order_by(matches.c.rank.desc(), matches.c.kind, matches.c.id)
+        .limit(limit)
+        .subquery("page")
+    )
+
+    # Headlines are the expensive part, so they are only built for the page.
+    headline = func.ts_headline(
+        TS_CONFIG,
+        func.coalesce(page.c.body, page.c.title),
+        tsquery,
+        f"StartSel={SNIPPET_START}, StopSel={SNIPPET_STOP}, MaxWords=30, MinWords=10, MaxFragments=1",
+    )
+    return db.execute(
+        select(
+            page.c.kind,
+            page.c.id,
+            page.c.course_id,
+            page.c.title,
+            headline.label("snippet"),
+            page.c.rank,
+        ).order_by(page.c.rank.desc(), page.c.kind, page.c.id)
+    ).all()
+
+
+def _fts5_query(q: str) -> Optional[str]:
+    terms = re.findall(r"\w+", q, re.UNICODE)
+    if not terms:
+        return None
+    return " ".join(f'"{term}"' for term in terms)
+
+
+def _sqlite_search(db, q, kinds, course_ids, limit, after):
+    match = _fts5_query(q)
+    if match is None:
+        return []
+
+    fts = literal_column(FTS_TABLE)
+    matches = (
+        select(
+            _fts.c.kind.label("kind"),
+            _fts.c.ref_id.label("id"),
+            _fts.c.course_id.label("course_id"),
+            _fts.c.title.label("title"),
+            func.snippet(fts, -1, SNIPPET_START, SNIPPET_STOP, "…", 16).label("snippet"),
+            (-func.bm25(fts, 0.0, 0.0, 0.0, 10.0, 1.0)).label("rank"),
+        )
+        .where(fts.op("MATCH")(match), _fts.c.kind.in_(kinds))
+    )
+    if course_ids is not None:
+        matches = matches.where(
+            or_(_fts.c.kind == "course", _fts.c.course_id.in_(course_ids))
+        )
+    matches = matches.subquery("matches")
+
+    stmt = select(matches)
+    if after is not None:
+        stmt = stmt.where(_after(matches, after))
+    stmt = stmt.order_by(matches.c.rank.desc(), matches.c.kind, matches.c.id).limit(limit)
+    return db.execute(stmt).all()
+
+
+def search(
+    db: Session,
+    q: str,
+    kinds: Sequence[str],
+    course_ids: Optional[Collection[str]],
+    limit: int,
+    after: Optional[Sequence] = None,
+) -> List[SearchHit]:
+    """Ranked full-text search over courses, chapters and assignments.
+
+    ``course_ids`` limits chapters and assignments to those courses (``None``
+    means no restriction). ``after`` is the ``(rank, kind, id)`` of the last
+    hit of the previous page.
+    """
+    if not kinds:
+        return []
+
+    if db.get_bind().dialect.name == "postgresql":
+        rows = _postgres_search(db, q, kinds, course_ids, limit, after)
+    else:
+        rows = _sqlite_search(db, q, kinds, course_ids, limit, after)
+
+    return [
+        SearchHit(
+            kind=row.kind,
+            id=row.id,
+            course_id=row.course_id,
+            title=row.title,
+            snippet=row.snippet,
+            rank=float(row.rank),
+        )
+        for row in rows
+    ]
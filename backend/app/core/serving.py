@@ -0,0 +1,52 @@
+"""Process and threadpool sizing for the production server (see ``gunicorn.conf.py``).
+
+Each worker is one event loop. Async routes share it, while sync routes (most of
+this API) run on AnyIO's worker threadpool. The pool has 40 threads by default
+and ``THREADPOOL_SIZE`` overrides it. A request only holds a database
+connection while its thread runs, so the pool size times the worker count
+should stay within what Postgres allows.
+"""
+import math
+import os
+from typing import Optional
+
+
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", "40"))
+
+
+def available_cpus() -> int:
+    """CPUs this process may use: the affinity mask, capped by a cgroup v2 quota."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    quota = _cgroup_cpu_quota()
+    if quota is not None:
+        cpus = min(cpus, max(1, math.ceil(quota)))
+    return cpus
+
+
+def _cgroup_cpu_quota() -> Optional[float]:
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as cpu_max:
+            quota, period = cpu_max.read().split()
+    except (OSError, ValueError):
+        return None
+    if quota == "max":
+        return None
+    return int(quota) / int(period)
+
+
+def worker_count() -> int:
+    """``WEB_CONCURRENCY`` if set, else ``WORKERS_PER_CORE`` (default 1) per available CPU."""
+    if os.getenv("WEB_CONCURRENCY"):
+        return max(1, int(os.environ["WEB_CONCURRENCY"]))
+    per_core = float(os.getenv("WORKERS_PER_CORE", "1"))
+    return max(1, round(per_core * available_cpus()))
+
+
+def configure_threadpool(size: int = THREADPOOL_SIZE) -> None:
+    """Resize the threadpool that runs sync routes and dependencies; call from inside the event loop."""
+    from anyio import to_thread
+
+    to_thread.current_default_thread_limiter().total_tokens = size
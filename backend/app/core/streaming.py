@@ -0,0 +1,51 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, Sequence
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def csv_chunks(
+    fieldnames: Sequence[str],
+    rows: Iterable[Dict[str, Any]],
+    batch_size: int = 500,
+) -> Iterator[str]:
+    """Render ``rows`` as CSV, yielding the header first and then one chunk per batch."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fieldnames, extrasaction="ignore")
+    writer.writeheader()
+    yield buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    pending = 0
+
+    for row in rows:
+        writer.writerow({key: _plain(value) for key, value in row.items()})
+        pending += 1
+        if pending >= batch_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+
+    if pending:
+        yield buffer.getvalue()
+
+
+def ndjson_chunks(rows: Iterable[Dict[str, Any]], batch_size: int = 500) -> Iterator[str]:
+    """Render ``rows`` as newline-delimited JSON, one chunk per batch."""
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(row, default=_plain, ensure_ascii=False))
+        if len(lines) >= batch_size:
+            yield "\n".join(lines) + "\n"
+            lines = []
+
+    if lines:
+        yield "\n".join(lines) + "\n"
@@ -0,0 +1,186 @@
+"""One-shot schema migration and admin bootstrap.
+
+Run once per deploy, before the API workers start:
+
+    python -m app.db.bootstrap            # migrate to head, create admin, ensure tables
+    python -m app.db.bootstrap --check    # exit 1 unless the schema is at head
+    python -m app.db.bootstrap --rebuild-assignment-inbox
+                                          # before setting ASSIGNMENT_INBOX_ENABLED
+
+Concurrent runs (several replicas starting together) serialize on a
+Postgres advisory lock, so only one of them migrates and the others find
+the schema already at head. API workers then start with
+``DB_STARTUP_MODE=verify``: they only compare the stored revision with the
+migration head and refuse to boot on a mismatch, instead of migrating
+in every worker.
+"""
+import argparse
+import os
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Set
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+# migrate: upgrade + bootstrap in the worker (single-process development);
+# verify: only check the revision; off: no database work at startup.
+DB_STARTUP_MODE = os.getenv("DB_STARTUP_MODE", "migrate")
+# Arbitrary application-wide key for pg_advisory_lock.
+MIGRATION_LOCK_KEY = 720_315_001
+MIGRATION_LOCK_TIMEOUT_SECONDS = float(os.getenv("MIGRATION_LOCK_TIMEOUT_SECONDS", "300"))
+
+
+class SchemaOutOfDate(RuntimeError):
+    pass
+
+
+def alembic_config(connection: Connection = None):
+    from alembic.config import Config
+
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "alembic"))
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
+
+def head_revisions() -> Set[str]:
+    from alembic.script import ScriptDirectory
+
+    return set(ScriptDirectory.from_config(alembic_config()).get_heads())
+
+
+def current_revisions(connection: Connection) -> Set[str]:
+    from alembic.runtime.migration import MigrationContext
+
+    return set(MigrationContext.configure(connection).get_current_heads())
+
+
+@contextmanager
+def advisory_lock(connection: Connection, timeout: float = MIGRATION_LOCK_TIMEOUT_SECONDS) -> Iterator[None]:
+    """Hold the migration lock for the connection's session (no-op outside Postgres)."""
+    if connection.dialect.name != "postgresql":
+        yield
+        return
+
+    deadline = time.monotonic() + timeout
+    while not connection.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY}).scalar():
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"Could not acquire the migration lock within {timeout:.0f}s")
+        time.sleep(0.5)
+    connection.commit()
+    try:
+        yield
+    finally:
+        connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        connection.commit()
+
+
+def upgrade(connection: Connection) -> None:
+    from alembic import command
+
+    command.upgrade(alembic_config(connection), "head")
+    connection.commit()
+
+
+def ensure_admin(db: Session) -> bool:
+    """Create the ``ADMIN_EMAIL`` admin if ``ADMIN_PASSWORD`` is set; returns True if created."""
+    from app.core.security import get_password_hash
+    from app.db import models
+
+    admin_email = os.getenv("ADMIN_EMAIL", "admin@admin.com")
+    admin_password = os.getenv("ADMIN_PASSWORD")
+    if not admin_password:
+        print("ADMIN_PASSWORD is not set; skipping admin user creation.")
+        return False
+    if db.query(models.User.id).filter(models.User.email == admin_email).first():
+        print("Admin already exists.")
+        return False
+    db.add(models.User(
+        email=admin_email,
+        name="admin",
+        role="admin",
+        hashed_password=get_password_hash(admin_password),
+    ))
+    db.commit()
+    print("Admin user created.")
+    return True
+
+
+def bootstrap(engine: Engine) -> None:
+    """Migrate to head, create the admin and any ORM tables missing from migrations."""
+    from app.db.database import Base
+
+    with engine.connect() as connection:
+        with advisory_lock(connection):
+            print("Running database migrations...")
+            upgrade(connection)
+            print("Migrations completed successfully.")
+            Base.metadata.create_all(bind=connection)
+            connection.commit()
+            db = Session(bind=connection)
+            try:
+                ensure_admin(db)
+            finally:
+                db.close()
+
+
+def rebuild_assignment_inbox(engine: Engine) -> None:
+    from app.core import assignment_inbox
+
+    db = Session(bind=engine)
+    try:
+        assignment_inbox.rebuild(db)
+    finally:
+        db.close()
+    print("Assignment inbox rebuilt.")
+
+
+def verify_schema(engine: Engine) -> str:
+    """Return the current revision, or raise ``SchemaOutOfDate`` if it is not the head."""
+    with engine.connect() as connection:
+        current = current_revisions(connection)
+    heads = head_revisions()
+    if current != heads:
+        raise SchemaOutOfDate(
+            f"Database schema is at {', '.join(sorted(current)) or 'no revision'}, "
+            f"expected {', '.join(sorted(heads))}; run `python -m app.db.bootstrap` first."
+        )
+    return ", ".join(sorted(current))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--check", action="store_true", help="only verify that the schema is at head")
+    parser.add_argument(
+        "--rebuild-assignment-inbox",
+        action="store_true",
+        help="recompute user_assignment_inbox, which is not maintained while ASSIGNMENT_INBOX_ENABLED is off",
+    )
+    args = parser.parse_args()
+
+    from app.db.database import engine
+
+    if args.rebuild_assignment_inbox:
+        rebuild_assignment_inbox(engine)
+        return
+
+    if args.check:
+        try:
+            print(f"Schema is at head ({verify_schema(engine)}).")
+        except SchemaOutOfDate as exc:
+            print(exc)
+            sys.exit(1)
+        return
+    bootstrap(engine)
+
+
+if __name__ == "__main__":
+    main()
@@ -16,3 +16,17 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def insert_for(db):
+    """Return the dialect-specific ``insert`` that supports ``ON CONFLICT``."""
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+
+def is_replica(db) -> bool:
+    """Whether ``db`` reads from a replica (see ``app.db.replicas``); its rows must not fill process-wide caches."""
+    return bool(db.info.get("replica"))
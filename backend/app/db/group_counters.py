@@ -0,0 +1,58 @@
+from sqlalchemy import event, func, select, update
+from sqlalchemy.orm import Session
+
+from app.db import models
+
+
+def _bump(connection, group_id: str, column: str, delta: int) -> None:
+    groups = models.Group.__table__
+    connection.execute(
+        update(groups)
+        .where(groups.c.id == group_id)
+        .values({column: groups.c[column] + delta})
+    )
+
+
+# Counters follow every ORM insert/delete of a link row, whichever code path
+# makes it; set-based deletes call ``recount`` instead.
+@event.listens_for(models.GroupMember, "after_insert")
+def _member_added(mapper, connection, target):
+    _bump(connection, target.group_id, "member_count", 1)
+
+
+@event.listens_for(models.GroupMember, "after_delete")
+def _member_removed(mapper, connection, target):
+    _bump(connection, target.group_id, "member_count", -1)
+
+
+@event.listens_for(models.GroupCourse, "after_insert")
+def _course_linked(mapper, connection, target):
+    _bump(connection, target.group_id, "course_count", 1)
+
+
+@event.listens_for(models.GroupCourse, "after_delete")
+def _course_unlinked(mapper, connection, target):
+    _bump(connection, target.group_id, "course_count", -1)
+
+
+def recount(db: Session, group_ids) -> None:
+    """Recompute both counters from the link tables for ``group_ids`` (a list or subquery).
+
+    Used after set-based deletes, which bypass the ORM events.
+    """
+    member_count = (
+        select(func.count(models.GroupMember.id))
+        .where(models.GroupMember.group_id == models.Group.id)
+        .scalar_subquery()
+    )
+    course_count = (
+        select(func.count(models.GroupCourse.id))
+        .where(models.GroupCourse.group_id == models.Group.id)
+        .scalar_subquery()
+    )
+    db.execute(
+        update(models.Group)
+        .where(models.Group.id.in_(group_ids))
+        .values(member_count=member_count, course_count=course_count),
+        execution_options={"synchronize_session": False},
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Text, JSON, DateTime
+from sqlalchemy import BigInteger, Boolean, Column, ForeignKey, Integer, String, Text, JSON, DateTime, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .database import Base
@@ -16,6 +16,9 @@ def generate_enrollment_code():
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_role_email", "role", "email"),
+    )
 
     id = Column(String, primary_key=True, default=generate_uuid)
     name = Column(String, nullable=False)
@@ -40,6 +43,7 @@ class Course(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now())
     estimated_minutes = Column(Integer, nullable=True)
+    content_version = Column(Integer, nullable=False, default=1, server_default="1")
 
     chapters = relationship("Chapter", back_populates="course", cascade="all, delete-orphan")
     enrollments = relationship("Enrollment", back_populates="course")
@@ -75,6 +79,9 @@ class Quiz(Base):
 
 class Enrollment(Base):
     __tablename__ = "enrollments"
+    __table_args__ = (
+        Index("ix_enrollments_user_course", "user_id", "course_id"),
+    )
 
     id = Column(String, primary_key=True, default=generate_uuid)
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
@@ -86,6 +93,10 @@ class Enrollment(Base):
 
 class UserProgress(Base):
     __tablename__ = "user_progress"
+    __table_args__ = (
+        UniqueConstraint("user_id", "chapter_id", name="uq_user_progress_user_chapter"),
+        Index("ix_user_progress_course_user", "course_id", "user_id"),
+    )
 
     id = Column(String, primary_key=True, default=generate_uuid)
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
@@ -101,12 +112,19 @@ class UserProgress(Base):
 
 class Group(Base):
     __tablename__ = "groups"
+    __table_args__ = (
+        Index("ix_groups_name_id", "name", "id"),
+        Index("ix_groups_member_count_id", "member_count", "id"),
+        Index("ix_groups_created_at_id", "created_at", "id"),
+    )
 
     id = Column(String, primary_key=True, default=generate_uuid)
     name = Column(String, nullable=False)
     description = Column(Text, nullable=True)
     status = Column(String, nullable=False, default="active")
     owner_id = Column(String, ForeignKey("users.id"), nullable=True)
+    member_count = Column(Integer, nullable=False, default=0, server_default="0")
+    course_count = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now())
 
@@ -119,7 +137,7 @@ class GroupMember(Base):
     __tablename__ = "group_members"
 
     id = Column(String, primary_key=True, default=generate_uuid)
-    group_id = Column(String, ForeignKey("groups.id"), nullable=False)
+    group_id = Column(String, ForeignKey("groups.id"), nullable=False, index=True)
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
@@ -131,7 +149,7 @@ class GroupCourse(Base):
     __tablename__ = "group_courses"
 
     id = Column(String, primary_key=True, default=generate_uuid)
-    group_id = Column(String, ForeignKey("groups.id"), nullable=False)
+    group_id = Column(String, ForeignKey("groups.id"), nullable=False, index=True)
     course_id = Column(String, ForeignKey("courses.id"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
@@ -141,6 +159,9 @@ class GroupCourse(Base):
 
 class Assignment(Base):
     __tablename__ = "assignments"
+    __table_args__ = (
+        Index("ix_assignments_course_due", "course_id", "due_date"),
+    )
 
     id = Column(String, primary_key=True, default=generate_uuid)
     course_id = Column(String, ForeignKey("courses.id"), nullable=False)
@@ -157,6 +178,10 @@ class Assignment(Base):
 
 class AssignmentSubmission(Base):
     __tablename__ = "assignment_submissions"
+    __table_args__ = (
+        Index("ix_assignment_submissions_user_assignment_created", "user_id", "assignment_id", "created_at"),
+        Index("ix_assignment_submissions_assignment_created", "assignment_id", "created_at", "id"),
+    )
 
     id = Column(String, primary_key=True, default=generate_uuid)
     assignment_id = Column(String, ForeignKey("assignments.id"), nullable=False)
@@ -191,3 +216,108 @@ class Notification(Base):
     updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now())
 
     user = relationship("User", back_populates="notifications")
+
+
+class QuizAttempt(Base):
+    __tablename__ = "quiz_attempts"
+
+    id = Column(String, primary_key=True, default=generate_uuid)
+    user_id = Column(String, ForeignKey("users.id"), nullable=False, index=True)
+    course_id = Column(String, ForeignKey("courses.id"), nullable=False)
+    chapter_id = Column(String, ForeignKey("chapters.id"), nullable=False, index=True)
+    score = Column(Integer, nullable=False)
+    correct_answers = Column(Integer, nullable=False)
+    total_questions = Column(Integer, nullable=False)
+    passed = Column(Boolean, nullable=False, default=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    items = relationship("QuizAttemptItem", back_populates="attempt", cascade="all, delete-orphan")
+
+
+class QuizAttemptItem(Base):
+    __tablename__ = "quiz_attempt_items"
+
+    id = Column(String, primary_key=True, default=generate_uuid)
+    attempt_id = Column(String, ForeignKey("quiz_attempts.id"), nullable=False, index=True)
+    quiz_id = Column(String, nullable=False, index=True)
+    is_correct = Column(Boolean, nullable=False)
+
+    attempt = relationship("QuizAttempt", back_populates="items")
+
+
+class QuizQuestionStats(Base):
+    __tablename__ = "quiz_question_stats"
+
+    quiz_id = Column(String, primary_key=True)
+    chapter_id = Column(String, ForeignKey("chapters.id"), nullable=False, index=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    correct = Column(Integer, nullable=False, default=0)
+    score_sum = Column(BigInteger, nullable=False, default=0)
+    score_sq_sum = Column(BigInteger, nullable=False, default=0)
+    correct_score_sum = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now())
+
+
+class QuizChapterStats(Base):
+    __tablename__ = "quiz_chapter_stats"
+
+    chapter_id = Column(String, ForeignKey("chapters.id"), primary_key=True)
+    course_id = Column(String, ForeignKey("courses.id"), nullable=False, index=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    passed = Column(Integer, nullable=False, default=0)
+    score_sum = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now())
+
+
+class UserAssignmentInbox(Base):
+    __tablename__ = "user_assignment_inbox"
+    __table_args__ = (
+        Index("ix_user_assignment_inbox_user_due", "user_id", "due_date", "assignment_id"),
+    )
+
+    user_id = Column(String, primary_key=True)
+    assignment_id = Column(String, primary_key=True, index=True)
+    course_id = Column(String, nullable=False, index=True)
+    due_date = Column(DateTime(timezone=True), nullable=True)
+    latest_submission_id = Column(String, nullable=True)
+
+
+class StoredFile(Base):
+    __tablename__ = "stored_files"
+
+    sha256 = Column(String(64), primary_key=True)
+    size = Column(BigInteger, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+    __table_args__ = (
+        Index("ix_jobs_status_run_at", "status", "run_at"),
+        Index("ix_jobs_type_key", "type", "key"),
+        Index("ix_jobs_created_at_id", "created_at", "id"),
+    )
+
+    id = Column(String, primary_key=True, default=generate_uuid)
+    type = Column(String, nullable=False)
+    key = Column(String, nullable=True)
+    payload = Column(JSON, nullable=False, default=dict)
+    status = Column(String, nullable=False, default="queued")
+    progress = Column(Integer, nullable=False, default=0, server_default="0")
+    total = Column(Integer, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    max_attempts = Column(Integer, nullable=False, default=5, server_default="5")
+    run_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    locked_by = Column(String, nullable=True)
+    locked_at = Column(DateTime(timezone=True), nullable=True)
+    cancel_requested = Column(Boolean, nullable=False, default=False)
+    last_error = Column(Text, nullable=True)
+    result = Column(JSON, nullable=True)
+    created_by = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+from app.db import search_index  # noqa: E402,F401  (registers full-text search DDL)
+from app.db import group_counters  # noqa: E402,F401  (registers group counter events)
@@ -0,0 +1,160 @@
+"""Read-replica routing for read-only endpoints.
+
+``READ_DATABASE_URLS`` lists replica URLs, comma-separated. Read-only GET
+handlers depend on ``get_read_db`` instead of ``get_db``. It picks a
+replica round-robin, but uses the primary session when:
+
+- no replica is configured (the default, so nothing changes);
+- the client made a successful write within ``READ_YOUR_WRITES_SECONDS``.
+  ``ReadYourWritesMiddleware`` marks such clients with a ``primary_until``
+  cookie, so a student sees a chapter they just completed, whichever
+  worker answers;
+- every replica lags behind the primary by more than
+  ``REPLICA_MAX_LAG_SECONDS``, or cannot be reached. Lag is measured at
+  most every ``REPLICA_LAG_CHECK_SECONDS`` per replica and process.
+
+For local testing, point ``READ_DATABASE_URLS`` at a second SQLite file or
+Postgres database with a copy of the data. Only Postgres replicas report
+lag; others count as current.
+
+Replica sessions never fill shared caches such as the enrollment cache: a
+lagging copy would otherwise be served long after the replica caught up.
+"""
+import itertools
+import os
+import threading
+import time
+from typing import Callable, Iterator, List, Optional
+
+from fastapi import Depends, Request
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core import metrics
+from app.db.database import get_db
+
+
+READ_DATABASE_URLS = [url.strip() for url in os.getenv("READ_DATABASE_URLS", "").split(",") if url.strip()]
+READ_YOUR_WRITES_SECONDS = int(os.getenv("READ_YOUR_WRITES_SECONDS", "10"))
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+REPLICA_LAG_CHECK_SECONDS = float(os.getenv("REPLICA_LAG_CHECK_SECONDS", "1"))
+STICKY_COOKIE = "primary_until"
+
+READ_ROUTING = metrics.Counter(
+    "db_read_routing_total",
+    "Sessions handed to read-only handlers, by target and reason.",
+    ("target", "reason"),
+)
+
+_POSTGRES_LAG_SQL = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+def postgres_lag_seconds(engine: Engine) -> float:
+    """Replay lag of a streaming replica; a primary (or another dialect) reports 0."""
+    if engine.dialect.name != "postgresql":
+        return 0.0
+    with engine.connect() as connection:
+        lag = connection.execute(_POSTGRES_LAG_SQL).scalar()
+    return float(lag or 0.0)
+
+
+class Replica:
+    def __init__(self, engine: Engine, lag_probe: Callable[[Engine], float] = postgres_lag_seconds) -> None:
+        self.engine = engine
+        self.session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine, info={"replica": True})
+        self.lag_probe = lag_probe
+        self._lag = 0.0
+        self._checked_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def lag_seconds(self) -> float:
+        """Cached lag; an unreachable replica counts as infinitely behind."""
+        now = time.monotonic()
+        with self._lock:
+            if self._checked_at is not None and now - self._checked_at < REPLICA_LAG_CHECK_SECONDS:
+                return self._lag
+            self._checked_at = now
+        try:
+            lag = self.lag_probe(self.engine)
+        except Exception:
+            lag = float("inf")
+        self._lag = lag
+        return lag
+
+
+REPLICAS: List[Replica] = [Replica(create_engine(url)) for url in READ_DATABASE_URLS]
+_round_robin = itertools.count()
+
+
+def healthy_replica() -> Optional[Replica]:
+    """The next replica in turn whose lag is within ``REPLICA_MAX_LAG_SECONDS``."""
+    if not REPLICAS:
+        return None
+    start = next(_round_robin)
+    for offset in range(len(REPLICAS)):
+        replica = REPLICAS[(start + offset) % len(REPLICAS)]
+        if replica.lag_seconds() <= REPLICA_MAX_LAG_SECONDS:
+            return replica
+    return None
+
+
+def is_sticky(request: Request) -> bool:
+    try:
+        return float(request.cookies.get(STICKY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def get_read_db(request: Request, db: Session = Depends(get_db)) -> Iterator[Session]:
+    """Session for read-only handlers: a replica when it is safe, else the primary ``db``.
+
+    The primary session only checks out a connection if it is actually used.
+    """
+    if not REPLICAS:
+        yield db
+        return
+    if is_sticky(request):
+        READ_ROUTING.inc(("primary", "read_your_writes"))
+        yield db
+        return
+    replica = healthy_replica()
+    if replica is None:
+        READ_ROUTING.inc(("primary", "replica_lag"))
+        yield db
+        return
+
+    READ_ROUTING.inc(("replica", "ok"))
+    replica_db = replica.session_factory()
+    try:
+        yield replica_db
+    finally:
+        replica_db.close()
+
+
+class ReadYourWritesMiddleware:
+    """Set the ``primary_until`` cookie on successful writes while replicas are configured."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not REPLICAS or scope["method"] in ("GET", "HEAD", "OPTIONS"):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                until = int(time.time()) + READ_YOUR_WRITES_SECONDS
+                MutableHeaders(scope=message).append(
+                    "Set-Cookie",
+                    f"{STICKY_COOKIE}={until}; Max-Age={READ_YOUR_WRITES_SECONDS}; Path=/; HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,102 @@
+"""Full-text search objects that live outside the ORM mapping.
+
+On Postgres each searchable table gets a weighted ``search_vector`` tsvector
+column with a GIN index, maintained by a BEFORE trigger. Other dialects
+(SQLite in tests and local runs) get a single FTS5 table fed by triggers.
+Both are created alongside ``create_all``; production databases get the
+same objects from the Alembic migration.
+"""
+from typing import Dict, List, NamedTuple
+
+from sqlalchemy import event, text
+
+from app.db.database import Base
+
+
+TS_CONFIG = "russian"
+FTS_TABLE = "search_index"
+
+
+class SearchSource(NamedTuple):
+    kind: str
+    table: str
+    title_column: str
+    body_column: str
+    course_column: str
+
+
+SOURCES: Dict[str, SearchSource] = {
+    "course": SearchSource("course", "courses", "title", "description", "id"),
+    "chapter": SearchSource("chapter", "chapters", "title", "content", "course_id"),
+    "assignment": SearchSource("assignment", "assignments", "title", "description", "course_id"),
+}
+
+
+def postgres_ddl(source: SearchSource) -> List[str]:
+    table, title, body = source.table, source.title_column, source.body_column
+    return [
+        f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector",
+        f"CREATE INDEX IF NOT EXISTS ix_{table}_search_vector ON {table} USING GIN (search_vector)",
+        f"""
+        CREATE OR REPLACE FUNCTION {table}_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector :=
+                setweight(to_tsvector('{TS_CONFIG}', coalesce(NEW.{title}, '')), 'A') ||
+                setweight(to_tsvector('{TS_CONFIG}', coalesce(NEW.{body}, '')), 'B');
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+        """,
+        f"DROP TRIGGER IF EXISTS {table}_search_vector_trigger ON {table}",
+        f"""
+        CREATE TRIGGER {table}_search_vector_trigger
+        BEFORE INSERT OR UPDATE OF {title}, {body} ON {table}
+        FOR EACH ROW EXECUTE FUNCTION {table}_search_vector_update()
+        """,
+    ]
+
+
+def sqlite_ddl(source: SearchSource) -> List[str]:
+    kind, table = source.kind, source.table
+    title, body, course = source.title_column, source.body_column, source.course_column
+    insert_row = (
+        f"INSERT INTO {FTS_TABLE} (kind, ref_id, course_id, title, body) "
+        f"VALUES ('{kind}', NEW.id, NEW.{course}, NEW.{title}, NEW.{body});"
+    )
+    delete_row = f"DELETE FROM {FTS_TABLE} WHERE kind = '{kind}' AND ref_id = OLD.id;"
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {table}_search_ai AFTER INSERT ON {table} BEGIN {insert_row} END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_search_au AFTER UPDATE ON {table} BEGIN {delete_row} {insert_row} END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_search_ad AFTER DELETE ON {table} BEGIN {delete_row} END",
+    ]
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _create_search_objects(target, connection, tables=(), **kw):
+    created = {table.name for table in tables}
+    sources = [source for source in SOURCES.values() if source.table in created]
+    if not sources:
+        return
+
+    if connection.dialect.name == "postgresql":
+        for source in sources:
+            for statement in postgres_ddl(source):
+                connection.execute(text(statement))
+        return
+
+    connection.execute(
+        text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+            "kind UNINDEXED, ref_id UNINDEXED, course_id UNINDEXED, title, body, "
+            "tokenize = 'unicode61 remove_diacritics 2')"
+        )
+    )
+    for source in sources:
+        for statement in sqlite_ddl(source):
+            connection.execute(text(statement))
+
+
+@event.listens_for(Base.metadata, "before_drop")
+def _drop_search_objects(target, connection, **kw):
+    if connection.dialect.name != "postgresql":
+        connection.execute(text(f"DROP TABLE IF EXISTS {FTS_TABLE}"))
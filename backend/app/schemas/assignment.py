@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import Optional, List, Any
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class AssignmentBase(BaseModel):
@@ -48,6 +48,13 @@ class SubmissionCreate(BaseModel):
     attachments: Optional[Any] = None
 
 
+class AttachmentMeta(BaseModel):
+    sha256: str
+    filename: Optional[str] = None
+    size: int
+    contentType: Optional[str] = None
+
+
 class SubmissionSummary(BaseModel):
     id: str
     assignmentId: str
@@ -80,11 +87,32 @@ class GradeRequest(BaseModel):
     feedback: Optional[str] = None
 
 
+class BulkGradeItem(BaseModel):
+    submissionId: str
+    grade: Optional[int] = None
+    feedback: Optional[str] = None
+
+
+class BulkGradeRequest(BaseModel):
+    items: List[BulkGradeItem] = Field(..., min_length=1, max_length=1000)
+
+
+class BulkGradeResult(BaseModel):
+    submissionId: str
+    status: str
+
+
+class BulkGradeResponse(BaseModel):
+    graded: int
+    items: List[BulkGradeResult]
+
+
 class MyAssignmentWork(BaseModel):
     assignmentId: str
     assignmentTitle: str
     courseId: str
     courseTitle: str
+    dueDate: Optional[datetime] = None
     latestSubmissionId: Optional[str] = None
     latestCreatedAt: Optional[datetime] = None
     grade: Optional[int] = None
@@ -94,3 +122,4 @@ class MyAssignmentWork(BaseModel):
 
 class MyAssignmentsResponse(BaseModel):
     items: List[MyAssignmentWork]
+    nextCursor: Optional[str] = None
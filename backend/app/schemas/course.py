@@ -66,6 +66,8 @@ class QuizResult(BaseModel):
     passed: bool
     correctAnswers: int
     totalQuestions: int
+    bestScore: Optional[int] = None
+    courseProgress: Optional[int] = None
 
 class EnrollmentCodeRequest(BaseModel):
     enrollmentCode: str
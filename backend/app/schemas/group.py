@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from pydantic import BaseModel, EmailStr
 from typing import Optional, List
 
@@ -25,6 +27,7 @@ class GroupSummary(BaseModel):
     ownerId: Optional[str] = None
     memberCount: int
     courseCount: int
+    createdAt: Optional[datetime] = None
 
 
 class GroupMemberAddRequest(BaseModel):
@@ -51,6 +54,26 @@ class GroupDetail(BaseModel):
     ownerId: Optional[str] = None
     members: List[GroupMemberInfo]
     courses: List[GroupCourseInfo]
+    memberCount: Optional[int] = None
+    courseCount: Optional[int] = None
+    nextMemberCursor: Optional[str] = None
+
+
+class GroupMemberDelta(BaseModel):
+    groupId: str
+    member: GroupMemberInfo
+    added: bool
+    memberCount: int
+    courseCount: int
+
+
+class GroupCourseDelta(BaseModel):
+    groupId: str
+    course: GroupCourseInfo
+    linked: bool
+    newlyEnrolled: int
+    memberCount: int
+    courseCount: int
 
 
 class CourseParticipantGroupInfo(BaseModel):
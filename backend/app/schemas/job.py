@@ -0,0 +1,40 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel
+
+
+class JobResponse(BaseModel):
+    id: str
+    type: str
+    status: str
+    progress: int
+    total: Optional[int] = None
+    attempts: int
+    maxAttempts: int
+    cancelRequested: bool
+    lastError: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+    runAt: Optional[datetime] = None
+    createdAt: Optional[datetime] = None
+    startedAt: Optional[datetime] = None
+    finishedAt: Optional[datetime] = None
+
+
+def job_response(job) -> JobResponse:
+    return JobResponse(
+        id=job.id,
+        type=job.type,
+        status=job.status,
+        progress=job.progress or 0,
+        total=job.total,
+        attempts=job.attempts or 0,
+        maxAttempts=job.max_attempts,
+        cancelRequested=bool(job.cancel_requested),
+        lastError=job.last_error,
+        result=job.result,
+        runAt=job.run_at,
+        createdAt=job.created_at,
+        startedAt=job.started_at,
+        finishedAt=job.finished_at,
+    )
@@ -0,0 +1,17 @@
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class SearchResult(BaseModel):
+    kind: str
+    id: str
+    courseId: str
+    title: str
+    snippet: Optional[str] = None
+    rank: float
+
+
+class SearchResponse(BaseModel):
+    items: List[SearchResult]
+    nextCursor: Optional[str] = None
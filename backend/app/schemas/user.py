@@ -72,6 +72,69 @@ class AdminCourseUsersAnalytics(BaseModel):
     users: List[AdminCourseUserProgress]
 
 
+class AdminQuizItemStats(BaseModel):
+    quizId: str
+    question: str
+    attempts: int
+    difficulty: Optional[float] = None
+    discrimination: Optional[float] = None
+
+
+class AdminChapterItemAnalysis(BaseModel):
+    chapterId: str
+    title: str
+    attempts: int
+    passRate: float
+    averageScore: float
+    items: List[AdminQuizItemStats]
+
+
+class AdminChapterQuizStats(BaseModel):
+    chapterId: str
+    title: str
+    order: int
+    attempts: int
+    passRate: float
+    averageScore: float
+
+
+class AdminCourseQuizAnalytics(BaseModel):
+    courseId: str
+    title: str
+    chapters: List[AdminChapterQuizStats]
+
+
+class AdminCohortCourse(BaseModel):
+    courseId: str
+    title: str
+    totalChapters: int
+
+
+class AdminCohortCell(BaseModel):
+    courseId: str
+    enrolled: bool
+    progress: int
+    completedChapters: int
+    averageQuizScore: Optional[float] = None
+    submitted: int
+    graded: int
+    averageGrade: Optional[float] = None
+
+
+class AdminCohortMember(BaseModel):
+    userId: str
+    name: str
+    email: EmailStr
+    courses: List[AdminCohortCell]
+
+
+class AdminCohortMatrix(BaseModel):
+    groupId: str
+    name: str
+    courses: List[AdminCohortCourse]
+    members: List[AdminCohortMember]
+
+
 class ChangePasswordRequest(BaseModel):
     current_password: str
     new_password: str
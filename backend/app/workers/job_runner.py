@@ -0,0 +1,57 @@
+import logging
+import os
+import socket
+import time
+from typing import Callable, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core import admin_jobs  # noqa: F401  (registers the admin job handlers)
+from app.core import jobs
+from app.db.database import SessionLocal
+
+
+POLL_INTERVAL_SECONDS = float(os.getenv("JOB_POLL_INTERVAL_SECONDS", "2"))
+
+logger = logging.getLogger(__name__)
+
+
+def worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def run_pending(
+    session_factory: Callable[[], Session] = SessionLocal,
+    worker: Optional[str] = None,
+    max_jobs: Optional[int] = None,
+) -> int:
+    """Claim and run due jobs until none are left (or ``max_jobs`` ran); returns how many ran."""
+    worker = worker or worker_id()
+    ran = 0
+    while max_jobs is None or ran < max_jobs:
+        session = session_factory()
+        try:
+            job = jobs.claim(session, worker)
+            if job is None:
+                break
+            jobs.run_job(session, job)
+            ran += 1
+        finally:
+            session.close()
+    return ran
+
+
+def main() -> None:
+    worker = worker_id()
+    while True:
+        try:
+            ran = run_pending(worker=worker)
+        except Exception:
+            logger.exception("Job runner poll failed")
+            ran = 0
+        if not ran:
+            time.sleep(POLL_INTERVAL_SECONDS)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+"""Bulk synthetic dataset for benchmarks and load tests.
+
+Builds users, courses, chapters, quizzes, enrollments, progress,
+assignments, submissions and notifications at a configurable scale and
+writes them with ``COPY`` on Postgres or batched executemany inserts
+elsewhere, bypassing the ORM. Generation is deterministic for a given seed.
+
+    python -m benchmarks.datagen --database-url sqlite:///bench.db --scale medium
+    python -m benchmarks.datagen --database-url postgresql://... --users 50000 --courses 200
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, NamedTuple
+
+os.environ.setdefault("SECRET_KEY", "benchmark_secret_key")
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core import assignment_inbox
+from app.core.security import get_password_hash
+from app.db.database import Base
+
+
+PASSWORD = "benchmark-password"
+ADMIN_EMAIL = "admin@bench.example.com"
+INSERT_BATCH_SIZE = 5000
+
+
+class Scale(NamedTuple):
+    users: int
+    courses: int
+    chapters_per_course: int
+    quizzes_per_chapter: int
+    enrollments_per_user: int
+    completed_ratio: float
+    assignments_per_course: int
+    submission_ratio: float
+    notifications_per_user: int
+
+
+SCALES: Dict[str, Scale] = {
+    "small": Scale(200, 10, 5, 5, 3, 0.5, 2, 0.5, 5),
+    "medium": Scale(5_000, 50, 10, 10, 4, 0.5, 3, 0.5, 10),
+    "large": Scale(50_000, 200, 12, 10, 5, 0.5, 4, 0.5, 20),
+}
+
+
+class Dataset(NamedTuple):
+    """Ids the scenarios need, plus row counts per table."""
+
+    admin_id: str
+    student_ids: List[str]
+    course_ids: List[str]
+    chapters_by_course: Dict[str, List[str]]
+    answers_by_chapter: Dict[str, Dict[str, int]]
+    enrollments_by_user: Dict[str, List[str]]
+    counts: Dict[str, int]
+
+
+def student_email(index: int) -> str:
+    """Login of the ``index``-th generated student (password ``PASSWORD``)."""
+    return f"student{index}@bench.example.com"
+
+
+def _uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def _copy_value(value: Any) -> Any:
+    if value is None:
+        return r"\N"
+    if isinstance(value, (list, dict)):
+        return json.dumps(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def write_rows(connection: Connection, table_name: str, rows: List[Dict[str, Any]]) -> None:
+    """Insert ``rows`` (dicts with identical keys) as fast as the dialect allows."""
+    if not rows:
+        return
+    table = Base.metadata.tables[table_name]
+    columns = list(rows[0])
+
+    if connection.dialect.name == "postgresql":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([_copy_value(row[column]) for column in columns])
+        buffer.seek(0)
+        column_list = ", ".join(f'"{column}"' for column in columns)
+        cursor = connection.connection.cursor()
+        cursor.copy_expert(
+            f"COPY {table_name} ({column_list}) FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+            buffer,
+        )
+        return
+
+    for start in range(0, len(rows), INSERT_BATCH_SIZE):
+        connection.execute(table.insert(), rows[start:start + INSERT_BATCH_SIZE])
+
+
+def _build(scale: Scale, rng: random.Random) -> Dict[str, List[Dict[str, Any]]]:
+    now = datetime.now(timezone.utc)
+    hashed_password = get_password_hash(PASSWORD)
+    tables: Dict[str, List[Dict[str, Any]]] = {name: [] for name in (
+        "users", "courses", "chapters", "quizzes", "enrollments", "user_progress",
+        "assignments", "assignment_submissions", "notifications",
+    )}
+
+    def user(email: str, name: str, role: str) -> str:
+        user_id = _uuid(rng)
+        tables["users"].append({
+            "id": user_id, "name": name, "email": email, "role": role,
+            "hashed_password": hashed_password, "created_at": now,
+        })
+        return user_id
+
+    user(ADMIN_EMAIL, "Bench Admin", "admin")
+    student_ids = [user(student_email(i), f"Student {i:06d}", "user") for i in range(scale.users)]
+
+    chapters_by_course: Dict[str, List[str]] = {}
+    assignments_by_course: Dict[str, List[str]] = {}
+    for c in range(scale.courses):
+        course_id = _uuid(rng)
+        tables["courses"].append({
+            "id": course_id,
+            "title": f"Course {c:04d}",
+            "description": f"Synthetic course number {c} for benchmarks",
+            "image_url": "https://example.com/course.svg",
+            "enrollment_code": f"B{c:07d}",
+            "estimated_minutes": 30 + c % 90,
+            "created_at": now - timedelta(minutes=c),
+        })
+        chapters_by_course[course_id] = []
+        for order in range(scale.chapters_per_course):
+            chapter_id = _uuid(rng)
+            chapters_by_course[course_id].append(chapter_id)
+            tables["chapters"].append({
+                "id": chapter_id, "course_id": course_id, "title": f"Chapter {order + 1}",
+                "content": f"Content of chapter {order + 1} in course {c}", "order": order + 1,
+            })
+            for q in range(scale.quizzes_per_chapter):
+                tables["quizzes"].append({
+                    "id": _uuid(rng), "chapter_id": chapter_id, "question": f"Question {q + 1}?",
+                    "options": ["alpha", "beta", "gamma", "delta"], "correct_option": q % 4,
+                    "question_type": "choice",
+                })
+        assignments_by_course[course_id] = []
+        for a in range(scale.assignments_per_course):
+            assignment_id = _uuid(rng)
+            assignments_by_course[course_id].append(assignment_id)
+            tables["assignments"].append({
+                "id": assignment_id, "course_id": course_id, "chapter_id": None,
+                "title": f"Assignment {a + 1}", "description": "Synthetic assignment",
+                "due_date": now + timedelta(days=7 + a),
+            })
+
+    course_ids = list(chapters_by_course)
+    enrollments_by_user: Dict[str, List[str]] = {}
+    per_user = min(scale.enrollments_per_user, len(course_ids))
+    for user_id in student_ids:
+        enrolled = rng.sample(course_ids, per_user)
+        enrollments_by_user[user_id] = enrolled
+        for course_id in enrolled:
+            tables["enrollments"].append({"id": _uuid(rng), "user_id": user_id, "course_id": course_id})
+            for chapter_id in chapters_by_course[course_id]:
+                if rng.random() < scale.completed_ratio:
+                    tables["user_progress"].append({
+                        "id": _uuid(rng), "user_id": user_id, "course_id": course_id,
+                        "chapter_id": chapter_id, "completed": True,
+                        "quiz_score": rng.randint(40, 100), "completed_at": now,
+                    })
+            for assignment_id in assignments_by_course[course_id]:
+                if rng.random() < scale.submission_ratio:
+                    graded = rng.random() < 0.5
+                    tables["assignment_submissions"].append({
+                        "id": _uuid(rng), "assignment_id": assignment_id, "user_id": user_id,
+                        "text_answer": "Synthetic answer",
+                        "grade": rng.randint(50, 100) if graded else None,
+                        "graded_at": now if graded else None,
+                        "created_at": now - timedelta(seconds=rng.randint(0, 86400)),
+                    })
+        for n in range(scale.notifications_per_user):
+            tables["notifications"].append({
+                "id": _uuid(rng), "user_id": user_id, "type": "course_enrolled",
+                "title": "Новый курс", "body": f"Notification {n}", "entity_type": "course",
+                "entity_id": enrolled[0] if enrolled else None, "is_read": rng.random() < 0.7,
+                "created_at": now - timedelta(minutes=n),
+            })
+
+    return tables
+
+
+def generate(engine: Engine, scale: Scale, seed: int = 0, write: bool = True) -> Dataset:
+    """Create the schema if needed and fill it with a synthetic dataset.
+
+    With ``write=False`` nothing touches the database; the returned ids
+    match a dataset written earlier with the same scale and seed.
+    """
+    rng = random.Random(seed)
+    tables = _build(scale, rng)
+
+    if write:
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as connection:
+            for table_name, rows in tables.items():
+                write_rows(connection, table_name, rows)
+
+        session = sessionmaker(bind=engine)()
+        try:
+            assignment_inbox.refresh(session)
+            session.commit()
+        finally:
+            session.close()
+
+    quizzes_by_chapter: Dict[str, Dict[str, int]] = {}
+    for quiz in tables["quizzes"]:
+        quizzes_by_chapter.setdefault(quiz["chapter_id"], {})[quiz["id"]] = quiz["correct_option"]
+    chapters_by_course: Dict[str, List[str]] = {}
+    for chapter in tables["chapters"]:
+        chapters_by_course.setdefault(chapter["course_id"], []).append(chapter["id"])
+    enrollments_by_user: Dict[str, List[str]] = {}
+    for enrollment in tables["enrollments"]:
+        enrollments_by_user.setdefault(enrollment["user_id"], []).append(enrollment["course_id"])
+
+    users = tables["users"]
+    return Dataset(
+        admin_id=users[0]["id"],
+        student_ids=[row["id"] for row in users[1:]],
+        course_ids=[row["id"] for row in tables["courses"]],
+        chapters_by_course=chapters_by_course,
+        answers_by_chapter=quizzes_by_chapter,
+        enrollments_by_user=enrollments_by_user,
+        counts={name: len(rows) for name, rows in tables.items()},
+    )
+
+
+def add_scale_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    for field in Scale._fields:
+        parser.add_argument(f"--{field.replace('_', '-')}", dest=field, type=float if "ratio" in field else int)
+
+
+def scale_from_args(args: argparse.Namespace) -> Scale:
+    base = SCALES[args.scale]
+    return base._replace(**{
+        field: getattr(args, field) for field in Scale._fields if getattr(args, field) is not None
+    })
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL", "sqlite:///bench.db"))
+    parser.add_argument("--seed", type=int, default=0)
+    add_scale_arguments(parser)
+    args = parser.parse_args()
+
+    scale = scale_from_args(args)
+    engine = create_engine(args.database_url)
+    started = time.perf_counter()
+    dataset = generate(engine, scale, args.seed)
+    elapsed = time.perf_counter() - started
+    engine.dispose()
+
+    for table_name, count in dataset.counts.items():
+        print(f"{table_name:24} {count:>10}")
+    total = sum(dataset.counts.values())
+    print(f"{'total':24} {total:>10}  in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
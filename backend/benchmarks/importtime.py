@@ -0,0 +1,112 @@
+"""Import-time profile of the API and worker entry points.
+
+Runs ``python -X importtime -c "import <module>"`` in a fresh interpreter
+and reports the slowest modules, either individually or summed per
+top-level package. ``--budget-ms`` turns it into a check that exits
+non-zero when the entry point takes longer to import.
+
+    python -m benchmarks.importtime                      # main, top 25 by cumulative time
+    python -m benchmarks.importtime app.workers.job_runner --sort self
+    python -m benchmarks.importtime --packages --budget-ms 1500
+"""
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, NamedTuple
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+ENTRY_POINTS = (
+    "main",
+    "app.workers.job_runner",
+    "app.workers.assignment_deadline_notifier",
+    "app.workers.notifications_consumer",
+    "app.db.bootstrap",
+)
+
+
+class ImportRecord(NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def profile(module: str) -> List[ImportRecord]:
+    """Import ``module`` in a new interpreter and parse its ``-X importtime`` output."""
+    env = dict(os.environ)
+    env.setdefault("SECRET_KEY", "importtime_secret_key")
+    env["DB_STARTUP_MODE"] = "off"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    records = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue
+        records.append(ImportRecord(
+            module=name.strip(),
+            self_us=int(self_us),
+            cumulative_us=int(cumulative_us),
+            depth=(len(name) - len(name.lstrip()) - 1) // 2,
+        ))
+    return records
+
+
+def total_ms(records: List[ImportRecord], module: str) -> float:
+    """Cumulative import time of ``module`` itself (the last, outermost record)."""
+    for record in reversed(records):
+        if record.module == module and record.depth == 0:
+            return record.cumulative_us / 1000
+    return 0.0
+
+
+def by_package(records: List[ImportRecord]) -> Dict[str, int]:
+    totals: Dict[str, int] = defaultdict(int)
+    for record in records:
+        totals[record.module.split(".")[0]] += record.self_us
+    return dict(totals)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("module", nargs="?", default="main", help=f"e.g. {', '.join(ENTRY_POINTS)}")
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--sort", choices=("cumulative", "self"), default="cumulative")
+    parser.add_argument("--packages", action="store_true", help="sum self time per top-level package")
+    parser.add_argument("--budget-ms", type=float, help="exit 1 if importing the module takes longer")
+    args = parser.parse_args()
+
+    records = profile(args.module)
+    total = total_ms(records, args.module)
+
+    if args.packages:
+        print(f"{'package':40} {'self ms':>9}")
+        for package, self_us in sorted(by_package(records).items(), key=lambda item: -item[1])[:args.top]:
+            print(f"{package:40} {self_us / 1000:9.1f}")
+    else:
+        key = (lambda r: r.cumulative_us) if args.sort == "cumulative" else (lambda r: r.self_us)
+        print(f"{'module':60} {'self ms':>9} {'cumul ms':>9}")
+        for record in sorted(records, key=key, reverse=True)[:args.top]:
+            print(f"{record.module:60} {record.self_us / 1000:9.1f} {record.cumulative_us / 1000:9.1f}")
+    print(f"\n{args.module}: {total:.1f} ms, {len(records)} modules")
+
+    if args.budget_ms is not None and total > args.budget_ms:
+        print(f"OVER BUDGET: {total:.1f} ms > {args.budget_ms:.0f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+"""Load generator: realistic student/admin traffic mixes.
+
+Seeds a synthetic dataset (``benchmarks.datagen``) and drives the app with
+concurrent virtual users, either in-process through the ASGI app or over
+HTTP against a running server that uses the same database. Each virtual
+user repeatedly picks an action according to the mix weights.
+
+Mixes are presets (``semester_start``, ``exam_deadline``, ``steady``) or
+``action=weight`` lists, e.g. ``--mix login=1,quiz_submit=4``. Actions:
+login, catalog, course_detail, chapter_complete, quiz_submit,
+notifications_poll, my_assignments, admin_analytics.
+
+    python -m benchmarks.load --mix exam_deadline --concurrency 32 --duration 30
+    python -m benchmarks.load --database-url postgresql://... --base-url http://localhost:8000
+
+With ``--base-url`` the server must be started against ``--database-url``
+after seeding (or pass ``--no-seed`` to reuse a dataset generated with the
+same scale and seed).
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+os.environ.setdefault("SECRET_KEY", "benchmark_secret_key")
+# Virtual users share one client address; measure the app, not the rate limiter.
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.security import create_access_token
+from benchmarks.datagen import (
+    PASSWORD,
+    Dataset,
+    add_scale_arguments,
+    generate,
+    scale_from_args,
+    student_email,
+)
+from benchmarks.quiz_burst import percentile
+
+
+MIXES: Dict[str, Dict[str, int]] = {
+    # Everyone logs in and looks around; little quiz traffic yet.
+    "semester_start": {
+        "login": 3, "catalog": 4, "course_detail": 3, "notifications_poll": 3, "my_assignments": 1,
+    },
+    # Students cram: quiz submissions and progress writes dominate.
+    "exam_deadline": {
+        "quiz_submit": 6, "chapter_complete": 2, "notifications_poll": 3,
+        "course_detail": 2, "my_assignments": 2, "login": 1,
+    },
+    "steady": {
+        "catalog": 2, "course_detail": 3, "chapter_complete": 1, "quiz_submit": 1,
+        "notifications_poll": 4, "my_assignments": 1, "admin_analytics": 1,
+    },
+}
+
+
+class Call(NamedTuple):
+    method: str
+    path: str
+    token: Optional[str] = None
+    json: Optional[dict] = None
+    form: Optional[dict] = None
+
+
+class VirtualUser:
+    """A student with a cached token and a course to work on."""
+
+    def __init__(self, dataset: Dataset, rng: random.Random) -> None:
+        self.dataset = dataset
+        self.rng = rng
+        self.index = rng.randrange(len(dataset.student_ids))
+        self.user_id = dataset.student_ids[self.index]
+        self.token = create_access_token({"sub": self.user_id})
+
+    def _course_and_chapter(self) -> Tuple[str, str]:
+        course_id = self.rng.choice(self.dataset.enrollments_by_user[self.user_id])
+        return course_id, self.rng.choice(self.dataset.chapters_by_course[course_id])
+
+    def login(self) -> Call:
+        return Call("POST", "/auth/login", form={"username": student_email(self.index), "password": PASSWORD})
+
+    def catalog(self) -> Call:
+        return Call("GET", "/courses/", self.token)
+
+    def course_detail(self) -> Call:
+        course_id, _ = self._course_and_chapter()
+        return Call("GET", f"/courses/{course_id}", self.token)
+
+    def chapter_complete(self) -> Call:
+        course_id, chapter_id = self._course_and_chapter()
+        return Call("POST", f"/courses/{course_id}/chapters/{chapter_id}/complete", self.token)
+
+    def quiz_submit(self) -> Call:
+        course_id, chapter_id = self._course_and_chapter()
+        answers = {
+            quiz_id: correct if self.rng.random() < 0.8 else (correct + 1) % 4
+            for quiz_id, correct in self.dataset.answers_by_chapter.get(chapter_id, {}).items()
+        }
+        return Call("POST", f"/courses/{course_id}/chapters/{chapter_id}/quiz", self.token, json={"answers": answers})
+
+    def notifications_poll(self) -> Call:
+        return Call("GET", "/notifications/unread-count", self.token)
+
+    def my_assignments(self) -> Call:
+        return Call("GET", "/users/me/assignments", self.token)
+
+    def admin_analytics(self) -> Call:
+        return Call("GET", "/admin/analytics", create_access_token({"sub": self.dataset.admin_id}))
+
+
+ACTIONS = [name for name in vars(VirtualUser) if not name.startswith("_")]
+
+
+def parse_mix(value: str) -> Dict[str, int]:
+    if value in MIXES:
+        return MIXES[value]
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ACTIONS:
+            raise argparse.ArgumentTypeError(f"unknown action {name!r}; choose from {', '.join(ACTIONS)}")
+        mix[name] = int(weight or 1)
+    return mix
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+
+    def record(self, action: str, latency_ms: float, status: int) -> None:
+        with self.lock:
+            self.latencies[action].append(latency_ms)
+            self.statuses[action][status] += 1
+
+
+def in_process_sender(database_url: str) -> Callable[[Call], int]:
+    from fastapi.testclient import TestClient
+
+    from app.db.database import get_db
+    from main import app
+
+    engine = create_engine(
+        database_url,
+        connect_args={"check_same_thread": False, "timeout": 30} if database_url.startswith("sqlite") else {},
+    )
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    client = TestClient(app)
+
+    def send(call: Call) -> int:
+        headers = {"Authorization": f"Bearer {call.token}"} if call.token else {}
+        return client.request(call.method, call.path, json=call.json, data=call.form, headers=headers).status_code
+
+    return send
+
+
+def http_sender(base_url: str, concurrency: int) -> Callable[[Call], int]:
+    import httpx
+
+    client = httpx.Client(
+        base_url=base_url,
+        timeout=30,
+        limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+    )
+
+    def send(call: Call) -> int:
+        headers = {"Authorization": f"Bearer {call.token}"} if call.token else {}
+        return client.request(call.method, call.path, json=call.json, data=call.form, headers=headers).status_code
+
+    return send
+
+
+def run(
+    send: Callable[[Call], int],
+    dataset: Dataset,
+    mix: Dict[str, int],
+    concurrency: int,
+    duration: float,
+    max_requests: Optional[int],
+    seed: int,
+) -> Tuple[Recorder, float]:
+    recorder = Recorder()
+    actions, weights = zip(*mix.items())
+    deadline = time.perf_counter() + duration
+    issued = [0]
+    issued_lock = threading.Lock()
+
+    def worker(worker_index: int) -> None:
+        rng = random.Random(seed * 10_000 + worker_index)
+        user = VirtualUser(dataset, rng)
+        while time.perf_counter() < deadline:
+            if max_requests is not None:
+                with issued_lock:
+                    if issued[0] >= max_requests:
+                        return
+                    issued[0] += 1
+            action = rng.choices(actions, weights)[0]
+            call = getattr(user, action)()
+            started = time.perf_counter()
+            try:
+                status = send(call)
+            except Exception:
+                status = 0
+            recorder.record(action, (time.perf_counter() - started) * 1000, status)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, range(concurrency)))
+    return recorder, time.perf_counter() - started
+
+
+def summarize(recorder: Recorder, elapsed: float) -> Dict:
+    rows = {}
+    for action, latencies in sorted(recorder.latencies.items()):
+        statuses = recorder.statuses[action]
+        errors = sum(count for status, count in statuses.items() if status == 0 or status >= 400)
+        rows[action] = {
+            "requests": len(latencies),
+            "errors": errors,
+            "throughput": round(len(latencies) / elapsed, 1),
+            "p50_ms": round(statistics.median(latencies), 2),
+            "p95_ms": round(percentile(latencies, 95), 2),
+            "p99_ms": round(percentile(latencies, 99), 2),
+            "error_rate": round(errors / len(latencies), 4),
+            "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        }
+    everything = [latency for latencies in recorder.latencies.values() for latency in latencies]
+    total_errors = sum(row["errors"] for row in rows.values())
+    total = {
+        "requests": len(everything),
+        "elapsed_s": round(elapsed, 2),
+        "throughput": round(len(everything) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(statistics.median(everything), 2) if everything else 0.0,
+        "p95_ms": round(percentile(everything, 95), 2) if everything else 0.0,
+        "p99_ms": round(percentile(everything, 99), 2) if everything else 0.0,
+        "error_rate": round(total_errors / len(everything), 4) if everything else 0.0,
+    }
+    return {"total": total, "actions": rows}
+
+
+def print_report(report: Dict, mix_name: str, concurrency: int) -> None:
+    total = report["total"]
+    print(f"mix {mix_name}, concurrency {concurrency}, {total['requests']} requests in {total['elapsed_s']}s")
+    print(f"{'action':20} {'reqs':>7} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for action, row in report["actions"].items():
+        print(
+            f"{action:20} {row['requests']:7} {row['throughput']:8.1f} {row['p50_ms']:9.2f} "
+            f"{row['p95_ms']:9.2f} {row['p99_ms']:9.2f} {row['error_rate']:7.1%}"
+        )
+    print(
+        f"{'total':20} {total['requests']:7} {total['throughput']:8.1f} {total['p50_ms']:9.2f} "
+        f"{total['p95_ms']:9.2f} {total['p99_ms']:9.2f} {total['error_rate']:7.1%}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mix", default="steady", help=f"preset ({', '.join(MIXES)}) or action=weight,...")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=20, help="seconds to run")
+    parser.add_argument("--requests", type=int, help="stop after this many requests")
+    parser.add_argument("--database-url", help="database to seed and use; defaults to a temporary SQLite file")
+    parser.add_argument("--base-url", help="send requests over HTTP to this server instead of in-process")
+    parser.add_argument("--no-seed", action="store_true", help="dataset already generated with the same scale and seed")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    add_scale_arguments(parser)
+    args = parser.parse_args()
+
+    try:
+        mix = parse_mix(args.mix)
+    except argparse.ArgumentTypeError as exc:
+        parser.error(str(exc))
+    scale = scale_from_args(args)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or f"sqlite:///{os.path.join(tmp, 'load.db')}"
+        engine = create_engine(database_url)
+        # With --no-seed the ids are only rebuilt in memory: the same scale and
+        # seed always produce the same dataset.
+        dataset = generate(engine, scale, args.seed, write=not args.no_seed)
+        engine.dispose()
+
+        if args.base_url:
+            send = http_sender(args.base_url, args.concurrency)
+        else:
+            send = in_process_sender(database_url)
+
+        recorder, elapsed = run(send, dataset, mix, args.concurrency, args.duration, args.requests, args.seed)
+
+    report = summarize(recorder, elapsed)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report, args.mix, args.concurrency)
+
+
+if __name__ == "__main__":
+    main()
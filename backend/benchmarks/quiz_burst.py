@@ -0,0 +1,125 @@
+"""Load test: exam-time burst of quiz submissions.
+
+Creates a course with one 100-question chapter and a cohort of enrolled
+students in a throwaway SQLite database, then fires concurrent
+``POST /courses/{id}/chapters/{id}/quiz`` requests through the app.
+
+    python -m benchmarks.quiz_burst [--students 200] [--concurrency 16] [--rounds 3]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault("SECRET_KEY", "benchmark_secret_key")
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.security import create_access_token
+from app.db import models
+from app.db.database import Base, get_db
+from main import app
+
+
+def seed(session_factory, students: int, questions: int):
+    db = session_factory()
+    try:
+        course = models.Course(title="Exam", description="Exam course", image_url="https://example.com/x.svg")
+        db.add(course)
+        db.flush()
+        chapter = models.Chapter(course_id=course.id, title="Final", content="Final exam", order=0)
+        db.add(chapter)
+        db.flush()
+
+        quizzes = [
+            models.Quiz(
+                chapter_id=chapter.id,
+                question=f"Question {i}",
+                options=["alpha", "beta", "gamma", "delta"],
+                correct_option=i % 4,
+            )
+            for i in range(questions)
+        ]
+        db.add_all(quizzes)
+
+        users = [
+            models.User(name=f"Student {i}", email=f"student{i}@bench.local", hashed_password="x")
+            for i in range(students)
+        ]
+        db.add_all(users)
+        db.flush()
+        db.add_all(models.Enrollment(user_id=u.id, course_id=course.id) for u in users)
+        db.commit()
+
+        answers = {quiz.id: quiz.correct_option for quiz in quizzes}
+        tokens = [create_access_token({"sub": u.id}) for u in users]
+        return course.id, chapter.id, answers, tokens
+    finally:
+        db.close()
+
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=200)
+    parser.add_argument("--questions", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(
+            f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+            connect_args={"check_same_thread": False, "timeout": 30},
+        )
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+        def override_get_db():
+            db = session_factory()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        app.dependency_overrides[get_db] = override_get_db
+        course_id, chapter_id, answers, tokens = seed(session_factory, args.students, args.questions)
+        url = f"/courses/{course_id}/chapters/{chapter_id}/quiz"
+        client = TestClient(app)
+
+        def submit(token: str):
+            started = time.perf_counter()
+            response = client.post(url, json={"answers": answers}, headers={"Authorization": f"Bearer {token}"})
+            return time.perf_counter() - started, response.status_code
+
+        requests = tokens * args.rounds
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            results = list(pool.map(submit, requests))
+        elapsed = time.perf_counter() - started
+
+        app.dependency_overrides.clear()
+        engine.dispose()
+
+    latencies_ms = [latency * 1000 for latency, _ in results]
+    errors = sum(1 for _, code in results if code != 200)
+
+    print(f"requests:    {len(results)} ({args.students} students x {args.rounds} rounds, concurrency {args.concurrency})")
+    print(f"throughput:  {len(results) / elapsed:8.1f} req/s")
+    print(f"latency p50: {statistics.median(latencies_ms):8.2f} ms")
+    print(f"latency p95: {percentile(latencies_ms, 95):8.2f} ms")
+    print(f"latency p99: {percentile(latencies_ms, 99):8.2f} ms")
+    print(f"errors:      {errors}")
+
+
+if __name__ == "__main__":
+    main()
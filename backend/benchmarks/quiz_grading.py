@@ -0,0 +1,107 @@
+"""Microbenchmark: grading a 100-question chapter.
+
+Compares the per-submission grading loop that used to live in
+``submit_quiz`` against grading with a precompiled answer key.
+
+    python -m benchmarks.quiz_grading [--questions 100] [--number 20000]
+"""
+import argparse
+import random
+import timeit
+from types import SimpleNamespace
+
+from app.core.quiz_grading import compile_answer_key, grade
+
+
+def build_quizzes(count: int):
+    quizzes = []
+    for i in range(count):
+        if i % 4 == 3:
+            quizzes.append(SimpleNamespace(
+                id=f"quiz-{i}",
+                question_type="text",
+                options=[f"  Answer {i} "],
+                correct_option=0,
+            ))
+        else:
+            quizzes.append(SimpleNamespace(
+                id=f"quiz-{i}",
+                question_type="choice",
+                options=["alpha", "beta", "gamma", "delta"],
+                correct_option=i % 4,
+            ))
+    return quizzes
+
+
+def build_answers(quizzes, rng: random.Random):
+    answers = {}
+    for quiz in quizzes:
+        if quiz.question_type == "text":
+            answers[quiz.id] = f"answer {quiz.id.split('-')[1]}" if rng.random() < 0.8 else "wrong"
+        else:
+            answers[quiz.id] = quiz.correct_option if rng.random() < 0.8 else (quiz.correct_option + 1) % 4
+    return answers
+
+
+def grade_uncompiled(quizzes, answers):
+    total_questions = 0
+    correct_answers = 0
+
+    for quiz in quizzes:
+        question_type = getattr(quiz, "question_type", "choice") or "choice"
+        answer = answers.get(quiz.id)
+
+        if question_type == "choice":
+            options = quiz.options or []
+            non_empty_options = [opt for opt in options if isinstance(opt, str) and opt.strip()]
+            if len(non_empty_options) <= 1:
+                continue
+
+            total_questions += 1
+            if isinstance(answer, int) and answer == quiz.correct_option:
+                correct_answers += 1
+        elif question_type == "text":
+            options = quiz.options or []
+            correct_text = None
+            if isinstance(options, list) and options:
+                index = quiz.correct_option if 0 <= quiz.correct_option < len(options) else 0
+                correct_text = options[index]
+
+            if not correct_text:
+                continue
+
+            if isinstance(answer, str):
+                total_questions += 1
+                if answer.strip().lower() == correct_text.strip().lower():
+                    correct_answers += 1
+
+    return correct_answers, total_questions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", type=int, default=100)
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+
+    quizzes = build_quizzes(args.questions)
+    answers = build_answers(quizzes, random.Random(42))
+    answer_key = compile_answer_key(quizzes)
+
+    expected = grade_uncompiled(quizzes, answers)
+    compiled = grade(answer_key, answers)
+    assert expected == (compiled.correct_answers, compiled.total_questions)
+
+    uncompiled_s = min(timeit.repeat(lambda: grade_uncompiled(quizzes, answers), number=args.number, repeat=3))
+    compiled_s = min(timeit.repeat(lambda: grade(answer_key, answers), number=args.number, repeat=3))
+    compile_s = min(timeit.repeat(lambda: compile_answer_key(quizzes), number=1000, repeat=3))
+
+    print(f"questions: {args.questions}, submissions: {args.number}")
+    print(f"uncompiled grading: {uncompiled_s / args.number * 1e6:8.2f} us/submission")
+    print(f"compiled grading:   {compiled_s / args.number * 1e6:8.2f} us/submission")
+    print(f"key compilation:    {compile_s / 1000 * 1e6:8.2f} us/chapter (once per chapter change)")
+    print(f"speedup:            {uncompiled_s / compiled_s:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""Benchmark: latency and SQL statement count of the hot routes.
+
+Generates a synthetic dataset (see ``benchmarks.datagen``) in a throwaway
+SQLite database, or uses ``--database-url``, then calls each scenario
+sequentially through the app and reports p50/p95 latency and statements
+per request (read from the ``Server-Timing`` header).
+
+Results are compared with ``benchmarks/baselines/routes-<scale>.json``:
+any increase in statements per request, or an error response, is flagged
+and makes the run exit non-zero. Statement counts are the same on every
+machine; the stored latencies are not, so they are only printed for
+information. ``--check-latency`` also flags a p50 slower than the baseline
+by more than ``--tolerance``, for baselines saved on the same machine.
+Commit a refreshed baseline (``--save-baseline``) together with changes
+that intentionally move these numbers.
+
+    python -m benchmarks.routes [--scale small] [--repeat 50] [--save-baseline] [--check-latency]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+os.environ.setdefault("SECRET_KEY", "benchmark_secret_key")
+# Virtual users share one client address; measure the app, not the rate limiter.
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.security import create_access_token
+from app.db.database import get_db
+from benchmarks.datagen import Dataset, add_scale_arguments, generate, scale_from_args
+from benchmarks.quiz_burst import percentile
+from main import app
+
+
+BASELINE_DIR = Path(__file__).resolve().parent / "baselines"
+
+
+class Request(NamedTuple):
+    method: str
+    path: str
+    token: str
+    json: Optional[dict] = None
+
+
+class Scenario(NamedTuple):
+    name: str
+    build: Callable[[Dataset, random.Random], Request]
+
+
+def _student(dataset: Dataset, rng: random.Random):
+    user_id = rng.choice(dataset.student_ids)
+    return user_id, create_access_token({"sub": user_id})
+
+
+def _catalog(dataset, rng):
+    _, token = _student(dataset, rng)
+    return Request("GET", "/courses/", token)
+
+
+def _course_detail(dataset, rng):
+    user_id, token = _student(dataset, rng)
+    course_id = rng.choice(dataset.enrollments_by_user[user_id])
+    return Request("GET", f"/courses/{course_id}", token)
+
+
+def _quiz_submit(dataset, rng):
+    user_id, token = _student(dataset, rng)
+    course_id = rng.choice(dataset.enrollments_by_user[user_id])
+    chapter_id = rng.choice(dataset.chapters_by_course[course_id])
+    answers = dataset.answers_by_chapter.get(chapter_id, {})
+    return Request(
+        "POST",
+        f"/courses/{course_id}/chapters/{chapter_id}/quiz",
+        token,
+        {"answers": {quiz_id: correct for quiz_id, correct in answers.items()}},
+    )
+
+
+def _unread_count(dataset, rng):
+    _, token = _student(dataset, rng)
+    return Request("GET", "/notifications/unread-count", token)
+
+
+def _my_assignments(dataset, rng):
+    _, token = _student(dataset, rng)
+    return Request("GET", "/users/me/assignments", token)
+
+
+def _admin_analytics(dataset, rng):
+    return Request("GET", "/admin/analytics", create_access_token({"sub": dataset.admin_id}))
+
+
+SCENARIOS = [
+    Scenario("catalog", _catalog),
+    Scenario("course_detail", _course_detail),
+    Scenario("quiz_submit", _quiz_submit),
+    Scenario("unread_count", _unread_count),
+    Scenario("my_assignments", _my_assignments),
+    Scenario("admin_analytics", _admin_analytics),
+]
+
+
+def queries_from_header(value: str) -> int:
+    """Statement count from ``Server-Timing: ...; db;dur=..;desc="N queries"``."""
+    return int(value.split('desc="')[1].split(" ")[0])
+
+
+def run_scenario(client: TestClient, scenario: Scenario, dataset: Dataset, repeat: int, warmup: int, seed: int) -> Dict:
+    rng = random.Random(seed)
+    latencies_ms: List[float] = []
+    queries: List[int] = []
+    errors = 0
+    for i in range(warmup + repeat):
+        request = scenario.build(dataset, rng)
+        started = time.perf_counter()
+        response = client.request(
+            request.method,
+            request.path,
+            json=request.json,
+            headers={"Authorization": f"Bearer {request.token}"},
+        )
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if i < warmup:
+            continue
+        if response.status_code >= 400:
+            errors += 1
+        latencies_ms.append(elapsed_ms)
+        queries.append(queries_from_header(response.headers["Server-Timing"]))
+
+    return {
+        "p50_ms": round(statistics.median(latencies_ms), 2),
+        "p95_ms": round(percentile(latencies_ms, 95), 2),
+        "queries": max(queries),
+        "errors": errors,
+    }
+
+
+def compare(
+    results: Dict[str, Dict],
+    baseline: Dict[str, Dict],
+    tolerance: float,
+    check_latency: bool = False,
+) -> List[str]:
+    problems = []
+    for name, result in results.items():
+        expected = baseline.get(name)
+        if expected is None:
+            continue
+        if result["queries"] > expected["queries"]:
+            problems.append(f"{name}: {result['queries']} queries per request, baseline {expected['queries']}")
+        if check_latency and result["p50_ms"] > expected["p50_ms"] * (1 + tolerance):
+            problems.append(f"{name}: p50 {result['p50_ms']:.2f} ms, baseline {expected['p50_ms']:.2f} ms")
+        if result["errors"]:
+            problems.append(f"{name}: {result['errors']} error responses")
+    return problems
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="empty database to generate into, instead of a temporary SQLite file")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--only", nargs="*", help="scenario names to run")
+    parser.add_argument("--check-latency", action="store_true", help="also fail on p50 slowdowns (same-machine baselines only)")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed p50 slowdown with --check-latency, 0.5 = +50%%")
+    parser.add_argument("--save-baseline", action="store_true")
+    add_scale_arguments(parser)
+    args = parser.parse_args()
+
+    scenarios = [s for s in SCENARIOS if not args.only or s.name in args.only]
+    scale = scale_from_args(args)
+    baseline_path = BASELINE_DIR / f"routes-{args.scale}.json"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.database_url or f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        engine = create_engine(url, connect_args={"check_same_thread": False} if url.startswith("sqlite") else {})
+        dataset = generate(engine, scale, args.seed)
+        session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+        def override_get_db():
+            db = session_factory()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        app.dependency_overrides[get_db] = override_get_db
+        client = TestClient(app)
+        results = {
+            scenario.name: run_scenario(client, scenario, dataset, args.repeat, args.warmup, args.seed)
+            for scenario in scenarios
+        }
+        app.dependency_overrides.clear()
+        engine.dispose()
+
+    baseline = json.loads(baseline_path.read_text()) if baseline_path.exists() else {}
+    print(f"{'scenario':18} {'p50 ms':>9} {'p95 ms':>9} {'queries':>8}   baseline p50 / queries")
+    for name, result in results.items():
+        expected = baseline.get(name)
+        reference = f"{expected['p50_ms']:9.2f} / {expected['queries']}" if expected else "        -"
+        print(f"{name:18} {result['p50_ms']:9.2f} {result['p95_ms']:9.2f} {result['queries']:8}   {reference}")
+
+    if args.save_baseline:
+        BASELINE_DIR.mkdir(exist_ok=True)
+        baseline.update(results)
+        baseline_path.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        print(f"baseline written to {baseline_path}")
+        return
+
+    problems = compare(results, baseline, args.tolerance, args.check_latency)
+    for problem in problems:
+        print(f"REGRESSION {problem}")
+    if problems:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Benchmark: throughput of the production server as worker processes are added.
+
+Seeds a synthetic dataset, then for each worker count starts a real server
+(gunicorn with ``gunicorn.conf.py``, or ``uvicorn --workers`` when gunicorn is
+not installed) and drives it over HTTP with ``benchmarks.load``. The report
+shows requests per second, p50/p99 latency and the speedup over one worker.
+By default the worker counts go 1, 2, 4, ... up to the available CPUs.
+
+    python -m benchmarks.scaling --duration 15 --concurrency 64
+    python -m benchmarks.scaling --workers 1 2 4 8 --database-url postgresql://...
+"""
+import argparse
+import importlib.util
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+os.environ.setdefault("SECRET_KEY", "benchmark_secret_key")
+
+import httpx
+from sqlalchemy import create_engine
+
+from app.core.serving import available_cpus
+from benchmarks.datagen import add_scale_arguments, generate, scale_from_args
+from benchmarks.load import http_sender, parse_mix, run, summarize
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+DEFAULT_MIX = "catalog=1,course_detail=2,notifications_poll=3,my_assignments=1"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def default_worker_counts() -> List[int]:
+    counts, workers = [], 1
+    while workers < available_cpus():
+        counts.append(workers)
+        workers *= 2
+    return counts + [available_cpus()]
+
+
+def start_server(workers: int, port: int, database_url: str) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        DATABASE_URL=database_url,
+        DB_STARTUP_MODE="off",
+        WEB_CONCURRENCY=str(workers),
+        BIND=f"127.0.0.1:{port}",
+        ACCESS_LOG="",
+    )
+    if importlib.util.find_spec("gunicorn") is not None:
+        command = [sys.executable, "-m", "gunicorn", "main:app"]
+    else:
+        command = [
+            sys.executable, "-m", "uvicorn", "main:app", "--port", str(port),
+            "--workers", str(workers), "--no-access-log",
+        ]
+    return subprocess.Popen(command, cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def wait_until_live(base_url: str, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/health/live", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"server at {base_url} did not come up within {timeout:.0f}s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="*", help="worker counts to try")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="benchmarks.load mix")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10, help="seconds per worker count")
+    parser.add_argument("--warmup", type=float, default=2, help="seconds of unrecorded load first")
+    parser.add_argument("--database-url", help="database to seed; defaults to a temporary SQLite file")
+    parser.add_argument("--seed", type=int, default=0)
+    add_scale_arguments(parser)
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    worker_counts = args.workers or default_worker_counts()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or f"sqlite:///{os.path.join(tmp, 'scaling.db')}"
+        engine = create_engine(database_url)
+        dataset = generate(engine, scale_from_args(args), args.seed)
+        engine.dispose()
+
+        print(f"{available_cpus()} CPUs available, mix {args.mix}, concurrency {args.concurrency}")
+        print(f"{'workers':>7} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7} {'speedup':>8}")
+        single = None
+        for workers in worker_counts:
+            port = _free_port()
+            base_url = f"http://127.0.0.1:{port}"
+            server = start_server(workers, port, database_url)
+            try:
+                wait_until_live(base_url)
+                send = http_sender(base_url, args.concurrency)
+                if args.warmup:
+                    run(send, dataset, mix, args.concurrency, args.warmup, None, args.seed)
+                recorder, elapsed = run(send, dataset, mix, args.concurrency, args.duration, None, args.seed)
+            finally:
+                server.terminate()
+                server.wait(timeout=30)
+
+            total = summarize(recorder, elapsed)["total"]
+            single = single or total["throughput"]
+            print(
+                f"{workers:7} {total['throughput']:9.1f} {total['p50_ms']:9.2f} {total['p99_ms']:9.2f} "
+                f"{total['error_rate']:7.1%} {total['throughput'] / single:7.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Production server: gunicorn managing uvicorn workers.
+
+    gunicorn main:app            # picks this file up from the working directory
+
+Every setting can be overridden through the environment. uvicorn's worker
+uses uvloop and httptools automatically when they are installed
+(``uvicorn[standard]``).
+
+Workers share ``METRICS_DIR`` (a fresh temporary directory unless set) so
+that ``/metrics`` reports totals over all of them, see ``app.core.metrics``.
+"""
+import os
+import tempfile
+
+# Before the app is imported: app.core.metrics reads it at import time.
+if not os.getenv("METRICS_DIR"):
+    os.environ["METRICS_DIR"] = tempfile.mkdtemp(prefix="teamup-metrics-")
+
+from app.core.serving import worker_count
+
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = worker_count()
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Import the app once in the master so workers fork with it already loaded.
+preload_app = os.getenv("PRELOAD_APP", "1") == "1"
+
+# Recycle workers periodically; the jitter keeps them from restarting together.
+max_requests = int(os.getenv("MAX_REQUESTS", "5000"))
+max_requests_jitter = int(os.getenv("MAX_REQUESTS_JITTER", "500"))
+
+# On SIGTERM workers stop accepting connections and get this long to finish
+# in-flight requests; timeout kills workers that stop heartbeating.
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+timeout = int(os.getenv("WORKER_TIMEOUT", "60"))
+keepalive = int(os.getenv("KEEPALIVE", "5"))
+
+accesslog = os.getenv("ACCESS_LOG", "-") or None
+loglevel = os.getenv("LOG_LEVEL", "info")
+
+
+def post_fork(server, worker):
+    # The preloaded engine must not share pooled connections across processes.
+    from app.db.database import engine
+
+    engine.dispose(close=False)
+
+
+def on_starting(server):
+    from app.core import metrics
+
+    metrics.reset_dir()
+
+
+def worker_exit(server, worker):
+    from app.core import metrics
+
+    metrics.write_snapshot()
+
+
+def child_exit(server, worker):
+    # Runs in the master; keeps the exited worker's counters in the totals.
+    from app.core import metrics
+
+    metrics.archive_worker(worker.pid)
@@ -1,5 +1,6 @@
 import os
 import sys
+from contextlib import ExitStack
 from pathlib import Path
 
 import pytest
@@ -13,9 +14,15 @@ if str(ROOT_DIR) not in sys.path:
     sys.path.insert(0, str(ROOT_DIR))
 
 os.environ.setdefault("SECRET_KEY", "test_secret_key")
+# Tests build their own schema; skip migrations and the admin bootstrap at app startup.
+os.environ.setdefault("DB_STARTUP_MODE", "off")
+# Every test client shares one address; tests/test_rate_limit.py turns limiting on.
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
 
 from app.db.database import Base, get_db
 from app.db import models
+from app.core import row_counts
+from app.core.query_detector import QueryBudget
 from app.core.security import get_password_hash
 from main import app
 
@@ -36,6 +43,7 @@ TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engin
 
 @pytest.fixture(scope="function")
 def db():
+    row_counts.clear()
     Base.metadata.drop_all(bind=engine)
     Base.metadata.create_all(bind=engine)
     db = TestingSessionLocal()
@@ -61,6 +69,22 @@ def client(db):
     app.dependency_overrides.clear()
 
 
+@pytest.fixture(autouse=True)
+def query_budget(request):
+    """Enforce ``@pytest.mark.max_queries(n, route=None)`` on the requests the test makes.
+
+    Without ``route`` every request is checked; markers with different
+    routes stack, so one test can budget each hot route it calls.
+    """
+    markers = list(request.node.iter_markers("max_queries"))
+    with ExitStack() as stack:
+        budgets = [
+            stack.enter_context(QueryBudget(max_queries=marker.args[0], route=marker.kwargs.get("route")))
+            for marker in markers
+        ]
+        yield budgets
+
+
 @pytest.fixture
 def admin_user(db):
     user = models.User(
@@ -0,0 +1,426 @@
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import status
+from sqlalchemy.orm import Session
+
+from app.db import models
+
+
+def create_students(db: Session, count: int) -> None:
+    for i in range(count):
+        db.add(
+            models.User(
+                email=f"student{i:02d}@school.com",
+                name=f"Student {i:02d}",
+                role="user",
+                hashed_password="x",
+            )
+        )
+    db.commit()
+
+
+def test_list_users_keyset_pages_with_total(client, db: Session, admin_token: str):
+    create_students(db, 5)
+    headers = {"Authorization": f"Bearer {admin_token}"}
+
+    emails = []
+    cursor = None
+    while True:
+        params = {"role": "user", "limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/admin/users", params=params, headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["X-Total-Count"] == "5"
+        emails.extend(user["email"] for user in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert emails == [f"student{i:02d}@school.com" for i in range(5)]
+
+    everyone = client.get("/admin/users", headers=headers)
+    assert len(everyone.json()) == 6
+    assert "X-Total-Count" not in everyone.headers
+
+
+def test_list_users_search_and_sparse_fields(client, db: Session, admin_token: str):
+    create_students(db, 12)
+    headers = {"Authorization": f"Bearer {admin_token}"}
+
+    prefix = client.get("/admin/users", params={"q": "ad"}, headers=headers)
+    assert [user["email"] for user in prefix.json()] == ["admin@test.com"]
+
+    contains = client.get(
+        "/admin/users",
+        params={"q": "nt 1", "fields": "id,name", "limit": 10},
+        headers=headers,
+    )
+    assert contains.status_code == status.HTTP_200_OK
+    assert [user["name"] for user in contains.json()] == ["Student 10", "Student 11"]
+    assert set(contains.json()[0]) == {"id", "name"}
+    assert contains.headers["X-Total-Count"] == "2"
+
+    wildcard = client.get("/admin/users", params={"q": "%"}, headers=headers)
+    assert wildcard.json() == []
+
+    unknown = client.get("/admin/users", params={"fields": "hashed_password"}, headers=headers)
+    assert unknown.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_list_groups_sorts_pages_and_keeps_counters(client, db: Session, admin_token: str):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    create_students(db, 3)
+    students = db.query(models.User).filter(models.User.role == "user").order_by(models.User.email).all()
+    student_ids = [student.id for student in students]
+
+    group_ids = []
+    for name, size in (("Alpha", 1), ("Beta", 3), ("Gamma", 2)):
+        group_id = client.post("/admin/groups", json={"name": name}, headers=headers).json()["id"]
+        for user_id in student_ids[:size]:
+            added = client.post(
+                f"/admin/groups/{group_id}/members",
+                json={"userId": user_id},
+                headers=headers,
+            )
+            assert added.status_code == status.HTTP_200_OK
+        group_ids.append(group_id)
+
+    client.delete(f"/admin/groups/{group_ids[1]}/members/{student_ids[0]}", headers=headers)
+
+    first = client.get("/admin/groups", params={"sort": "-memberCount", "limit": 2}, headers=headers)
+    assert first.status_code == status.HTTP_200_OK
+    second = client.get(
+        "/admin/groups",
+        params={"sort": "-memberCount", "limit": 2, "cursor": first.headers["X-Next-Cursor"]},
+        headers=headers,
+    )
+    listed = first.json() + second.json()
+    assert [g["memberCount"] for g in listed] == [2, 2, 1]
+    assert {g["name"] for g in listed[:2]} == {"Beta", "Gamma"}
+    assert "X-Next-Cursor" not in second.headers
+
+    course_id = client.post(
+        "/admin/courses",
+        json={"title": "Linked", "description": "d", "imageUrl": "/x.svg", "estimatedMinutes": 5, "chapters": []},
+        headers=headers,
+    ).json()["id"]
+    client.post(f"/admin/groups/{group_ids[0]}/courses/{course_id}/enroll", headers=headers)
+    by_name = client.get("/admin/groups", params={"sort": "name"}, headers=headers).json()
+    assert [g["name"] for g in by_name] == ["Alpha", "Beta", "Gamma"]
+    assert by_name[0]["courseCount"] == 1
+
+    client.delete(f"/admin/courses/{course_id}", headers=headers)
+    alpha = client.get("/admin/groups", params={"sort": "name", "limit": 1}, headers=headers).json()[0]
+    assert alpha["courseCount"] == 0
+    assert alpha["memberCount"] == 1
+
+
+def test_group_membership_delta_mode_and_member_pages(client, db: Session, admin_token: str):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    create_students(db, 3)
+    student_ids = [
+        row[0]
+        for row in db.query(models.User.id).filter(models.User.role == "user").order_by(models.User.name)
+    ]
+    group_id = client.post("/admin/groups", json={"name": "Delta"}, headers=headers).json()["id"]
+
+    for user_id in student_ids:
+        delta = client.post(
+            f"/admin/groups/{group_id}/members",
+            params={"mode": "delta"},
+            json={"userId": user_id},
+            headers=headers,
+        )
+        assert delta.status_code == status.HTTP_200_OK
+        assert delta.json()["member"]["userId"] == user_id
+        assert delta.json()["added"] is True
+        assert "members" not in delta.json()
+    assert delta.json()["memberCount"] == 3
+
+    repeat = client.post(
+        f"/admin/groups/{group_id}/members",
+        params={"mode": "delta"},
+        json={"userId": student_ids[0]},
+        headers=headers,
+    )
+    assert repeat.json()["added"] is False
+    assert repeat.json()["memberCount"] == 3
+
+    course_id = client.post(
+        "/admin/courses",
+        json={"title": "Delta course", "description": "d", "imageUrl": "/x.svg", "estimatedMinutes": 5, "chapters": []},
+        headers=headers,
+    ).json()["id"]
+    enrolled = client.post(
+        f"/admin/groups/{group_id}/courses/{course_id}/enroll",
+        params={"mode": "delta"},
+        headers=headers,
+    )
+    assert enrolled.json()["newlyEnrolled"] == 3
+    assert enrolled.json()["linked"] is True
+    assert enrolled.json()["courseCount"] == 1
+
+    first = client.get(f"/admin/groups/{group_id}", params={"member_limit": 2}, headers=headers).json()
+    assert [m["userId"] for m in first["members"]] == student_ids[:2]
+    assert first["memberCount"] == 3
+    second = client.get(
+        f"/admin/groups/{group_id}",
+        params={"member_limit": 2, "member_cursor": first["nextMemberCursor"]},
+        headers=headers,
+    ).json()
+    assert [m["userId"] for m in second["members"]] == student_ids[2:]
+    assert second["nextMemberCursor"] is None
+
+
+def test_group_progress_matrix_json_and_csv(client, db: Session, admin_token: str):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    create_students(db, 2)
+    student_ids = [
+        row[0]
+        for row in db.query(models.User.id).filter(models.User.role == "user").order_by(models.User.name)
+    ]
+    group_id = client.post("/admin/groups", json={"name": "Cohort"}, headers=headers).json()["id"]
+    for user_id in student_ids:
+        client.post(f"/admin/groups/{group_id}/members", json={"userId": user_id}, headers=headers)
+
+    course = models.Course(title="Algebra", description="d", image_url="/x.svg")
+    other = models.Course(title="Biology", description="d", image_url="/x.svg")
+    db.add_all([course, other])
+    db.flush()
+    chapters = [
+        models.Chapter(course_id=course.id, title=f"Ch {i}", content="c", order=i) for i in (1, 2)
+    ]
+    assignment = models.Assignment(course_id=course.id, title="Essay", description="d")
+    db.add_all(chapters + [assignment])
+    db.flush()
+    db.add_all(
+        [
+            models.UserProgress(
+                user_id=student_ids[0], course_id=course.id, chapter_id=chapters[0].id,
+                completed=True, quiz_score=80,
+            ),
+            models.UserProgress(
+                user_id=student_ids[0], course_id=course.id, chapter_id=chapters[1].id,
+                completed=False, quiz_score=40,
+            ),
+            models.AssignmentSubmission(
+                assignment_id=assignment.id, user_id=student_ids[0], text_answer="a", grade=90,
+                graded_at=datetime(2026, 3, 1, tzinfo=timezone.utc),
+            ),
+            models.AssignmentSubmission(assignment_id=assignment.id, user_id=student_ids[0], text_answer="b"),
+        ]
+    )
+    db.commit()
+    client.post(f"/admin/groups/{group_id}/courses/{course.id}/enroll", headers=headers)
+    client.post(f"/admin/groups/{group_id}/courses/{other.id}/enroll", headers=headers)
+
+    response = client.get(f"/admin/analytics/groups/{group_id}/matrix", headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    matrix = response.json()
+    assert [c["title"] for c in matrix["courses"]] == ["Algebra", "Biology"]
+    assert matrix["courses"][0]["totalChapters"] == 2
+    assert [m["userId"] for m in matrix["members"]] == student_ids
+
+    algebra = matrix["members"][0]["courses"][0]
+    assert algebra == {
+        "courseId": course.id,
+        "enrolled": True,
+        "progress": 50,
+        "completedChapters": 1,
+        "averageQuizScore": 60.0,
+        "submitted": 2,
+        "graded": 1,
+        "averageGrade": 90.0,
+    }
+    idle = matrix["members"][1]["courses"][1]
+    assert idle["progress"] == 0 and idle["submitted"] == 0 and idle["averageGrade"] is None
+
+    csv_response = client.get(
+        f"/admin/analytics/groups/{group_id}/matrix", params={"format": "csv"}, headers=headers
+    )
+    assert csv_response.status_code == status.HTTP_200_OK
+    lines = csv_response.text.strip().splitlines()
+    assert lines[0].startswith("userId,name,email,courseId")
+    assert len(lines) == 1 + 2 * 2
+
+    missing = client.get("/admin/analytics/groups/nope/matrix", headers=headers)
+    assert missing.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_background_course_deletion_runs_in_chunks(client, db: Session, admin_token: str, monkeypatch):
+    from sqlalchemy.orm import sessionmaker
+
+    from app.workers.job_runner import run_pending
+
+    monkeypatch.setattr("app.core.admin_jobs.JOB_CHUNK_SIZE", 2)
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    create_students(db, 5)
+    student_ids = [row[0] for row in db.query(models.User.id).filter(models.User.role == "user")]
+    group_id = client.post("/admin/groups", json={"name": "Jobs"}, headers=headers).json()["id"]
+    for user_id in student_ids:
+        client.post(f"/admin/groups/{group_id}/members", json={"userId": user_id}, headers=headers)
+    course_id = client.post(
+        "/admin/courses",
+        json={"title": "Doomed", "description": "d", "imageUrl": "/x.svg", "estimatedMinutes": 5, "chapters": []},
+        headers=headers,
+    ).json()["id"]
+
+    queued = client.post(
+        f"/admin/groups/{group_id}/courses/{course_id}/enroll",
+        params={"background": "true"},
+        headers=headers,
+    )
+    assert queued.status_code == status.HTTP_202_ACCEPTED
+    assert queued.json()["status"] == "queued"
+    assert db.query(models.Enrollment).count() == 0
+
+    worker_sessions = sessionmaker(bind=db.get_bind())
+    assert run_pending(worker_sessions, worker="test") == 1
+    enrolled = client.get(f"/admin/jobs/{queued.json()['id']}", headers=headers).json()
+    assert enrolled["status"] == "succeeded"
+    assert (enrolled["progress"], enrolled["total"]) == (5, 5)
+    assert enrolled["result"] == {"linked": True, "newlyEnrolled": 5}
+
+    deletion = client.delete(f"/admin/courses/{course_id}", params={"background": "true"}, headers=headers)
+    assert deletion.status_code == status.HTTP_202_ACCEPTED
+    again = client.delete(f"/admin/courses/{course_id}", params={"background": "true"}, headers=headers)
+    assert again.json()["id"] == deletion.json()["id"]
+
+    assert run_pending(worker_sessions, worker="test") == 1
+    db.expire_all()
+    assert db.get(models.Course, course_id) is None
+    assert db.query(models.Enrollment).count() == 0
+    assert db.get(models.Group, group_id).course_count == 0
+    finished = client.get(f"/admin/jobs/{deletion.json()['id']}", headers=headers).json()
+    assert finished["status"] == "succeeded"
+    assert finished["progress"] == finished["total"] == 5 + 1 + 1
+
+    listed = client.get("/admin/jobs", params={"limit": 1}, headers=headers)
+    assert len(listed.json()) == 1
+    assert "X-Next-Cursor" in listed.headers
+    succeeded = client.get("/admin/jobs", params={"status": "succeeded"}, headers=headers).json()
+    assert len(succeeded) == 2
+    assert client.get("/admin/jobs", params={"status": "queued"}, headers=headers).json() == []
+    bad = client.get("/admin/jobs", params={"status": "done"}, headers=headers)
+    assert bad.status_code == status.HTTP_400_BAD_REQUEST
+    conflict = client.post(f"/admin/jobs/{deletion.json()['id']}/cancel", headers=headers)
+    assert conflict.status_code == status.HTTP_409_CONFLICT
+
+
+def test_running_course_deletion_cannot_be_cancelled_and_resumes(
+    client, db: Session, admin_token: str, monkeypatch
+):
+    from sqlalchemy.orm import sessionmaker
+
+    from app.core import admin_jobs, jobs
+
+    monkeypatch.setattr("app.core.admin_jobs.JOB_CHUNK_SIZE", 2)
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    create_students(db, 5)
+    course = models.Course(title="Doomed", description="d", image_url="/x.svg")
+    db.add(course)
+    db.commit()
+    for i in (1, 2):
+        chapter = models.Chapter(course_id=course.id, title=f"Ch {i}", content="c", order=i)
+        db.add(chapter)
+        db.flush()
+        db.add(models.Quiz(chapter_id=chapter.id, question="Q", options=["a", "b"], correct_option=0))
+    for user_id in [row[0] for row in db.query(models.User.id).filter(models.User.role == "user")]:
+        db.add(models.Enrollment(user_id=user_id, course_id=course.id))
+    db.commit()
+    course_id = course.id
+
+    job_id = client.delete(f"/admin/courses/{course_id}", params={"background": "true"}, headers=headers).json()["id"]
+    worker = sessionmaker(bind=db.get_bind())()
+    claimed = jobs.claim(worker, "test")
+    conflict = client.post(f"/admin/jobs/{job_id}/cancel", headers=headers)
+    assert conflict.status_code == status.HTTP_409_CONFLICT
+
+    finish = admin_jobs._finish_course_deletion
+    failures = []
+
+    def fail_once(*args):
+        if not failures:
+            failures.append(True)
+            raise RuntimeError("boom")
+        finish(*args)
+
+    monkeypatch.setattr(admin_jobs, "_finish_course_deletion", fail_once)
+    assert jobs.run_job(worker, claimed) == jobs.QUEUED
+    db.expire_all()
+    assert db.query(models.Enrollment).count() == 0
+    assert db.get(models.Course, course_id) is not None
+
+    job = db.get(models.Job, job_id)
+    job.run_at = job.created_at
+    db.commit()
+    assert jobs.run_job(worker, jobs.claim(worker, "test")) == jobs.SUCCEEDED
+    db.expire_all()
+    assert db.get(models.Course, course_id) is None
+    assert db.query(models.Chapter).count() == db.query(models.Quiz).count() == 0
+    assert db.get(models.Job, job_id).total == 5 + 2 + 2 + 1
+    worker.close()
+
+
+def test_jobs_retry_with_backoff_and_cancel(db: Session, monkeypatch):
+    from sqlalchemy.orm import sessionmaker
+
+    from app.core import jobs
+
+    calls = []
+
+    @jobs.handler("test_flaky")
+    def flaky(ctx, payload):
+        calls.append(payload)
+        raise RuntimeError("boom")
+
+    job = jobs.enqueue(db, "test_flaky", {"n": 1}, max_attempts=2)
+    worker = sessionmaker(bind=db.get_bind())()
+    claimed = jobs.claim(worker, "test")
+    assert jobs.run_job(worker, claimed) == jobs.QUEUED
+    db.refresh(job)
+    assert job.attempts == 1 and "boom" in job.last_error
+    assert jobs.claim(worker, "test") is None  # backing off
+
+    job.run_at = job.created_at
+    db.commit()
+    assert jobs.run_job(worker, jobs.claim(worker, "test")) == jobs.FAILED
+    assert len(calls) == 2
+
+    pending = jobs.enqueue(db, "test_flaky", {"n": 2})
+    assert jobs.request_cancel(db, pending)
+    assert pending.status == jobs.CANCELLED
+    assert jobs.claim(worker, "test") is None
+    worker.close()
+
+
+@pytest.mark.max_queries(12)
+def test_admin_analytics_aggregates_courses_in_one_query(client, db: Session, admin_token: str):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    create_students(db, 2)
+    student_ids = [row[0] for row in db.query(models.User.id).filter(models.User.role == "user")]
+    for i in range(6):
+        course = models.Course(title=f"Course {i}", description="d", image_url="/x.svg")
+        db.add(course)
+        db.flush()
+        chapter = models.Chapter(course_id=course.id, title="Ch", content="c", order=1)
+        db.add(chapter)
+        db.flush()
+        for user_id in student_ids:
+            db.add(models.Enrollment(user_id=user_id, course_id=course.id))
+        db.add(
+            models.UserProgress(
+                user_id=student_ids[0], course_id=course.id, chapter_id=chapter.id, completed=True
+            )
+        )
+    db.commit()
+
+    response = client.get("/admin/analytics", headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    overview = response.json()
+    assert len(overview["courses"]) == 6
+    assert {c["totalEnrollments"] for c in overview["courses"]} == {2}
+    assert {c["completionRate"] for c in overview["courses"]} == {50.0}
+    assert overview["averageCompletionRate"] == 50.0
@@ -1,3 +1,6 @@
+from datetime import datetime, timezone
+
+import pytest
 from fastapi import status
 from sqlalchemy.orm import Session
 
@@ -234,6 +237,192 @@ def test_list_submissions_for_assignment_as_admin(
     assert items[0]["userId"] == regular_user.id
 
 
+def test_list_submissions_paginates_filters_and_exports(
+    client,
+    db: Session,
+    admin_token: str,
+):
+    import csv
+    import io
+    import json
+
+    _, assignment_id = create_course_and_assignment(client, admin_token, db)
+    group = models.Group(name="Cohort", status="active")
+    db.add(group)
+    db.flush()
+
+    submission_ids = []
+    for i in range(3):
+        student = models.User(
+            email=f"student{i}@test.com",
+            name=f"Student {i}",
+            role="user",
+            hashed_password="x",
+        )
+        db.add(student)
+        db.flush()
+        if i < 2:
+            db.add(models.GroupMember(group_id=group.id, user_id=student.id))
+        submission = models.AssignmentSubmission(
+            assignment_id=assignment_id,
+            user_id=student.id,
+            text_answer=f"Answer {i}",
+            created_at=datetime(2026, 1, 1, 12, i, tzinfo=timezone.utc),
+        )
+        db.add(submission)
+        db.flush()
+        submission_ids.append(submission.id)
+    db.query(models.AssignmentSubmission).filter(
+        models.AssignmentSubmission.id == submission_ids[0]
+    ).update({"grade": 90, "graded_at": datetime.now(timezone.utc)})
+    db.commit()
+    group_id = group.id
+
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    url = f"/assignments/{assignment_id}/submissions"
+
+    first_page = client.get(url, params={"limit": 2}, headers=headers)
+    assert first_page.status_code == status.HTTP_200_OK
+    assert len(first_page.json()) == 2
+    cursor = first_page.headers["X-Next-Cursor"]
+
+    second_page = client.get(url, params={"limit": 2, "cursor": cursor}, headers=headers)
+    assert second_page.status_code == status.HTTP_200_OK
+    assert "X-Next-Cursor" not in second_page.headers
+    paged_ids = [item["id"] for item in first_page.json() + second_page.json()]
+    assert sorted(paged_ids) == sorted(submission_ids)
+
+    ungraded = client.get(url, params={"status_filter": "ungraded"}, headers=headers)
+    assert {item["id"] for item in ungraded.json()} == set(submission_ids[1:])
+
+    in_group = client.get(url, params={"group_id": group_id}, headers=headers)
+    assert {item["id"] for item in in_group.json()} == set(submission_ids[:2])
+
+    csv_export = client.get(f"{url}/export", params={"status_filter": "graded"}, headers=headers)
+    assert csv_export.status_code == status.HTTP_200_OK
+    assert csv_export.headers["content-type"].startswith("text/csv")
+    csv_rows = list(csv.DictReader(io.StringIO(csv_export.text)))
+    assert [row["submissionId"] for row in csv_rows] == [submission_ids[0]]
+    assert csv_rows[0]["grade"] == "90"
+
+    ndjson_export = client.get(
+        f"{url}/export",
+        params={"format": "ndjson", "group_id": group_id},
+        headers=headers,
+    )
+    assert ndjson_export.status_code == status.HTTP_200_OK
+    lines = [json.loads(line) for line in ndjson_export.text.splitlines()]
+    assert {line["submissionId"] for line in lines} == set(submission_ids[:2])
+
+
+def test_bulk_grade_submissions_reports_per_item_results(
+    client,
+    db: Session,
+    admin_token: str,
+    user_token: str,
+    regular_user: models.User,
+):
+    course_id, assignment_id = create_course_and_assignment(client, admin_token, db)
+    enroll_user_to_course(db, regular_user, course_id)
+
+    submission_response = client.post(
+        f"/assignments/{assignment_id}/submissions",
+        json={"textAnswer": "Bulk answer"},
+        headers={"Authorization": f"Bearer {user_token}"},
+    )
+    submission_id = submission_response.json()["id"]
+
+    response = client.post(
+        f"/assignments/{assignment_id}/submissions/bulk-grade",
+        json={
+            "items": [
+                {"submissionId": submission_id, "grade": 77, "feedback": "Solid"},
+                {"submissionId": "missing", "grade": 10},
+                {"submissionId": submission_id, "grade": 5},
+            ]
+        },
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["graded"] == 1
+    assert [item["status"] for item in data["items"]] == ["graded", "not_found", "duplicate"]
+
+    db.expire_all()
+    submission = db.get(models.AssignmentSubmission, submission_id)
+    assert submission.grade == 77
+    assert submission.feedback == "Solid"
+    assert submission.graded_at is not None
+
+
+def test_attachment_upload_dedup_and_range_download(
+    client,
+    db: Session,
+    admin_token: str,
+    user_token: str,
+    regular_user: models.User,
+    tmp_path,
+    monkeypatch,
+):
+    from app.core import file_storage
+
+    monkeypatch.setattr(file_storage, "_storage", file_storage.LocalFileStorage(str(tmp_path)))
+
+    course_id, assignment_id = create_course_and_assignment(client, admin_token, db)
+    enroll_user_to_course(db, regular_user, course_id)
+    user_headers = {"Authorization": f"Bearer {user_token}"}
+    content = b"0123456789" * 1000
+
+    uploads = [
+        client.post(
+            f"/assignments/{assignment_id}/attachments",
+            files={"file": (name, content, "text/plain")},
+            headers=user_headers,
+        )
+        for name in ("report.txt", "copy.txt")
+    ]
+    assert all(upload.status_code == status.HTTP_201_CREATED for upload in uploads)
+    meta = uploads[0].json()
+    assert meta["sha256"] == uploads[1].json()["sha256"]
+    assert meta["size"] == len(content)
+    assert db.query(models.StoredFile).count() == 1
+    assert len([p for p in tmp_path.rglob("*") if p.is_file()]) == 1
+
+    inline = client.post(
+        f"/assignments/{assignment_id}/submissions",
+        json={"attachments": [{"filename": "a.txt", "content": "inline body"}]},
+        headers=user_headers,
+    )
+    assert inline.status_code == status.HTTP_400_BAD_REQUEST
+
+    submission_response = client.post(
+        f"/assignments/{assignment_id}/submissions",
+        json={"attachments": [meta]},
+        headers=user_headers,
+    )
+    assert submission_response.status_code == status.HTTP_201_CREATED
+    submission_id = submission_response.json()["id"]
+    assert submission_response.json()["attachments"] == [meta]
+
+    url = f"/assignments/{assignment_id}/submissions/{submission_id}/attachments/{meta['sha256']}"
+    full = client.get(url, headers=user_headers)
+    assert full.status_code == status.HTTP_200_OK
+    assert full.content == content
+    assert full.headers["accept-ranges"] == "bytes"
+
+    partial = client.get(url, headers={**user_headers, "Range": "bytes=10-19"})
+    assert partial.status_code == status.HTTP_206_PARTIAL_CONTENT
+    assert partial.content == content[10:20]
+    assert partial.headers["content-range"] == f"bytes 10-19/{len(content)}"
+
+    unsatisfiable = client.get(url, headers={**user_headers, "Range": "bytes=999999-"})
+    assert unsatisfiable.status_code == status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE
+
+    cached = client.get(url, headers={**user_headers, "If-None-Match": full.headers["etag"]})
+    assert cached.status_code == status.HTTP_304_NOT_MODIFIED
+
+
 def test_get_submission_by_owner(
     client,
     db: Session,
@@ -264,6 +453,7 @@ def test_get_submission_by_owner(
     assert data["userId"] == regular_user.id
 
 
+@pytest.mark.max_queries(2, route="/users/me/assignments")
 def test_get_my_assignments_includes_enrolled_courses_and_latest_submission(
     client,
     db: Session,
@@ -308,6 +498,120 @@ def test_get_my_assignments_includes_enrolled_courses_and_latest_submission(
     assert item2["latestSubmissionId"] is None
 
 
+@pytest.mark.max_queries(2, route="/users/me/assignments")
+def test_get_my_assignments_paginates_with_cursor(
+    client,
+    db: Session,
+    admin_token: str,
+    user_token: str,
+    regular_user: models.User,
+):
+    assignment_ids = set()
+    for _ in range(3):
+        course_id, assignment_id = create_course_and_assignment(client, admin_token, db)
+        enroll_user_to_course(db, regular_user, course_id)
+        assignment_ids.add(assignment_id)
+
+    seen = []
+    cursor = None
+    for _ in range(3):
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get(
+            "/users/me/assignments",
+            params=params,
+            headers={"Authorization": f"Bearer {user_token}"},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        seen.extend(item["assignmentId"] for item in data["items"])
+        cursor = data["nextCursor"]
+        if cursor is None:
+            break
+
+    assert len(seen) == 3
+    assert set(seen) == assignment_ids
+
+    bad_cursor = client.get(
+        "/users/me/assignments",
+        params={"limit": 2, "cursor": "not-a-cursor"},
+        headers={"Authorization": f"Bearer {user_token}"},
+    )
+    assert bad_cursor.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.max_queries(2, route="/users/me/assignments")
+def test_get_my_assignments_served_from_inbox(
+    client,
+    db: Session,
+    admin_token: str,
+    user_token: str,
+    regular_user: models.User,
+    monkeypatch,
+):
+    from app.core import assignment_inbox
+
+    monkeypatch.setattr(assignment_inbox, "ENABLED", True)
+
+    course_id, assignment_id = create_course_and_assignment(client, admin_token, db)
+    enroll_response = client.post(
+        f"/admin/courses/{course_id}/enroll-user",
+        json={"email": regular_user.email},
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert enroll_response.status_code == status.HTTP_200_OK
+
+    submission_response = client.post(
+        f"/assignments/{assignment_id}/submissions",
+        json={"textAnswer": "Inbox answer"},
+        headers={"Authorization": f"Bearer {user_token}"},
+    )
+    assert submission_response.status_code == status.HTTP_201_CREATED
+
+    inbox_row = db.get(models.UserAssignmentInbox, (regular_user.id, assignment_id))
+    assert inbox_row is not None
+    assert inbox_row.latest_submission_id == submission_response.json()["id"]
+
+    response = client.get(
+        "/users/me/assignments",
+        headers={"Authorization": f"Bearer {user_token}"},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    items = response.json()["items"]
+    assert [item["assignmentId"] for item in items] == [assignment_id]
+    assert items[0]["latestSubmissionId"] == submission_response.json()["id"]
+
+
+def test_assignment_inbox_rebuild_catches_up_after_flag_was_off(
+    client,
+    db: Session,
+    admin_token: str,
+    user_token: str,
+    regular_user: models.User,
+    monkeypatch,
+):
+    from app.core import assignment_inbox
+
+    monkeypatch.setattr(assignment_inbox, "ENABLED", False)
+    course_id, assignment_id = create_course_and_assignment(client, admin_token, db)
+    client.post(
+        f"/admin/courses/{course_id}/enroll-user",
+        json={"email": regular_user.email},
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    submission_id = client.post(
+        f"/assignments/{assignment_id}/submissions",
+        json={"textAnswer": "Late inbox"},
+        headers={"Authorization": f"Bearer {user_token}"},
+    ).json()["id"]
+    assert db.query(models.UserAssignmentInbox).count() == 0
+
+    assignment_inbox.rebuild(db)
+    inbox_row = db.get(models.UserAssignmentInbox, (regular_user.id, assignment_id))
+    assert inbox_row.latest_submission_id == submission_id
+
+
 def test_get_assignment_unauthorized_without_token(
     client,
     db: Session,
@@ -0,0 +1,48 @@
+import pytest
+from fastapi import status
+from sqlalchemy import create_engine, text
+
+from app.db import bootstrap, models
+from main import app
+
+
+def test_liveness_and_readiness(client, db):
+    assert client.get("/health/live").json() == {"status": "ok"}
+
+    response = client.get("/health/ready")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["status"] == "ok"
+
+    app.state.started = False
+    try:
+        assert client.get("/health/ready").status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    finally:
+        app.state.started = True
+
+
+def test_verify_schema_compares_revision_with_head():
+    engine = create_engine("sqlite://")
+    head, = bootstrap.head_revisions()
+
+    with pytest.raises(bootstrap.SchemaOutOfDate):
+        bootstrap.verify_schema(engine)
+
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE alembic_version (version_num VARCHAR(32) NOT NULL)"))
+        connection.execute(text("INSERT INTO alembic_version VALUES ('019_cohort_matrix_index')"))
+    with pytest.raises(bootstrap.SchemaOutOfDate, match=head):
+        bootstrap.verify_schema(engine)
+
+    with engine.begin() as connection:
+        connection.execute(text("UPDATE alembic_version SET version_num = :head"), {"head": head})
+    assert bootstrap.verify_schema(engine) == head
+
+
+def test_ensure_admin_is_idempotent(db, monkeypatch):
+    monkeypatch.setenv("ADMIN_EMAIL", "root@test.com")
+    monkeypatch.setenv("ADMIN_PASSWORD", "secret-password")
+
+    assert bootstrap.ensure_admin(db) is True
+    assert bootstrap.ensure_admin(db) is False
+    admins = db.query(models.User).filter(models.User.email == "root@test.com").all()
+    assert [admin.role for admin in admins] == ["admin"]
@@ -0,0 +1,59 @@
+import anyio
+import pytest
+from fastapi import status
+
+from app.core import concurrency
+
+
+def test_requests_are_grouped_by_path_and_method():
+    def group(method, path, query=b""):
+        return concurrency.classify({"type": "http", "method": method, "path": path, "query_string": query})
+
+    assert group("POST", "/auth/login") == "auth"
+    assert group("DELETE", "/admin/courses/1") == "admin"
+    assert group("GET", "/courses/1") == "reads"
+    assert group("POST", "/courses/1/chapters/2/quiz") == "writes"
+    assert group("GET", "/assignments/a/submissions/s/attachments/" + "0" * 64) == "transfers"
+    assert group("GET", "/assignments/a/submissions/export") == "transfers"
+    assert group("GET", "/admin/analytics/groups/g/matrix", b"format=csv") == "transfers"
+    assert group("GET", "/admin/analytics/groups/g/matrix") == "admin"
+    assert group("POST", "/assignments/a/submissions/s/attachments") == "writes"
+    assert group("GET", "/health/ready") is None
+    assert group("OPTIONS", "/courses/") is None
+
+
+def test_limiter_queues_then_sheds_load():
+    limiter = concurrency.GroupLimiter("test", limit=1, max_queue=1, queue_timeout=0.05)
+    timeouts_before = concurrency.REJECTED.value(("test", "timeout"))
+
+    async def scenario():
+        await limiter.acquire()
+        # One waiter is allowed to queue, then times out.
+        with pytest.raises(concurrency.Overloaded, match="timeout"):
+            await limiter.acquire()
+
+        async with anyio.create_task_group() as tasks:
+            tasks.start_soon(limiter.acquire)
+            await anyio.sleep(0.01)
+            # The queue is full now, so the next request is rejected at once.
+            with pytest.raises(concurrency.Overloaded, match="queue_full"):
+                await limiter.acquire()
+            limiter.release()
+        limiter.release()
+
+    anyio.run(scenario)
+    assert concurrency.REJECTED.value(("test", "timeout")) == timeouts_before + 1
+    assert concurrency.QUEUED.value(("test",)) == 0
+    assert concurrency.IN_FLIGHT.value(("test",)) == 0
+
+
+def test_overloaded_group_returns_503_without_blocking_others(client, db, admin_token, monkeypatch):
+    saturated = concurrency.GroupLimiter("admin", limit=0, max_queue=0, queue_timeout=1)
+    monkeypatch.setitem(concurrency.LIMITERS, "admin", saturated)
+
+    response = client.get("/admin/users", headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.headers["Retry-After"] == "1"
+
+    assert client.get("/courses/").status_code != status.HTTP_503_SERVICE_UNAVAILABLE
+    assert 'http_group_requests_rejected_total{group="admin",reason="queue_full"}' in client.get("/metrics").text
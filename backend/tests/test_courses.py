@@ -1,4 +1,6 @@
+import pytest
 from fastapi import status
+from sqlalchemy import event
 from sqlalchemy.orm import Session
 
 from app.db import models
@@ -50,6 +52,7 @@ def create_course_via_api(client, admin_token: str) -> str:
     return data["id"]
 
 
+@pytest.mark.max_queries(3, route="/courses/")
 def test_get_all_courses_returns_list(client, db: Session, admin_token: str):
     course_id = create_course_via_api(client, admin_token)
 
@@ -67,6 +70,8 @@ def test_get_user_courses_unauthorized_without_token(client):
     assert response.status_code == status.HTTP_401_UNAUTHORIZED
 
 
+@pytest.mark.max_queries(5, route="/courses/{course_id}")
+@pytest.mark.max_queries(9, route="/courses/{course_id}/chapters/{chapter_id}/quiz")
 def test_submit_quiz_updates_progress_for_enrolled_user(
     client,
     db: Session,
@@ -947,3 +952,354 @@ def test_admin_course_users_analytics_not_found_for_unknown_course(
     assert response.status_code == status.HTTP_404_NOT_FOUND
     data = response.json()
     assert data["detail"] == "Course not found"
+
+
+@pytest.mark.max_queries(3, route="/courses/{course_id}/chapters/{chapter_id}")
+def test_get_chapter_uses_single_query_for_enrolled_user(
+    client,
+    db: Session,
+    admin_token: str,
+    user_token: str,
+    regular_user: models.User,
+):
+    course_id = create_course_via_api(client, admin_token)
+    chapter = (
+        db.query(models.Chapter).filter(models.Chapter.course_id == course_id).first()
+    )
+
+    enroll_response = client.post(
+        f"/admin/courses/{course_id}/enroll-user",
+        json={"email": regular_user.email},
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert enroll_response.status_code == status.HTTP_200_OK
+
+    client.get(
+        f"/courses/{course_id}/chapters/{chapter.id}",
+        headers={"Authorization": f"Bearer {user_token}"},
+    )
+
+    statements = []
+
+    def record_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", record_statement)
+    try:
+        response = client.get(
+            f"/courses/{course_id}/chapters/{chapter.id}",
+            headers={"Authorization": f"Bearer {user_token}"},
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", record_statement)
+
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["id"] == chapter.id
+    assert len(data["quiz"]) == 1
+    assert data["completed"] is False
+
+    chapter_statements = [s for s in statements if "FROM users" not in s]
+    assert len(chapter_statements) == 1
+
+
+@pytest.mark.max_queries(6, route="/courses/")
+def test_enrollment_made_elsewhere_shows_up_in_catalog_and_course(
+    client,
+    db: Session,
+    admin_token: str,
+    user_token: str,
+    regular_user: models.User,
+):
+    course_id = create_course_via_api(client, admin_token)
+    headers = {"Authorization": f"Bearer {user_token}"}
+
+    catalog = {course["id"]: course for course in client.get("/courses/", headers=headers).json()}
+    assert catalog[course_id]["enrolled"] is False
+
+    # Another worker or the job runner enrolls the user; no invalidation reaches this process.
+    db.add(models.Enrollment(user_id=regular_user.id, course_id=course_id))
+    db.commit()
+
+    catalog = {course["id"]: course for course in client.get("/courses/", headers=headers).json()}
+    assert catalog[course_id]["enrolled"] is True
+    assert client.get(f"/courses/{course_id}", headers=headers).json()["enrolled"] is True
+
+
+def test_get_chapter_unknown_course_returns_404(
+    client,
+    user_token: str,
+):
+    response = client.get(
+        "/courses/non-existent-course/chapters/non-existent-chapter",
+        headers={"Authorization": f"Bearer {user_token}"},
+    )
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert response.json()["detail"] == "Course not found"
+
+
+def test_repeated_completion_and_quiz_keep_single_progress_row_with_best_score(
+    client,
+    db: Session,
+    admin_token: str,
+    user_token: str,
+    regular_user: models.User,
+):
+    course_id = create_course_via_api(client, admin_token)
+    chapter = (
+        db.query(models.Chapter).filter(models.Chapter.course_id == course_id).first()
+    )
+    quiz = chapter.quizzes[0]
+    headers = {"Authorization": f"Bearer {user_token}"}
+
+    enroll_response = client.post(
+        f"/admin/courses/{course_id}/enroll-user",
+        json={"email": regular_user.email},
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert enroll_response.status_code == status.HTTP_200_OK
+
+    for _ in range(2):
+        response = client.post(
+            f"/courses/{course_id}/chapters/{chapter.id}/complete",
+            headers=headers,
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["progress"] == 100
+
+    passed = client.post(
+        f"/courses/{course_id}/chapters/{chapter.id}/quiz",
+        json={"answers": {quiz.id: quiz.correct_option}},
+        headers=headers,
+    )
+    assert passed.status_code == status.HTTP_200_OK
+
+    failed = client.post(
+        f"/courses/{course_id}/chapters/{chapter.id}/quiz",
+        json={"answers": {quiz.id: quiz.correct_option + 1}},
+        headers=headers,
+    )
+    assert failed.status_code == status.HTTP_200_OK
+    data = failed.json()
+    assert data["score"] == 0
+    assert data["bestScore"] == 100
+    assert data["courseProgress"] == 100
+
+    db.expire_all()
+    rows = (
+        db.query(models.UserProgress)
+        .filter(
+            models.UserProgress.user_id == regular_user.id,
+            models.UserProgress.chapter_id == chapter.id,
+        )
+        .all()
+    )
+    assert len(rows) == 1
+    assert rows[0].completed is True
+    assert rows[0].quiz_score == 100
+
+
+def test_complete_chapter_from_other_course_returns_404(
+    client,
+    db: Session,
+    admin_token: str,
+    user_token: str,
+    regular_user: models.User,
+):
+    course_id = create_course_via_api(client, admin_token)
+    other_course_id = create_course_via_api(client, admin_token)
+    other_chapter = (
+        db.query(models.Chapter)
+        .filter(models.Chapter.course_id == other_course_id)
+        .first()
+    )
+
+    enroll_response = client.post(
+        f"/admin/courses/{course_id}/enroll-user",
+        json={"email": regular_user.email},
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert enroll_response.status_code == status.HTTP_200_OK
+
+    response = client.post(
+        f"/courses/{course_id}/chapters/{other_chapter.id}/complete",
+        headers={"Authorization": f"Bearer {user_token}"},
+    )
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert db.query(models.UserProgress).count() == 0
+
+
+def test_quiz_attempts_feed_item_analysis(
+    client,
+    db: Session,
+    admin_token: str,
+    user_token: str,
+    regular_user: models.User,
+):
+    course_id = create_course_via_api(client, admin_token)
+    chapter = (
+        db.query(models.Chapter).filter(models.Chapter.course_id == course_id).first()
+    )
+    quiz = chapter.quizzes[0]
+
+    enroll_response = client.post(
+        f"/admin/courses/{course_id}/enroll-user",
+        json={"email": regular_user.email},
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert enroll_response.status_code == status.HTTP_200_OK
+
+    for answer in (quiz.correct_option + 1, quiz.correct_option):
+        response = client.post(
+            f"/courses/{course_id}/chapters/{chapter.id}/quiz",
+            json={"answers": {quiz.id: answer}},
+            headers={"Authorization": f"Bearer {user_token}"},
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+    attempts = (
+        db.query(models.QuizAttempt)
+        .filter(models.QuizAttempt.user_id == regular_user.id)
+        .all()
+    )
+    assert sorted(a.score for a in attempts) == [0, 100]
+    assert db.query(models.QuizAttemptItem).count() == 2
+
+    items_response = client.get(
+        f"/admin/analytics/chapters/{chapter.id}/items",
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert items_response.status_code == status.HTTP_200_OK
+    analysis = items_response.json()
+    assert analysis["attempts"] == 2
+    assert analysis["passRate"] == 50.0
+    assert analysis["averageScore"] == 50.0
+    item = analysis["items"][0]
+    assert item["quizId"] == quiz.id
+    assert item["attempts"] == 2
+    assert item["difficulty"] == 0.5
+    assert item["discrimination"] == 1.0
+
+    course_response = client.get(
+        f"/admin/analytics/courses/{course_id}/quizzes",
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert course_response.status_code == status.HTTP_200_OK
+    chapters = course_response.json()["chapters"]
+    assert chapters[0]["chapterId"] == chapter.id
+    assert chapters[0]["passRate"] == 50.0
+
+    delete_response = client.delete(
+        f"/admin/courses/{course_id}",
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert delete_response.status_code == status.HTTP_200_OK
+    assert db.query(models.QuizAttempt).count() == 0
+    assert db.query(models.QuizChapterStats).count() == 0
+
+
+def test_update_course_applies_structural_diff(
+    client,
+    db: Session,
+    admin_token: str,
+):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    payload = {
+        "title": "Diff Course",
+        "description": "Course for diff tests",
+        "imageUrl": "https://example.com/image.svg",
+        "chapters": [
+            {
+                "id": "new-1",
+                "title": "First",
+                "content": "First content",
+                "quiz": [
+                    {"id": "q-1", "question": "Keep?", "options": ["a", "b"], "correctOption": 0},
+                    {"id": "q-2", "question": "Drop?", "options": ["a", "b"], "correctOption": 1},
+                ],
+            },
+            {"id": "new-2", "title": "Second", "content": "Second content", "quiz": []},
+            {"id": "new-3", "title": "Third", "content": "Third content", "quiz": []},
+        ],
+    }
+    created = client.post("/admin/courses", json=payload, headers=headers).json()
+    course_id = created["id"]
+    first, second, third = sorted(
+        db.query(models.Chapter).filter(models.Chapter.course_id == course_id).all(),
+        key=lambda ch: ch.order,
+    )
+    kept_quiz = next(q for q in first.quizzes if q.question == "Keep?")
+    first_id, second_id, third_id = first.id, second.id, third.id
+    version_before = db.get(models.Course, course_id).content_version
+
+    update_payload = {
+        "title": "Diff Course",
+        "description": "Course for diff tests",
+        "imageUrl": "https://example.com/image.svg",
+        "chapters": [
+            {"id": third.id, "title": "Third", "content": "Third content", "quiz": []},
+            {
+                "id": first.id,
+                "title": "First (edited)",
+                "content": "First content",
+                "quiz": [
+                    {"id": kept_quiz.id, "question": "Keep?", "options": ["a", "b"], "correctOption": 1},
+                ],
+            },
+            {
+                "id": "brand-new",
+                "title": "Fourth",
+                "content": "Fourth content",
+                "quiz": [{"id": "q-new", "question": "New?", "options": ["x", "y"], "correctOption": 0}],
+            },
+        ],
+    }
+    response = client.put(f"/admin/courses/{course_id}", json=update_payload, headers=headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert [ch["title"] for ch in data["chapters"]] == ["Third", "First (edited)", "Fourth"]
+    assert [q["id"] for q in data["chapters"][1]["quiz"]] == [kept_quiz.id]
+    assert data["chapters"][1]["quiz"][0]["correctOption"] == 1
+
+    db.expire_all()
+    chapter_ids = {ch.id for ch in db.query(models.Chapter).filter(models.Chapter.course_id == course_id)}
+    assert second_id not in chapter_ids
+    assert {first_id, third_id} <= chapter_ids
+    assert db.query(models.Quiz).filter(models.Quiz.chapter_id == first_id).count() == 1
+    assert db.get(models.Course, course_id).content_version == version_before + 1
+
+
+def test_diff_course_reports_only_changed_rows():
+    from app.core.course_diff import diff_course
+    from app.schemas.course import ChapterCreate
+
+    existing_chapters = {
+        "c1": {"title": "One", "content": "1", "order": 0},
+        "c2": {"title": "Two", "content": "2", "order": 1},
+    }
+    existing_quizzes = {
+        "q1": {
+            "chapter_id": "c1",
+            "question": "Q",
+            "options": ["a", "b"],
+            "correct_option": 0,
+            "question_type": "choice",
+        },
+    }
+    chapters = [
+        ChapterCreate(id="c1", title="One", content="1", quiz=[
+            {"id": "q1", "question": "Q", "options": ["a", "b"], "correctOption": 0},
+        ]),
+        ChapterCreate(id="c2", title="Two", content="2", quiz=[]),
+    ]
+
+    assert not diff_course(existing_chapters, existing_quizzes, chapters).has_changes
+
+    diff = diff_course(existing_chapters, existing_quizzes, list(reversed(chapters)))
+    assert sorted((row["id"], row["order"]) for row in diff.chapter_updates) == [("c1", 1), ("c2", 0)]
+    assert not diff.chapter_inserts and not diff.chapter_deletes
+    assert not diff.quiz_updates and not diff.quiz_deletes
@@ -0,0 +1,26 @@
+import os
+
+import pytest
+
+from benchmarks.importtime import profile, total_ms
+
+
+# Generous enough for a loaded CI runner; main imports in ~0.7 s locally.
+IMPORT_TIME_BUDGET_MS = float(os.getenv("IMPORT_TIME_BUDGET_MS", "2500"))
+
+
+@pytest.mark.parametrize(
+    ("entry_point", "must_not_import"),
+    [
+        ("main", {"passlib", "alembic", "kafka"}),
+        ("app.workers.job_runner", {"fastapi", "passlib", "alembic", "kafka"}),
+        ("app.workers.assignment_deadline_notifier", {"fastapi", "passlib", "alembic", "kafka"}),
+        ("app.workers.notifications_consumer", {"fastapi", "passlib", "alembic"}),
+    ],
+)
+def test_cold_start_imports(entry_point, must_not_import):
+    records = profile(entry_point)
+
+    loaded = {record.module.split(".")[0] for record in records}
+    assert not loaded & must_not_import
+    assert total_ms(records, entry_point) < IMPORT_TIME_BUDGET_MS
@@ -0,0 +1,96 @@
+import json
+import logging
+
+import pytest
+from fastapi import status
+
+from app.core import concurrency, instrumentation, metrics
+from app.core.query_detector import QueryBudget, QueryBudgetExceeded, repeated_shapes
+from app.db import models
+
+
+def test_server_timing_and_metrics(client, db, admin_token: str):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    response = client.get("/admin/users", headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+
+    timing = response.headers["Server-Timing"]
+    assert timing.startswith("app;dur=")
+    queries = int(timing.split('desc="')[1].split(" ")[0])
+    assert queries >= 1
+
+    exposition = client.get("/metrics").text
+    assert '# TYPE http_request_duration_seconds histogram' in exposition
+    assert 'http_request_duration_seconds_count{method="GET",route="/admin/users",status="200"}' in exposition
+    assert 'http_request_db_queries_bucket{method="GET",route="/admin/users",le="+Inf"}' in exposition
+
+
+def test_metrics_are_summed_over_workers_and_survive_worker_exit(tmp_path, monkeypatch):
+    monkeypatch.setattr(metrics, "METRICS_DIR", str(tmp_path))
+    rejected = concurrency.REJECTED.value(("reads", "queue_full"))
+    in_flight = concurrency.IN_FLIGHT.value(("reads",))
+    # Another worker's snapshot, as its flusher would have written it.
+    (tmp_path / "worker-999999-0000.json").write_text(json.dumps({
+        "http_group_requests_rejected_total": {"kind": "counter", "values": [[["reads", "queue_full"], 5]]},
+        "http_group_requests_in_flight": {"kind": "gauge", "values": [[["reads"], 3]]},
+    }))
+
+    exposition = metrics.render()
+    assert f'http_group_requests_rejected_total{{group="reads",reason="queue_full"}} {int(rejected + 5)}' in exposition
+    assert f'http_group_requests_in_flight{{group="reads"}} {int(in_flight + 3)}' in exposition
+
+    metrics.archive_worker(999999)
+    assert not (tmp_path / "worker-999999-0000.json").exists()
+    exposition = metrics.render()
+    assert f'http_group_requests_rejected_total{{group="reads",reason="queue_full"}} {int(rejected + 5)}' in exposition
+    assert f'http_group_requests_in_flight{{group="reads"}} {int(in_flight + 3)}' not in exposition
+
+
+def test_slow_requests_are_logged_with_statements(client, db, admin_token: str, monkeypatch, caplog):
+    monkeypatch.setattr(instrumentation, "SLOW_REQUEST_MS", 0)
+    headers = {"Authorization": f"Bearer {admin_token}"}
+
+    with caplog.at_level(logging.WARNING, logger="app.slow_requests"):
+        client.get("/admin/groups", headers=headers)
+
+    entry = json.loads(caplog.records[-1].getMessage())
+    assert entry["event"] == "slow_request"
+    assert entry["route"] == "/admin/groups"
+    assert entry["queries"] >= 1
+    assert any("FROM groups" in statement["sql"] for statement in entry["statements"])
+
+
+def test_repeated_statement_shapes_are_detected(db):
+    for i in range(6):
+        db.add(models.Course(title=f"Course {i}", description="d", image_url="/x.svg"))
+    db.commit()
+
+    with instrumentation.track() as stats:
+        for course in db.query(models.Course).all():
+            len(course.enrollments)
+
+    repeated = repeated_shapes(stats, threshold=5)
+    assert len(repeated) == 1
+    assert repeated[0].count == 6
+    assert "FROM enrollments" in repeated[0].shape
+
+
+def test_query_budget_fails_requests_over_budget(client, db, admin_token: str):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    with pytest.raises(QueryBudgetExceeded, match="GET /admin/groups"):
+        with QueryBudget(max_queries=0):
+            client.get("/admin/groups", headers=headers)
+
+
+def test_route_budget_only_checks_its_route(client, db, admin_token: str):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    with pytest.raises(QueryBudgetExceeded) as excinfo:
+        with QueryBudget(max_queries=0, route="/admin/users"):
+            client.get("/admin/groups", headers=headers)
+            client.get("/admin/users", headers=headers)
+    assert "GET /admin/users" in str(excinfo.value)
+    assert "/admin/groups" not in str(excinfo.value)
+
+    with pytest.raises(QueryBudgetExceeded, match="no request to that route"):
+        with QueryBudget(max_queries=0, route="/admin/users"):
+            client.get("/admin/groups", headers=headers)
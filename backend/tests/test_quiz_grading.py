@@ -0,0 +1,90 @@
+from types import SimpleNamespace
+
+from app.core import quiz_grading
+from app.core.quiz_grading import compile_answer_key, grade
+from app.db import models
+
+
+def make_quiz(quiz_id, options, correct_option, question_type="choice"):
+    return SimpleNamespace(
+        id=quiz_id,
+        options=options,
+        correct_option=correct_option,
+        question_type=question_type,
+    )
+
+
+def test_compile_answer_key_skips_ungradable_questions():
+    answer_key = compile_answer_key([
+        make_quiz("choice", ["a", "b"], 1),
+        make_quiz("single-option", ["a", "  "], 0),
+        make_quiz("text", ["  Paris "], 0, "text"),
+        make_quiz("empty-text", [""], 0, "text"),
+    ])
+
+    assert answer_key.quiz_count == 4
+    assert answer_key.choice_answers == {"choice": 1}
+    assert answer_key.text_answers == {"text": "paris"}
+
+
+def test_grade_counts_text_questions_only_when_answered():
+    answer_key = compile_answer_key([
+        make_quiz("q1", ["a", "b", "c"], 2),
+        make_quiz("q2", ["a", "b", "c"], 0),
+        make_quiz("q3", ["Paris"], 0, "text"),
+        make_quiz("q4", ["Rome"], 0, "text"),
+    ])
+
+    result = grade(answer_key, {"q1": 2, "q2": "0", "q3": " PARIS"})
+
+    assert result.correct_answers == 2
+    assert result.total_questions == 3
+    assert result.score == 66
+
+
+def test_grade_with_no_gradable_questions_scores_zero():
+    result = grade(compile_answer_key([make_quiz("q1", ["only"], 0)]), {"q1": 0})
+
+    assert result.total_questions == 0
+    assert result.score == 0
+
+
+def test_cached_answer_key_is_reloaded_after_a_content_version_bump(db):
+    course = models.Course(title="C", description="d", image_url="/x.svg")
+    db.add(course)
+    db.flush()
+    chapter = models.Chapter(course_id=course.id, title="Ch", content="c", order=1)
+    db.add(chapter)
+    db.flush()
+    quiz = models.Quiz(chapter_id=chapter.id, question="Q", options=["a", "b"], correct_option=0)
+    db.add(quiz)
+    db.commit()
+
+    assert quiz_grading.get_answer_key(db, course.id, chapter.id).choice_answers == {quiz.id: 0}
+
+    quiz.correct_option = 1
+    db.commit()
+    assert quiz_grading.get_answer_key(db, course.id, chapter.id).choice_answers == {quiz.id: 0}
+
+    course.content_version += 1
+    db.commit()
+    assert quiz_grading.get_answer_key(db, course.id, chapter.id).choice_answers == {quiz.id: 1}
+
+
+def test_answer_key_cache_evicts_least_recently_used_chapter(db, monkeypatch):
+    monkeypatch.setattr(quiz_grading, "ANSWER_KEY_CACHE_MAX_CHAPTERS", 2)
+    quiz_grading.clear()
+    course = models.Course(title="C", description="d", image_url="/x.svg")
+    db.add(course)
+    db.flush()
+    chapters = [models.Chapter(course_id=course.id, title=f"Ch {i}", content="c", order=i) for i in range(3)]
+    db.add_all(chapters)
+    db.commit()
+
+    first, second, third = [(course.id, chapter.id) for chapter in chapters]
+    quiz_grading.get_answer_key(db, *first)
+    quiz_grading.get_answer_key(db, *second)
+    quiz_grading.get_answer_key(db, *first)
+    quiz_grading.get_answer_key(db, *third)
+
+    assert list(quiz_grading._cache) == [first, third]
@@ -0,0 +1,86 @@
+import pytest
+from fastapi import status
+
+from app.core import rate_limit
+
+
+@pytest.fixture
+def limited(monkeypatch):
+    store = rate_limit.MemoryStore()
+    monkeypatch.setattr(rate_limit, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(rate_limit, "STORE", store)
+    return store
+
+
+def test_token_bucket_allows_burst_then_refills():
+    store = rate_limit.MemoryStore()
+
+    assert [store.take("k", rate=1, burst=3, now=0.0) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert store.take("k", rate=1, burst=3, now=0.0) == pytest.approx(1.0)
+    assert store.take("k", rate=1, burst=3, now=0.5) == pytest.approx(0.5)
+    assert store.take("k", rate=1, burst=3, now=1.0) == 0.0
+
+
+def test_store_evicts_refilled_buckets_when_full():
+    store = rate_limit.MemoryStore(max_keys=2)
+    store.take("a", rate=1, burst=5, now=0.0)
+    store.take("b", rate=1, burst=5, now=0.0)
+
+    store.take("c", rate=1, burst=5, now=10.0)
+    assert len(store) == 1
+
+
+def test_login_brute_force_gets_429_with_retry_after(client, db, regular_user, limited):
+    _, account_policy = rate_limit.ROUTE_POLICIES[("POST", "/auth/login")]
+    payload = {"username": regular_user.email, "password": "wrong-password"}
+
+    statuses = [client.post("/auth/login", data=payload).status_code for _ in range(account_policy.burst)]
+    assert status.HTTP_429_TOO_MANY_REQUESTS not in statuses
+
+    response = client.post("/auth/login", data=payload)
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert int(response.headers["Retry-After"]) >= 1
+    assert 'http_rate_limited_total{policy="login_account"}' in client.get("/metrics").text
+
+    # The form reaches the route intact after being read for the limiter.
+    other = client.post("/auth/login", data={"username": "nobody@test.com", "password": "x"})
+    assert other.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_classroom_behind_one_address_can_log_in(client, db, regular_user, limited):
+    ip_policy, account_policy = rate_limit.ROUTE_POLICIES[("POST", "/auth/login")]
+    assert ip_policy.burst >= 3 * account_policy.burst
+
+    statuses = [
+        client.post("/auth/login", data={"username": f"student{i}@school.test", "password": "x"}).status_code
+        for i in range(3 * account_policy.burst)
+    ]
+    assert status.HTTP_429_TOO_MANY_REQUESTS not in statuses
+    login = client.post("/auth/login", data={"username": regular_user.email, "password": "testpass123"})
+    assert login.status_code == status.HTTP_200_OK
+
+
+def test_users_are_limited_separately(client, db, user_token, admin_token, limited, monkeypatch):
+    monkeypatch.setitem(
+        rate_limit.ROUTE_POLICIES,
+        ("GET", "/notifications/unread-count"),
+        (rate_limit.Policy("unread_count", 0.001, 2, "user"),),
+    )
+
+    def poll(token):
+        return client.get("/notifications/unread-count", headers={"Authorization": f"Bearer {token}"}).status_code
+
+    assert [poll(user_token) for _ in range(3)] == [200, 200, 429]
+    assert poll(admin_token) == 200
+    assert client.get("/health/live").status_code == 200
+
+
+def test_unverified_tokens_share_the_client_ip_bucket(client, db, limited, monkeypatch):
+    monkeypatch.setattr(rate_limit, "DEFAULT_POLICY", rate_limit.Policy("default", 0.001, 3, "user"))
+
+    statuses = [
+        client.get("/courses/", headers={"Authorization": f"Bearer forged-{i}"}).status_code
+        for i in range(4)
+    ]
+    assert statuses == [200, 200, 200, 429]
+    assert client.get("/courses/").status_code == status.HTTP_429_TOO_MANY_REQUESTS
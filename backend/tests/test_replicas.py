@@ -0,0 +1,85 @@
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.core import enrollment_cache
+from app.db import models, replicas
+from app.db.database import Base
+
+
+def _replica(lag: float) -> replicas.Replica:
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as session:
+        session.add(models.Course(title="Replica course", description="copy", image_url="https://example.com/r.png"))
+        session.commit()
+    return replicas.Replica(engine, lag_probe=lambda _: lag)
+
+
+def _titles(client, headers=None):
+    return [course["title"] for course in client.get("/courses/", headers=headers).json()]
+
+
+def test_reads_go_to_replica_until_the_client_writes(client, db, user_token, monkeypatch):
+    db.add(models.Course(title="Primary course", description="source of truth", image_url="https://example.com/p.png"))
+    db.commit()
+    headers = {"Authorization": f"Bearer {user_token}"}
+    client.cookies.clear()
+    monkeypatch.setattr(replicas, "REPLICAS", [_replica(lag=0.0)])
+
+    assert _titles(client, headers) == ["Replica course"]
+
+    response = client.post("/notifications/read-all", headers=headers)
+    assert replicas.STICKY_COOKIE in response.cookies
+    assert _titles(client, headers) == ["Primary course"]
+
+    client.cookies.clear()
+    assert _titles(client, headers) == ["Replica course"]
+
+
+def test_lagging_replica_falls_back_to_primary(client, db, monkeypatch):
+    db.add(models.Course(title="Primary course", description="source of truth", image_url="https://example.com/p.png"))
+    db.commit()
+    client.cookies.clear()
+    monkeypatch.setattr(replicas, "REPLICAS", [_replica(lag=replicas.REPLICA_MAX_LAG_SECONDS + 60)])
+    fallbacks = replicas.READ_ROUTING.value(("primary", "replica_lag"))
+
+    assert _titles(client) == ["Primary course"]
+    assert replicas.READ_ROUTING.value(("primary", "replica_lag")) == fallbacks + 1
+
+
+def test_without_replicas_no_sticky_cookie_is_set(client, db, user_token):
+    response = client.post("/notifications/read-all", headers={"Authorization": f"Bearer {user_token}"})
+    assert replicas.STICKY_COOKIE not in response.cookies
+
+
+def test_admin_enrollment_read_through_stale_replica_is_not_cached(
+    client, db, admin_token, user_token, regular_user, monkeypatch
+):
+    course = models.Course(title="Group course", description="enrolled by admin", image_url="https://example.com/g.png")
+    db.add(course)
+    db.commit()
+    # The replica has the course but has not replayed the enrollment yet.
+    replica = _replica(lag=0.0)
+    with Session(replica.engine) as session:
+        session.add(models.Course(id=course.id, title=course.title, description=course.description, image_url=course.image_url))
+        session.commit()
+    monkeypatch.setattr(replicas, "REPLICAS", [replica])
+
+    response = client.post(
+        f"/admin/courses/{course.id}/enroll-user",
+        json={"email": regular_user.email},
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert response.status_code == 200
+    # The admin's read-your-writes cookie does not follow the student.
+    client.cookies.clear()
+
+    headers = {"Authorization": f"Bearer {user_token}"}
+    catalog = {item["id"]: item for item in client.get("/courses/", headers=headers).json()}
+    assert catalog[course.id]["enrolled"] is False
+    assert enrollment_cache._cached_course_ids(regular_user.id) is None
+
+    monkeypatch.setattr(replicas, "REPLICAS", [])
+    catalog = {item["id"]: item for item in client.get("/courses/", headers=headers).json()}
+    assert catalog[course.id]["enrolled"] is True
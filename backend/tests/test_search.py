@@ -0,0 +1,84 @@
+from fastapi import status
+from sqlalchemy.orm import Session
+
+from app.db import models
+
+
+def create_searchable_content(db: Session):
+    visible = models.Course(title="Основы Python", description="Курс про функции и генераторы", image_url="/a.svg")
+    hidden = models.Course(title="Продвинутый Python", description="Метаклассы и дескрипторы", image_url="/b.svg")
+    db.add_all([visible, hidden])
+    db.flush()
+
+    db.add_all([
+        models.Chapter(course_id=visible.id, title="Генераторы", content="Генераторы экономят память", order=0),
+        models.Chapter(course_id=hidden.id, title="Генераторы изнутри", content="Протокол генераторов", order=0),
+        models.Assignment(course_id=visible.id, title="Напишите генератор", description="Ленивая выдача строк"),
+    ])
+    db.commit()
+    return visible, hidden
+
+
+def test_search_ranks_and_limits_to_enrolled_courses(
+    client,
+    db: Session,
+    user_token: str,
+    regular_user: models.User,
+):
+    visible, hidden = create_searchable_content(db)
+    db.add(models.Enrollment(user_id=regular_user.id, course_id=visible.id))
+    db.commit()
+
+    response = client.get(
+        "/search",
+        params={"q": "генераторы"},
+        headers={"Authorization": f"Bearer {user_token}"},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    items = response.json()["items"]
+    kinds = {(item["kind"], item["courseId"]) for item in items}
+    assert ("chapter", visible.id) in kinds
+    assert ("chapter", hidden.id) not in kinds
+    assert ("course", visible.id) in kinds
+    ranks = [item["rank"] for item in items]
+    assert ranks == sorted(ranks, reverse=True)
+    chapter = next(item for item in items if item["kind"] == "chapter")
+    assert "<mark>" in chapter["snippet"]
+
+
+def test_search_paginates_and_hides_chapters_from_anonymous(client, db: Session):
+    create_searchable_content(db)
+
+    anonymous = client.get("/search", params={"q": "python"})
+    assert anonymous.status_code == status.HTTP_200_OK
+    assert {item["kind"] for item in anonymous.json()["items"]} == {"course"}
+
+    first = client.get("/search", params={"q": "python", "limit": 1})
+    data = first.json()
+    assert len(data["items"]) == 1
+    assert data["nextCursor"]
+
+    second = client.get("/search", params={"q": "python", "limit": 1, "cursor": data["nextCursor"]})
+    second_items = second.json()["items"]
+    assert len(second_items) == 1
+    assert second_items[0]["id"] != data["items"][0]["id"]
+    assert second.json()["nextCursor"] is None
+
+
+def test_search_index_follows_updates_and_deletes(client, db: Session, admin_token: str):
+    visible, _ = create_searchable_content(db)
+    headers = {"Authorization": f"Bearer {admin_token}"}
+
+    chapter = db.query(models.Chapter).filter(models.Chapter.course_id == visible.id).one()
+    chapter.title = "Итераторы"
+    chapter.content = "Протокол итерации"
+    db.commit()
+
+    response = client.get("/search", params={"q": "итерации", "kind": "chapter"}, headers=headers)
+    assert [item["id"] for item in response.json()["items"]] == [chapter.id]
+
+    db.delete(chapter)
+    db.commit()
+    response = client.get("/search", params={"q": "итерации", "kind": "chapter"}, headers=headers)
+    assert response.json()["items"] == []
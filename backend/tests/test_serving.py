@@ -0,0 +1,14 @@
+from app.core import serving
+
+
+def test_worker_count_follows_env_and_cpus(monkeypatch):
+    monkeypatch.setattr(serving, "available_cpus", lambda: 4)
+    monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+    monkeypatch.delenv("WORKERS_PER_CORE", raising=False)
+    assert serving.worker_count() == 4
+
+    monkeypatch.setenv("WORKERS_PER_CORE", "0.5")
+    assert serving.worker_count() == 2
+
+    monkeypatch.setenv("WEB_CONCURRENCY", "3")
+    assert serving.worker_count() == 3